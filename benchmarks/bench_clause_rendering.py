@@ -0,0 +1,81 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Compare rendering Gherkin clauses one variation at a time and for all variations at once.
+
+Usage: python -m benchmarks.bench_clause_rendering --objects 20 --workspaces 10
+"""
+
+from timeit import default_timer as timer
+from bdd_dsl.models.user_story import UserStoryLoader
+from bdd_dsl.models.variation import get_task_variations
+from bdd_dsl.utils.jinja import (
+    DEFAULT_FLUENT_CLAUSE_STR_GENS,
+    DEFAULT_TIME_CSTR_STR_GENS,
+    DEFAULT_WHEN_BHV_STR_GENS,
+    GherkinClauseStrGen,
+    get_gherkin_clauses_batch,
+    get_gherkin_clauses_re,
+)
+from benchmarks.synthetic import create_pickplace_graph
+
+
+def main(num_objects: int, num_workspaces: int, num_agents: int) -> None:
+    graph = create_pickplace_graph(
+        num_templates=1,
+        num_variants=1,
+        num_objects=num_objects,
+        num_workspaces=num_workspaces,
+        num_agents=num_agents,
+    )
+    ns_manager = graph.namespace_manager
+    us_loader = UserStoryLoader(graph, shacl_check=False)
+    var_id = next(
+        var_id for var_set in us_loader.get_us_scenario_variants().values() for var_id in var_set
+    )
+    scr_var = us_loader.load_scenario_variant(full_graph=graph, variant_id=var_id)
+    var_uri_list, var_vals_list = get_task_variations(task_var=scr_var.task_variation)
+    clause_str_gen = GherkinClauseStrGen(
+        tc_str_gens=DEFAULT_TIME_CSTR_STR_GENS,
+        fc_str_gens=DEFAULT_FLUENT_CLAUSE_STR_GENS,
+        wb_str_gens=DEFAULT_WHEN_BHV_STR_GENS,
+    )
+
+    start = timer()
+    per_var_clauses = []
+    for var_value_set in var_vals_list:
+        clauses = []
+        get_gherkin_clauses_re(
+            has_clause_model=scr_var,
+            clause_str_gen=clause_str_gen,
+            ns_manager=ns_manager,
+            var_values=dict(zip(var_uri_list, var_value_set)),
+            clause_list=clauses,
+        )
+        per_var_clauses.append(clauses)
+    end = timer()
+    print(f"per variation, {len(var_vals_list)} variations: {end - start:.5f} seconds")
+
+    start = timer()
+    batch_clauses = get_gherkin_clauses_batch(
+        has_clause_model=scr_var,
+        clause_str_gen=clause_str_gen,
+        ns_manager=ns_manager,
+        var_uri_list=var_uri_list,
+        var_vals_list=var_vals_list,
+    )
+    end = timer()
+    print(f"batch, {len(var_vals_list)} variations: {end - start:.5f} seconds")
+    assert batch_clauses == per_var_clauses, "batch rendering differs from per-variation rendering"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark rendering Gherkin clauses of synthetic models.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--objects", type=int, default=20, help="number of objects in scenes")
+    parser.add_argument("--workspaces", type=int, default=10, help="number of workspaces")
+    parser.add_argument("--agents", type=int, default=4, help="number of agents")
+    args = parser.parse_args()
+    main(num_objects=args.objects, num_workspaces=args.workspaces, num_agents=args.agents)
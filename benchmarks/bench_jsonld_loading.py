@@ -0,0 +1,78 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Compare parsing the SESAME JSON-LD models with `Dataset.parse` and `load_jsonld_models`.
+
+Model files are downloaded to the user cache on first use, so the first repetition of either
+approach may include network time.
+
+Usage: python -m benchmarks.bench_jsonld_loading --repeat 5 --workers 4
+"""
+
+from timeit import default_timer as timer
+from rdflib import Dataset
+from rdflib.compare import isomorphic
+from rdf_utils.uri import URL_SECORO_M
+from rdf_utils.resolver import install_resolver
+from bdd_dsl.utils.jsonld import clear_jsonld_context_cache, load_jsonld_models
+
+
+MODEL_URLS = [
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/environments/secorolab.env.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/agents/isaac-sim.agn.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/scenes/secorolab-env.scene.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/scenes/isaac-agents.scene.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/simulation/secorolab-isaac.sim.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/templates/pickplace.tmpl.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/variations/pickplace-secorolab-isaac.var.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/templates/sorting.tmpl.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/variations/sorting-secorolab-isaac.var.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/execution/pickplace-secorolab-isaac.exec.json",
+]
+
+
+def main(repeat: int, workers: int) -> None:
+    install_resolver()
+
+    parse_graph = Dataset()
+    start = timer()
+    for _ in range(repeat):
+        parse_graph = Dataset()
+        for url in MODEL_URLS:
+            parse_graph.parse(url, format="json-ld")
+    end = timer()
+    print(f"Dataset.parse, {len(MODEL_URLS)} models: {(end - start) / repeat:.5f} seconds")
+
+    for num_workers in sorted({1, workers}):
+        clear_jsonld_context_cache()
+        load_graph = Dataset()
+        start = timer()
+        load_jsonld_models(Dataset(), MODEL_URLS, workers=num_workers)
+        end = timer()
+        print(
+            f"load_jsonld_models, {num_workers} threads, cold contexts: {end - start:.5f} seconds"
+        )
+
+        start = timer()
+        for _ in range(repeat):
+            load_graph = load_jsonld_models(Dataset(), MODEL_URLS, workers=num_workers)
+        end = timer()
+        print(
+            f"load_jsonld_models, {num_workers} threads, cached contexts:"
+            f" {(end - start) / repeat:.5f} seconds"
+        )
+
+        assert len(load_graph) == len(parse_graph) and isomorphic(
+            load_graph.default_graph, parse_graph.default_graph
+        ), "loaded graph differs from the one from Dataset.parse"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing the SESAME JSON-LD models.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="number of repetitions")
+    parser.add_argument("--workers", type=int, default=4, help="number of reader threads")
+    args = parser.parse_args()
+    main(repeat=args.repeat, workers=args.workers)
@@ -0,0 +1,213 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Compare inserting stamped trinaries from several sensors into a Timeline and into a list
+with the previous linear scan from the end, without and with eviction of samples outside a
+time horizon, as done for BeforeEvent observation policies. The NumPy-backed TrinaryTimeline
+is also compared for memory use and for evaluating an AND policy over all samples, and after
+every sample within the horizon, which uses its running aggregates, and for inserting samples
+in batches.
+
+Each sensor publishes at a fixed rate with random latency, so samples arrive slightly out of
+order.
+
+Usage: python -m benchmarks.bench_timeline --samples 1000000 --sensors 4 --rate 1000 --horizon 10
+"""
+
+import random
+import tracemalloc
+from timeit import default_timer as timer
+from trinary import Trinary
+import numpy as np
+from bdd_dsl.models.timeline import (
+    Timeline,
+    TrinaryStamped,
+    TrinaryTimeline,
+    get_trinary_codes,
+    get_trinary_stamp,
+)
+
+
+def create_samples(
+    num_samples: int, num_sensors: int, rate: float, max_latency: float, seed: int
+) -> list[TrinaryStamped]:
+    """Samples in order of arrival, i.e. of stamp plus latency"""
+    rng = random.Random(seed)
+    arrivals = []
+    for i in range(num_samples):
+        stamp = (i // num_sensors) / rate
+        arrival = stamp + rng.uniform(0.0, max_latency)
+        arrivals.append((arrival, TrinaryStamped(stamp=stamp, trinary=rng.random() < 0.9)))
+    arrivals.sort(key=lambda arrival: arrival[0])
+    return [trin_st for _, trin_st in arrivals]
+
+
+def insert_linear_scan(timeline: list[TrinaryStamped], trin_st: TrinaryStamped) -> None:
+    for i in range(len(timeline) - 1, -1, -1):
+        if timeline[i].stamp < trin_st.stamp:
+            timeline.insert(i + 1, trin_st)
+            return
+    timeline.insert(0, trin_st)
+
+
+def discard_pop_first(timeline: list[TrinaryStamped], start_t: float) -> None:
+    while len(timeline) > 0 and timeline[0].stamp <= start_t:
+        timeline.pop(0)
+
+
+def fold_and(timeline: list[TrinaryStamped]) -> Trinary | bool:
+    result = True
+    for trin_st in timeline:
+        result &= trin_st.trinary
+    return result
+
+
+def main(
+    num_samples: int,
+    num_sensors: int,
+    rate: float,
+    max_latency: float,
+    horizon: float,
+    num_evals: int,
+    batch_size: int,
+) -> None:
+    samples = create_samples(
+        num_samples=num_samples,
+        num_sensors=num_sensors,
+        rate=rate,
+        max_latency=max_latency,
+        seed=0,
+    )
+
+    start = timer()
+    scan_timeline = []
+    for trin_st in samples:
+        insert_linear_scan(scan_timeline, trin_st)
+    end = timer()
+    print(f"list with linear scan, {num_samples} samples: {end - start:.5f} seconds")
+
+    start = timer()
+    timeline = Timeline(get_stamp=get_trinary_stamp)
+    for trin_st in samples:
+        timeline.insert(trin_st)
+    end = timer()
+    print(f"Timeline, {num_samples} samples: {end - start:.5f} seconds")
+
+    assert timeline.stamps == [trin_st.stamp for trin_st in scan_timeline]
+
+    start = timer()
+    trin_timeline = TrinaryTimeline()
+    for trin_st in samples:
+        trin_timeline.insert_value(stamp=trin_st.stamp, trinary=trin_st.trinary)
+    end = timer()
+    print(f"TrinaryTimeline, {num_samples} samples: {end - start:.5f} seconds")
+    assert trin_timeline.stamps.tolist() == timeline.stamps
+
+    # memory of newly created sample objects, excluding the shared Trinary values
+    tracemalloc.start()
+    obj_timeline = [TrinaryStamped(stamp=float(i), trinary=True) for i in range(num_samples)]
+    obj_mem, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"list of TrinaryStamped: {obj_mem / num_samples:.1f} bytes per sample")
+    print(
+        f"TrinaryTimeline: {trin_timeline.nbytes / num_samples:.1f} bytes per sample incl. spare capacity"
+    )
+    del obj_timeline
+
+    start = timer()
+    fold_result = fold_and(scan_timeline)
+    end = timer()
+    print(f"AND over list of TrinaryStamped: {end - start:.5f} seconds")
+    start = timer()
+    reduce_result = trin_timeline.reduce_and()
+    end = timer()
+    print(f"AND over TrinaryTimeline: {end - start:.5f} seconds")
+    assert fold_result is reduce_result
+
+    start = timer()
+    scan_timeline = []
+    for trin_st in samples:
+        insert_linear_scan(scan_timeline, trin_st)
+        discard_pop_first(scan_timeline, start_t=scan_timeline[-1].stamp - horizon)
+    end = timer()
+    print(f"list with pop(0) eviction, {horizon}s horizon: {end - start:.5f} seconds")
+
+    start = timer()
+    timeline = Timeline(get_stamp=get_trinary_stamp)
+    for trin_st in samples:
+        timeline.insert(trin_st)
+        timeline.discard_until(timeline[-1].stamp - horizon)
+    end = timer()
+    print(f"Timeline with bulk eviction, {horizon}s horizon: {end - start:.5f} seconds")
+    assert timeline.stamps == [trin_st.stamp for trin_st in scan_timeline]
+
+    start = timer()
+    trin_timeline = TrinaryTimeline()
+    for trin_st in samples:
+        trin_timeline.insert_value(stamp=trin_st.stamp, trinary=trin_st.trinary)
+        trin_timeline.discard_until(trin_timeline.last_stamp - horizon)
+    end = timer()
+    print(f"TrinaryTimeline with bulk eviction, {horizon}s horizon: {end - start:.5f} seconds")
+    assert trin_timeline.stamps.tolist() == timeline.stamps
+
+    start = timer()
+    timeline = Timeline(get_stamp=get_trinary_stamp)
+    for trin_st in samples[:num_evals]:
+        timeline.insert(trin_st)
+        timeline.discard_until(timeline[-1].stamp - horizon)
+        fold_and(timeline)
+    end = timer()
+    print(f"Timeline, AND after each of {num_evals} samples: {end - start:.5f} seconds")
+
+    start = timer()
+    trin_timeline = TrinaryTimeline()
+    for trin_st in samples[:num_evals]:
+        trin_timeline.insert_value(stamp=trin_st.stamp, trinary=trin_st.trinary)
+        trin_timeline.discard_until(trin_timeline.last_stamp - horizon)
+        trin_timeline.reduce_and()
+    end = timer()
+    print(f"TrinaryTimeline, AND after each of {num_evals} samples: {end - start:.5f} seconds")
+
+    # e.g. batches from a perception pipeline
+    all_stamps = np.array([trin_st.stamp for trin_st in samples])
+    all_codes = get_trinary_codes([trin_st.trinary for trin_st in samples])
+    start = timer()
+    batch_timeline = TrinaryTimeline()
+    for batch_start in range(0, num_samples, batch_size):
+        batch_timeline.insert_codes(
+            stamps=all_stamps[batch_start : batch_start + batch_size],
+            codes=all_codes[batch_start : batch_start + batch_size],
+        )
+    end = timer()
+    print(f"TrinaryTimeline, batches of {batch_size} samples: {end - start:.5f} seconds")
+    assert batch_timeline.stamps.tolist() == sorted(all_stamps.tolist())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark inserting out-of-order stamped trinaries into timelines.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--samples", type=int, default=10**6, help="number of samples")
+    parser.add_argument("--sensors", type=int, default=4, help="number of sensors")
+    parser.add_argument("--rate", type=float, default=1000.0, help="rate of each sensor in Hz")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="maximum sample latency in seconds"
+    )
+    parser.add_argument(
+        "--horizon", type=float, default=10.0, help="time horizon for eviction in seconds"
+    )
+    parser.add_argument(
+        "--evals", type=int, default=20000, help="number of samples to evaluate policies after"
+    )
+    parser.add_argument("--batch", type=int, default=100, help="number of samples per batch")
+    args = parser.parse_args()
+    main(
+        num_samples=args.samples,
+        num_sensors=args.sensors,
+        rate=args.rate,
+        max_latency=args.latency,
+        horizon=args.horizon,
+        num_evals=args.evals,
+        batch_size=args.batch,
+    )
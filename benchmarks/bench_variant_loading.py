@@ -0,0 +1,72 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Compare loading scenario variants directly from a Dataset and from a GraphIndex.
+
+Usage: python -m benchmarks.bench_variant_loading --templates 10 --variants 50
+"""
+
+from timeit import default_timer as timer
+from bdd_dsl.models.queries import Q_USER_STORY
+from bdd_dsl.models.user_story import ScenarioVariantModel, UserStoryLoader
+from bdd_dsl.utils.graph_index import GraphIndex
+from benchmarks.synthetic import create_pickplace_graph
+
+
+def main(num_templates: int, num_variants: int, num_objects: int, workers: int) -> None:
+    start = timer()
+    graph = create_pickplace_graph(
+        num_templates=num_templates, num_variants=num_variants, num_objects=num_objects
+    )
+    end = timer()
+    print(f"created synthetic graph with {len(graph)} triples: {end - start:.5f} seconds")
+
+    q_result = graph.query(Q_USER_STORY)
+    assert q_result.graph is not None
+    us_graph = q_result.graph
+
+    us_loader = UserStoryLoader(graph, shacl_check=False)
+    var_ids = [
+        var_id for var_set in us_loader.get_us_scenario_variants().values() for var_id in var_set
+    ]
+
+    start = timer()
+    for var_id in var_ids:
+        ScenarioVariantModel(us_graph=us_graph, full_graph=graph, var_id=var_id)
+    end = timer()
+    print(f"direct Dataset lookups, {len(var_ids)} variants: {end - start:.5f} seconds")
+
+    start = timer()
+    full_index = GraphIndex(graph)
+    end = timer()
+    print(f"GraphIndex construction: {end - start:.5f} seconds")
+
+    start = timer()
+    for var_id in var_ids:
+        us_loader.load_scenario_variant(full_graph=full_index, variant_id=var_id)
+    end = timer()
+    print(f"indexed lookups, {len(var_ids)} variants: {end - start:.5f} seconds")
+
+    us_loader = UserStoryLoader(graph, shacl_check=False)
+    start = timer()
+    us_loader.load_all_scenario_variants(full_graph=graph, workers=workers)
+    end = timer()
+    print(f"{workers} worker processes, {len(var_ids)} variants: {end - start:.5f} seconds")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading scenario variants from synthetic models.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--templates", type=int, default=10, help="number of templates")
+    parser.add_argument("--variants", type=int, default=50, help="number of variants per template")
+    parser.add_argument("--objects", type=int, default=10, help="number of objects in scenes")
+    parser.add_argument("--workers", type=int, default=4, help="number of worker processes")
+    args = parser.parse_args()
+    main(
+        num_templates=args.templates,
+        num_variants=args.variants,
+        num_objects=args.objects,
+        workers=args.workers,
+    )
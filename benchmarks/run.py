@@ -0,0 +1,225 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Offline benchmark suite for the spec-generation pipeline, using synthetic models.
+
+Each stage is timed over several repetitions, then run once more under `tracemalloc` to record
+its peak memory. Results can be saved as JSON and compared against a saved baseline, in which
+case the exit code is 1 if any stage regressed beyond the tolerance.
+
+Usage:
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --baseline baseline.json --tolerance 0.2
+"""
+
+import json
+import sys
+import tracemalloc
+from statistics import mean
+from timeit import default_timer as timer
+from typing import Any, Callable, Optional
+from rdflib import Dataset
+from bdd_dsl.models.user_story import UserStoryLoader
+from bdd_dsl.models.variation import get_task_variations
+from bdd_dsl.utils.jinja import get_jinja_env, prepare_jinja2_template_data
+from benchmarks.synthetic import create_pickplace_graph
+
+
+# minimal offline stand-in for the feature template of the examples
+FEATURE_TEMPLATE = """Feature: {{ data.name }}
+{% for scenario in data.criteria %}{% for variation in scenario.variations %}
+  Scenario: {{ variation.name }}
+{% for clause in variation.clauses %}    {{ clause }}
+{% endfor %}{% endfor %}{% endfor %}"""
+
+KEY_TIME_MIN = "time_min"
+KEY_TIME_MEAN = "time_mean"
+KEY_PEAK_MEM = "peak_mem_kib"
+
+StageFactory = Callable[[Dataset], Callable[[], Any]]
+
+
+def _get_variant_ids(us_loader: UserStoryLoader) -> list:
+    return [
+        var_id for var_set in us_loader.get_us_scenario_variants().values() for var_id in var_set
+    ]
+
+
+def _stage_us_loader_init(graph: Dataset) -> Callable[[], Any]:
+    return lambda: UserStoryLoader(graph, shacl_check=False)
+
+
+def _stage_load_scenario_variant(graph: Dataset) -> Callable[[], Any]:
+    var_ids = _get_variant_ids(UserStoryLoader(graph, shacl_check=False))
+
+    def run() -> None:
+        # fresh loader, since loaded variants are cached
+        us_loader = UserStoryLoader(graph, shacl_check=False)
+        for var_id in var_ids:
+            us_loader.load_scenario_variant(full_graph=graph, variant_id=var_id)
+
+    return run
+
+
+def _stage_get_task_variations(graph: Dataset) -> Callable[[], Any]:
+    us_loader = UserStoryLoader(graph, shacl_check=False)
+    task_vars = [
+        us_loader.load_scenario_variant(full_graph=graph, variant_id=var_id).task_variation
+        for var_id in _get_variant_ids(us_loader)
+    ]
+
+    def run() -> None:
+        for task_var in task_vars:
+            get_task_variations(task_var=task_var)
+
+    return run
+
+
+def _stage_prepare_template_data(graph: Dataset) -> Callable[[], Any]:
+    def run() -> None:
+        us_loader = UserStoryLoader(graph, shacl_check=False)
+        prepare_jinja2_template_data(us_loader, graph)
+
+    return run
+
+
+def _stage_render_template(graph: Dataset) -> Callable[[], Any]:
+    us_loader = UserStoryLoader(graph, shacl_check=False)
+    template_data = prepare_jinja2_template_data(us_loader, graph)
+    template = get_jinja_env().from_string(FEATURE_TEMPLATE)
+
+    def run() -> None:
+        for us_data in template_data:
+            for _ in template.generate(data=us_data):
+                pass
+
+    return run
+
+
+STAGES: dict[str, StageFactory] = {
+    "us_loader_init": _stage_us_loader_init,
+    "load_scenario_variant": _stage_load_scenario_variant,
+    "get_task_variations": _stage_get_task_variations,
+    "prepare_jinja2_template_data": _stage_prepare_template_data,
+    "render_template": _stage_render_template,
+}
+
+
+def measure_stage(stage_func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = timer()
+        stage_func()
+        times.append(timer() - start)
+
+    tracemalloc.start()
+    try:
+        stage_func()
+        _, peak_mem = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {KEY_TIME_MIN: min(times), KEY_TIME_MEAN: mean(times), KEY_PEAK_MEM: peak_mem / 1024}
+
+
+def run_suite(config: dict[str, int], repeat: int, stage_names: list[str]) -> dict[str, Any]:
+    graph = create_pickplace_graph(**config)
+    print(f"synthetic graph: {len(graph)} triples, {config}")
+
+    results = {}
+    for stage_name in stage_names:
+        stage_func = STAGES[stage_name](graph)
+        results[stage_name] = measure_stage(stage_func=stage_func, repeat=repeat)
+        print(
+            f"{stage_name:>30}: min {results[stage_name][KEY_TIME_MIN]:.5f} s,"
+            f" mean {results[stage_name][KEY_TIME_MEAN]:.5f} s,"
+            f" peak {results[stage_name][KEY_PEAK_MEM]:.1f} KiB"
+        )
+
+    return {"config": config, "repeat": repeat, "results": results}
+
+
+def compare_results(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> bool:
+    """Print the change of each stage relative to the baseline, return False on regressions.
+
+    Minimum times are compared, since they are less affected by system noise than means.
+    """
+    if results["config"] != baseline.get("config"):
+        print(f"WARNING: baseline was measured with a different config: {baseline.get('config')}")
+
+    passed = True
+    for stage_name, stage_res in results["results"].items():
+        base_res = baseline["results"].get(stage_name)
+        if base_res is None:
+            print(f"{stage_name:>30}: not in baseline")
+            continue
+
+        for key in (KEY_TIME_MIN, KEY_PEAK_MEM):
+            ratio = stage_res[key] / base_res[key] if base_res[key] > 0 else 1.0
+            status = "ok"
+            if ratio > 1.0 + tolerance:
+                status = "REGRESSION"
+                passed = False
+            print(f"{stage_name:>30}: {key} {ratio:.2f}x baseline, {status}")
+
+    return passed
+
+
+def main(
+    config: dict[str, int],
+    repeat: int,
+    stage_names: list[str],
+    output: Optional[str],
+    baseline_path: Optional[str],
+    tolerance: float,
+) -> None:
+    results = run_suite(config=config, repeat=repeat, stage_names=stage_names)
+
+    if output is not None:
+        with open(output, mode="w", encoding="utf-8") as out_file:
+            json.dump(results, out_file, indent=2)
+        print(f"... wrote {output}")
+
+    if baseline_path is None:
+        return
+
+    with open(baseline_path, mode="r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if not compare_results(results=results, baseline=baseline, tolerance=tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the spec-generation pipeline on synthetic models.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--templates", type=int, default=5, help="number of user stories")
+    parser.add_argument("--variants", type=int, default=10, help="number of variants per story")
+    parser.add_argument("--objects", type=int, default=10, help="number of objects in scenes")
+    parser.add_argument("--workspaces", type=int, default=5, help="number of workspaces in scenes")
+    parser.add_argument("--agents", type=int, default=2, help="number of agents in scenes")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed repetitions")
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="stages to run"
+    )
+    parser.add_argument("--output", default=None, help="JSON file to save the results to")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed relative increase over baseline"
+    )
+    args = parser.parse_args()
+    main(
+        config={
+            "num_templates": args.templates,
+            "num_variants": args.variants,
+            "num_objects": args.objects,
+            "num_workspaces": args.workspaces,
+            "num_agents": args.agents,
+        },
+        repeat=args.repeat,
+        stage_names=args.stages,
+        output=args.output,
+        baseline_path=args.baseline,
+        tolerance=args.tolerance,
+    )
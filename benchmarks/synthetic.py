@@ -0,0 +1,270 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Generate synthetic pick & place BDD models of configurable size for benchmarking."""
+
+from rdflib import RDF, BNode, Dataset, Graph, Literal, Namespace, URIRef
+from rdflib.collection import Collection
+from bdd_dsl.models.urirefs import (
+    URI_AGN_PRED_HAS_AGN,
+    URI_AGN_TYPE_AGN,
+    URI_BDD_PRED_CLAUSE_OF,
+    URI_BDD_PRED_ELEMS,
+    URI_BDD_PRED_GIVEN,
+    URI_BDD_PRED_HAS_AC,
+    URI_BDD_PRED_HAS_CLAUSE,
+    URI_BDD_PRED_HAS_SCENE,
+    URI_BDD_PRED_HAS_VARIATION,
+    URI_BDD_PRED_OF_SCENARIO,
+    URI_BDD_PRED_OF_SCENE,
+    URI_BDD_PRED_OF_SETS,
+    URI_BDD_PRED_OF_TMPL,
+    URI_BDD_PRED_REF_OBJ,
+    URI_BDD_PRED_REF_WS,
+    URI_BDD_PRED_THEN,
+    URI_BDD_PRED_VAR_LIST,
+    URI_BDD_PRED_WHEN,
+    URI_BDD_TYPE_CART_PRODUCT,
+    URI_BDD_TYPE_CONST_SET,
+    URI_BDD_TYPE_FLUENT_CLAUSE,
+    URI_BDD_TYPE_GIVEN,
+    URI_BDD_TYPE_LOCATED_AT,
+    URI_BDD_TYPE_SCENARIO,
+    URI_BDD_TYPE_SCENARIO_TMPL,
+    URI_BDD_TYPE_SCENARIO_VARIANT,
+    URI_BDD_TYPE_SCENE,
+    URI_BDD_TYPE_SCENE_AGN,
+    URI_BDD_TYPE_SCENE_OBJ,
+    URI_BDD_TYPE_SCENE_WS,
+    URI_BDD_TYPE_TASK_VAR,
+    URI_BDD_TYPE_THEN,
+    URI_BDD_TYPE_US,
+    URI_BDD_TYPE_VARIABLE,
+    URI_BDD_TYPE_WHEN,
+    URI_BDD_TYPE_WHEN_BHV,
+    URI_BHV_PRED_OF_BHV,
+    URI_BHV_PRED_TARGET_AGN,
+    URI_BHV_PRED_TARGET_OBJ,
+    URI_BHV_PRED_TARGET_WS,
+    URI_BHV_TYPE_BHV,
+    URI_BHV_TYPE_PICK,
+    URI_BHV_TYPE_PLACE,
+    URI_ENV_PRED_HAS_OBJ,
+    URI_ENV_PRED_HAS_WS,
+    URI_ENV_TYPE_OBJ,
+    URI_ENV_TYPE_WS,
+    URI_TASK_PRED_OF_TASK,
+    URI_TASK_TYPE_TASK,
+    URI_TIME_PRED_AFTER_EVT,
+    URI_TIME_PRED_BEFORE_EVT,
+    URI_TIME_PRED_HRZN_SEC,
+    URI_TIME_TYPE_AFTER_EVT,
+    URI_TIME_TYPE_BEFORE_EVT,
+    URI_TIME_TYPE_DURING,
+    URI_TIME_TYPE_TC,
+)
+
+
+NS_BENCH = Namespace("https://example.org/bdd-bench/")
+PREFIX_BENCH = "bench"
+
+
+def _add_list(graph: Graph, items: list) -> BNode:
+    list_node = BNode()
+    Collection(graph, list_node, items)
+    return list_node
+
+
+def _add_during_events(graph: Graph, node: URIRef, start_evt: URIRef, end_evt: URIRef) -> None:
+    graph.add((node, RDF.type, URI_TIME_TYPE_TC))
+    graph.add((node, RDF.type, URI_TIME_TYPE_DURING))
+    graph.add((node, URI_TIME_PRED_AFTER_EVT, start_evt))
+    graph.add((node, URI_TIME_PRED_BEFORE_EVT, end_evt))
+
+
+def _add_located_at(
+    graph: Graph,
+    clause_id: URIRef,
+    clause_of: URIRef,
+    obj_var: URIRef,
+    ws_var: URIRef,
+    tc_type: URIRef,
+    tc_pred: URIRef,
+    evt: URIRef,
+) -> None:
+    graph.add((clause_id, RDF.type, URI_BDD_TYPE_FLUENT_CLAUSE))
+    graph.add((clause_id, RDF.type, URI_BDD_TYPE_LOCATED_AT))
+    graph.add((clause_id, RDF.type, URI_TIME_TYPE_TC))
+    graph.add((clause_id, RDF.type, tc_type))
+    graph.add((clause_id, URI_BDD_PRED_CLAUSE_OF, clause_of))
+    graph.add((clause_id, URI_BDD_PRED_REF_OBJ, obj_var))
+    graph.add((clause_id, URI_BDD_PRED_REF_WS, ws_var))
+    graph.add((clause_id, tc_pred, evt))
+    graph.add((clause_id, URI_TIME_PRED_HRZN_SEC, Literal(5.0)))
+
+
+def add_env_models(graph: Graph, num_objects: int, num_workspaces: int, num_agents: int) -> None:
+    for i in range(num_objects):
+        graph.add((NS_BENCH[f"obj-{i}"], RDF.type, URI_ENV_TYPE_OBJ))
+    for i in range(num_workspaces):
+        graph.add((NS_BENCH[f"ws-{i}"], RDF.type, URI_ENV_TYPE_WS))
+    for i in range(num_agents):
+        graph.add((NS_BENCH[f"agn-{i}"], RDF.type, URI_AGN_TYPE_AGN))
+
+    bhv_id = NS_BENCH["pickplace"]
+    graph.add((bhv_id, RDF.type, URI_BHV_TYPE_BHV))
+    graph.add((bhv_id, RDF.type, URI_BHV_TYPE_PICK))
+    graph.add((bhv_id, RDF.type, URI_BHV_TYPE_PLACE))
+    graph.add((NS_BENCH["task-pickplace"], RDF.type, URI_TASK_TYPE_TASK))
+
+
+def add_template_models(
+    graph: Graph,
+    tmpl_idx: int,
+    num_variants: int,
+    num_objects: int,
+    num_workspaces: int,
+    num_agents: int,
+) -> None:
+    """Add a user story with a scenario template and `num_variants` variants of the template"""
+    prefix = f"tmpl{tmpl_idx}"
+    task_id = NS_BENCH["task-pickplace"]
+    evt_start = NS_BENCH[f"{prefix}-evt-start"]
+    evt_end = NS_BENCH[f"{prefix}-evt-end"]
+
+    # scenario
+    scenario_id = NS_BENCH[f"{prefix}-scenario"]
+    given_id = NS_BENCH[f"{prefix}-given"]
+    when_id = NS_BENCH[f"{prefix}-when"]
+    then_id = NS_BENCH[f"{prefix}-then"]
+    graph.add((scenario_id, RDF.type, URI_BDD_TYPE_SCENARIO))
+    graph.add((scenario_id, URI_BHV_PRED_OF_BHV, NS_BENCH["pickplace"]))
+    graph.add((scenario_id, URI_TASK_PRED_OF_TASK, task_id))
+    graph.add((scenario_id, URI_BDD_PRED_GIVEN, given_id))
+    graph.add((scenario_id, URI_BDD_PRED_WHEN, when_id))
+    graph.add((scenario_id, URI_BDD_PRED_THEN, then_id))
+    graph.add((given_id, RDF.type, URI_BDD_TYPE_GIVEN))
+    graph.add((when_id, RDF.type, URI_BDD_TYPE_WHEN))
+    graph.add((then_id, RDF.type, URI_BDD_TYPE_THEN))
+
+    # scene
+    scene_id = NS_BENCH[f"{prefix}-scene"]
+    graph.add((scene_id, RDF.type, URI_BDD_TYPE_SCENE))
+    scene_comps = {
+        URI_BDD_TYPE_SCENE_OBJ: (URI_ENV_PRED_HAS_OBJ, "obj", num_objects),
+        URI_BDD_TYPE_SCENE_WS: (URI_ENV_PRED_HAS_WS, "ws", num_workspaces),
+        URI_BDD_TYPE_SCENE_AGN: (URI_AGN_PRED_HAS_AGN, "agn", num_agents),
+    }
+    comp_ids = []
+    for comp_type, (has_pred, elem_name, num_elems) in scene_comps.items():
+        comp_id = NS_BENCH[f"{prefix}-scene-{elem_name}"]
+        comp_ids.append(comp_id)
+        graph.add((comp_id, RDF.type, comp_type))
+        graph.add((comp_id, URI_BDD_PRED_OF_SCENE, scene_id))
+        for i in range(num_elems):
+            graph.add((comp_id, has_pred, NS_BENCH[f"{elem_name}-{i}"]))
+
+    # template & clauses
+    var_obj = NS_BENCH[f"{prefix}-var-obj"]
+    var_ws = NS_BENCH[f"{prefix}-var-ws"]
+    var_agn = NS_BENCH[f"{prefix}-var-agn"]
+    for var_id in (var_obj, var_ws, var_agn):
+        graph.add((var_id, RDF.type, URI_BDD_TYPE_VARIABLE))
+
+    tmpl_id = NS_BENCH[f"{prefix}"]
+    graph.add((tmpl_id, RDF.type, URI_BDD_TYPE_SCENARIO_TMPL))
+    graph.add((tmpl_id, URI_BDD_PRED_OF_SCENARIO, scenario_id))
+    graph.add((tmpl_id, URI_BDD_PRED_HAS_SCENE, scene_id))
+    _add_during_events(graph=graph, node=tmpl_id, start_evt=evt_start, end_evt=evt_end)
+
+    fc_given = NS_BENCH[f"{prefix}-fc-given"]
+    _add_located_at(
+        graph=graph,
+        clause_id=fc_given,
+        clause_of=given_id,
+        obj_var=var_obj,
+        ws_var=var_ws,
+        tc_type=URI_TIME_TYPE_BEFORE_EVT,
+        tc_pred=URI_TIME_PRED_BEFORE_EVT,
+        evt=evt_start,
+    )
+    when_bhv = NS_BENCH[f"{prefix}-when-bhv"]
+    graph.add((when_bhv, RDF.type, URI_BDD_TYPE_WHEN_BHV))
+    graph.add((when_bhv, URI_BDD_PRED_CLAUSE_OF, when_id))
+    graph.add((when_bhv, URI_BHV_PRED_OF_BHV, NS_BENCH["pickplace"]))
+    graph.add((when_bhv, URI_BHV_PRED_TARGET_OBJ, var_obj))
+    graph.add((when_bhv, URI_BHV_PRED_TARGET_AGN, var_agn))
+    graph.add((when_bhv, URI_BHV_PRED_TARGET_WS, var_ws))
+    _add_during_events(graph=graph, node=when_bhv, start_evt=evt_start, end_evt=evt_end)
+    fc_then = NS_BENCH[f"{prefix}-fc-then"]
+    _add_located_at(
+        graph=graph,
+        clause_id=fc_then,
+        clause_of=then_id,
+        obj_var=var_obj,
+        ws_var=var_ws,
+        tc_type=URI_TIME_TYPE_AFTER_EVT,
+        tc_pred=URI_TIME_PRED_AFTER_EVT,
+        evt=evt_end,
+    )
+    graph.add((tmpl_id, URI_BDD_PRED_HAS_CLAUSE, _add_list(graph, [fc_given, when_bhv, fc_then])))
+
+    # variants
+    us_id = NS_BENCH[f"{prefix}-us"]
+    graph.add((us_id, RDF.type, URI_BDD_TYPE_US))
+    for var_idx in range(num_variants):
+        variant_id = NS_BENCH[f"{prefix}-variant{var_idx}"]
+        graph.add((variant_id, RDF.type, URI_BDD_TYPE_SCENARIO_VARIANT))
+        graph.add((variant_id, URI_BDD_PRED_OF_TMPL, tmpl_id))
+        for comp_id in comp_ids:
+            graph.add((variant_id, URI_BDD_PRED_HAS_SCENE, comp_id))
+        graph.add((us_id, URI_BDD_PRED_HAS_AC, variant_id))
+
+        task_var_id = NS_BENCH[f"{prefix}-variant{var_idx}-variation"]
+        graph.add((variant_id, URI_BDD_PRED_HAS_VARIATION, task_var_id))
+        graph.add((task_var_id, RDF.type, URI_BDD_TYPE_TASK_VAR))
+        graph.add((task_var_id, RDF.type, URI_BDD_TYPE_CART_PRODUCT))
+        graph.add((task_var_id, URI_TASK_PRED_OF_TASK, task_id))
+        graph.add(
+            (task_var_id, URI_BDD_PRED_VAR_LIST, _add_list(graph, [var_obj, var_ws, var_agn]))
+        )
+
+        set_ids = []
+        for elem_name, num_elems in (
+            ("obj", num_objects),
+            ("ws", num_workspaces),
+            ("agn", num_agents),
+        ):
+            set_id = NS_BENCH[f"{prefix}-variant{var_idx}-{elem_name}-set"]
+            set_ids.append(set_id)
+            graph.add((set_id, RDF.type, URI_BDD_TYPE_CONST_SET))
+            # each variant picks a different subset of the scene elements
+            for i in range(var_idx % num_elems, num_elems):
+                graph.add((set_id, URI_BDD_PRED_ELEMS, NS_BENCH[f"{elem_name}-{i}"]))
+        graph.add((task_var_id, URI_BDD_PRED_OF_SETS, _add_list(graph, set_ids)))
+
+
+def create_pickplace_graph(
+    num_templates: int = 10,
+    num_variants: int = 50,
+    num_objects: int = 10,
+    num_workspaces: int = 5,
+    num_agents: int = 2,
+) -> Dataset:
+    """Create a Dataset with `num_templates` user stories, each with `num_variants` variants"""
+    graph = Dataset()
+    graph.bind(PREFIX_BENCH, NS_BENCH)
+    add_env_models(
+        graph=graph,
+        num_objects=num_objects,
+        num_workspaces=num_workspaces,
+        num_agents=num_agents,
+    )
+    for tmpl_idx in range(num_templates):
+        add_template_models(
+            graph=graph,
+            tmpl_idx=tmpl_idx,
+            num_variants=num_variants,
+            num_objects=num_objects,
+            num_workspaces=num_workspaces,
+            num_agents=num_agents,
+        )
+    return graph
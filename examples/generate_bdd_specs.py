@@ -1,6 +1,7 @@
 import sys
 from os.path import join, dirname
 from enum import StrEnum
+from typing import Optional
 from timeit import default_timer as timer
 from urllib.request import HTTPError
 import rdflib
@@ -10,10 +11,17 @@ from rdf_utils.resolver import install_resolver
 from rdf_utils.naming import get_valid_filename
 from bdd_dsl.models.user_story import UserStoryLoader
 from bdd_dsl.utils.jinja import (
+    get_us_data_lists,
+    iter_jinja2_template_data,
     load_template_from_url,
-    prepare_jinja2_template_data,
+    render_template_to_file,
+    shard_us_data,
 )
+from bdd_dsl.utils.jsonld import load_jsonld_models
+from bdd_dsl.utils.manifest import MANIFEST_FILENAME, FeatureManifest
 from bdd_dsl.models.frames import FR_NAME
+from bdd_dsl.models.sampling import SamplingStrategy, VariationSampler
+from bdd_dsl.models.variation import iter_task_variations
 
 
 class ExampleType(StrEnum):
@@ -39,24 +47,36 @@ SORT_MODELS = {
 }
 
 
-def main(exp_type: ExampleType):
+def main(
+    exp_type: ExampleType,
+    use_cache: bool,
+    workers: int,
+    shards: int,
+    shard_by_cost: bool,
+    sampling: Optional[SamplingStrategy],
+    num_samples: int,
+    seed: Optional[int],
+    incremental: bool,
+):
     # By default, istall custom resolver that download files to user's cache directory
     # This resolver is used by rdflib to load remote resources, e.g. included as URLs in the context.
     install_resolver()
 
-    g = rdflib.Dataset()
-    for url, fmt in MODEL_URLS.items():
-        g.parse(url, format=fmt)
+    model_urls = list(MODEL_URLS)
     if exp_type == ExampleType.PICKPLACE:
-        for url, fmt in PP_MODELS.items():
-            g.parse(url, format=fmt)
+        model_urls.extend(PP_MODELS)
     elif exp_type == ExampleType.SORTING:
-        for url, fmt in SORT_MODELS.items():
-            g.parse(url, format=fmt)
+        model_urls.extend(SORT_MODELS)
+
+    # all models are JSON-LD, resolve their shared contexts only once
+    start = timer()
+    g = load_jsonld_models(rdflib.Dataset(), model_urls, workers=len(model_urls))
+    end = timer()
+    print(f"Model loading time: {end - start:.5f} seconds")
 
     start = timer()
     try:
-        us_loader = UserStoryLoader(g)
+        us_loader = UserStoryLoader(g, use_cache=use_cache, model_sources=model_urls)
     except HTTPError as e:
         print(f"error loading models URL '{e.url}':\n{e.info()}\n{e}")
         sys.exit(1)
@@ -64,22 +84,73 @@ def main(exp_type: ExampleType):
     end = timer()
     print(f"UserStoryLoader init time: {end - start:.5f} seconds")
 
-    start = timer()
-    processed_bdd_data = prepare_jinja2_template_data(us_loader, g)
-    end = timer()
-    print(f"Jinja template data preparation time: {end - start:.5f} seconds")
+    sampler = None
+    if sampling is not None:
+        sampler = VariationSampler(strategy=sampling, num_samples=num_samples, seed=seed)
 
-    feature_template = load_template_from_url(
-        f"{URL_SECORO_M}/acceptance-criteria/bdd/jinja/feature.jinja"
-    )
-    for us_data in processed_bdd_data:
+    template_url = f"{URL_SECORO_M}/acceptance-criteria/bdd/jinja/feature.jinja"
+    feature_template = load_template_from_url(template_url)
+
+    manifest = None
+    us_ids = None
+    us_digests = {}
+    if incremental:
+        # regenerate everything if other settings that affect the features changed
+        manifest = FeatureManifest(
+            file_path=join(GENERATED_DIR, MANIFEST_FILENAME),
+            context=f"{template_url} {shards} {shard_by_cost} {sampling} {num_samples} {seed}",
+        )
+        us_ids = []
+        for us_id in us_loader.get_us_scenario_variants():
+            us_name = us_id.n3(namespace_manager=g.namespace_manager)
+            us_digests[us_name] = us_loader.get_user_story_digest(full_graph=g, us_id=us_id)
+            if manifest.is_up_to_date(us_name=us_name, digest=us_digests[us_name]):
+                print(f"... {us_name} is up to date")
+                continue
+            us_ids.append(us_id)
+
+    # template data is prepared while the features are written
+    start = timer()
+    for us_data in iter_jinja2_template_data(
+        us_loader,
+        g,
+        workers=workers,
+        variations_getter=iter_task_variations if sampler is None else sampler,
+        us_ids=us_ids,
+    ):
         us_name = us_data[FR_NAME]
-        feature_content = feature_template.render(data=us_data)
-        feature_filename = f"{get_valid_filename(us_name)}.feature"
-        filepath = join(GENERATED_DIR, feature_filename)
-        with open(filepath, mode="w", encoding="utf-8") as of:
-            of.write(feature_content)
+        feature_paths = []
+        if shards < 2:
+            feature_filename = f"{get_valid_filename(us_name)}.feature"
+            filepath = join(GENERATED_DIR, feature_filename)
+            render_template_to_file(template=feature_template, file_path=filepath, data=us_data)
             print(f"... wrote {filepath}")
+            feature_paths.append(filepath)
+        else:
+            us_data = get_us_data_lists(us_data=us_data)
+            for shard_idx, shard_data in enumerate(
+                shard_us_data(us_data=us_data, num_shards=shards, by_cost=shard_by_cost)
+            ):
+                feature_filename = f"{get_valid_filename(us_name)}-shard{shard_idx}.feature"
+                filepath = join(GENERATED_DIR, feature_filename)
+                render_template_to_file(
+                    template=feature_template, file_path=filepath, data=shard_data
+                )
+                print(f"... wrote {filepath}")
+                feature_paths.append(filepath)
+
+        if manifest is not None:
+            manifest.update(
+                us_name=us_name, digest=us_digests[us_name], feature_paths=feature_paths
+            )
+    if manifest is not None:
+        manifest.save()
+    end = timer()
+    print(f"Feature generation time: {end - start:.5f} seconds")
+    if sampler is not None:
+        for sample in sampler.samples.values():
+            print(sample)
+    us_loader.save_cache()
 
 
 if __name__ == "__main__":
@@ -97,5 +168,57 @@ if __name__ == "__main__":
         default=ExampleType.PICKPLACE,
         help="Specify which type of example to generate Gherkin feature.",
     )
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="Cache validated & loaded user story models in the user's cache directory.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes for loading scenario variants in parallel.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the variations of each user story into this many feature files.",
+    )
+    parser.add_argument(
+        "--shard-by-cost",
+        action="store_true",
+        help="Balance shards by the number of steps instead of the number of variations.",
+    )
+    parser.add_argument(
+        "--sampling",
+        type=SamplingStrategy,
+        choices=list(SamplingStrategy),
+        default=None,
+        help="Render a sample of each task variation instead of all value sets.",
+    )
+    parser.add_argument(
+        "--num-samples",
+        type=int,
+        default=100,
+        help="Number of value sets per task variation for uniform sampling.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for sampling.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate features of user stories whose models changed since the last run.",
+    )
     args = parser.parse_args()
-    main(exp_type=args.example_type)
+    main(
+        exp_type=args.example_type,
+        use_cache=args.use_cache,
+        workers=args.workers,
+        shards=args.shards,
+        shard_by_cost=args.shard_by_cost,
+        sampling=args.sampling,
+        num_samples=args.num_samples,
+        seed=args.seed,
+        incremental=args.incremental,
+    )
@@ -1,4 +1,5 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
+import os
 import sys
 import time
 from json import JSONDecodeError
@@ -9,6 +10,7 @@ from rdflib import Dataset
 from rdf_utils.uri import URL_SECORO_M
 from rdf_utils.resolver import install_resolver
 from bdd_dsl.execution.mockup import before_all_mockup, before_scenario
+from bdd_dsl.utils.jsonld import load_jsonld_models
 
 
 MODELS = {
@@ -27,20 +29,35 @@ MODELS = {
 
 
 def before_all(context: Context):
+    # e.g. 'behave -D model_bin_dir=<dir>': parse models once, then load the binary snapshot
+    model_bin_dir = context.config.userdata.get("model_bin_dir", None)
+    if model_bin_dir is not None and os.path.isdir(model_bin_dir):
+        context.model_bin_dir = model_bin_dir
+        before_all_mockup(context)
+        return
+
+    # 'behave -D model_shm=<full graph>,<US graph>': attach to models loaded by a parent process,
+    # see examples/run_behave_workers.py
+    model_shm = context.config.userdata.get("model_shm", None)
+    if model_shm is not None:
+        context.model_shm_names = model_shm.split(",")
+        before_all_mockup(context)
+        return
+
     install_resolver()
-    g = Dataset()
-    for url, fmt in MODELS.items():
-        try:
-            g.parse(url, format=fmt)
-        except HTTPError as e:
-            print(f"HTTP error parsing '{url}': {e}")
-            sys.exit(1)
-        except JSONDecodeError as e:
-            print(f"error parsing '{url}' into graph (format='{fmt}'):\n{e}")
-            sys.exit(1)
+    try:
+        g = load_jsonld_models(Dataset(), MODELS, workers=len(MODELS))
+    except HTTPError as e:
+        print(f"HTTP error parsing '{e.url}': {e}")
+        sys.exit(1)
+    except JSONDecodeError as e:
+        print(f"error parsing models into graph (format='json-ld'):\n{e}")
+        sys.exit(1)
 
     context.model_graph = g
     before_all_mockup(context)
+    if model_bin_dir is not None:
+        context.us_loader.save_binary(full_graph=g, dir_path=model_bin_dir)
 
 
 def before_step(context: Context, step: Step):
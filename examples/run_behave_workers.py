@@ -0,0 +1,77 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Run generated features in parallel behave processes which share the models in memory.
+
+The models are parsed & validated once here, then put in shared memory blocks. Each behave
+process attaches to them in `before_all`, see `generated/environment.py`.
+"""
+
+import importlib.util
+import subprocess
+import sys
+from glob import glob
+from os.path import join, dirname
+from rdflib import Dataset
+from rdf_utils.resolver import install_resolver
+from bdd_dsl.models.user_story import UserStoryLoader
+from bdd_dsl.utils.jsonld import load_jsonld_models
+
+
+GENERATED_DIR = join(dirname(__file__), "generated")
+
+
+def load_env_models() -> dict[str, str]:
+    env_spec = importlib.util.spec_from_file_location(
+        "environment", join(GENERATED_DIR, "environment.py")
+    )
+    assert env_spec is not None and env_spec.loader is not None
+    env_module = importlib.util.module_from_spec(env_spec)
+    env_spec.loader.exec_module(env_module)
+    return env_module.MODELS
+
+
+def main(workers: int) -> None:
+    install_resolver()
+    model_urls = list(load_env_models())
+    g = load_jsonld_models(Dataset(), model_urls, workers=len(model_urls))
+    us_loader = UserStoryLoader(graph=g)
+
+    feature_paths = sorted(glob(join(GENERATED_DIR, "*.feature")))
+    full_shm, us_shm = us_loader.share_memory(full_graph=g)
+    exit_codes = []
+    try:
+        processes = []
+        for worker_idx in range(workers):
+            worker_features = feature_paths[worker_idx::workers]
+            if len(worker_features) == 0:
+                continue
+            processes.append(
+                subprocess.Popen(
+                    [
+                        sys.executable,
+                        "-m",
+                        "behave",
+                        "-D",
+                        f"model_shm={full_shm.name},{us_shm.name}",
+                    ]
+                    + worker_features,
+                    cwd=GENERATED_DIR,
+                )
+            )
+        exit_codes = [process.wait() for process in processes]
+    finally:
+        full_shm.close()
+        us_shm.close()
+
+    sys.exit(max(exit_codes, default=0))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Run generated features in parallel behave processes.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("-j", "--workers", type=int, default=2, help="number of behave processes")
+    args = parser.parse_args()
+    main(workers=args.workers)
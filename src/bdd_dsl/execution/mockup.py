@@ -31,15 +31,28 @@ from bdd_dsl.execution.common import load_attr_has_config
 from bdd_dsl.execution.behaviour import Behaviour
 from bdd_dsl.execution.scenario import ExecutionModel
 from bdd_dsl.models.user_story import ScenarioVariantModel, UserStoryLoader
+from bdd_dsl.utils.uri import get_uri_str
 
 
 def before_all_mockup(context: Context):
+    # snapshot written with UserStoryLoader.save_binary, skips parsing & validating the models
+    model_bin_dir = getattr(context, "model_bin_dir", None)
+    # names of shared memory blocks from UserStoryLoader.share_memory, as (full graph, US graph)
+    model_shm_names = getattr(context, "model_shm_names", None)
+    if model_bin_dir is not None:
+        context.model_graph, context.us_loader = UserStoryLoader.load_binary(dir_path=model_bin_dir)
+    elif model_shm_names is not None:
+        context.model_graph, context.us_loader = UserStoryLoader.attach_shared_memory(
+            full_graph_name=model_shm_names[0], us_graph_name=model_shm_names[1]
+        )
+
     g = getattr(context, "model_graph", None)
     assert g is not None, "'model_graph' attribute not found in context"
 
     exec_model = ExecutionModel(graph=g, bhv_loaders=[load_py_module_attr])
     context.execution_model = exec_model
-    context.us_loader = UserStoryLoader(graph=g)
+    if model_bin_dir is None and model_shm_names is None:
+        context.us_loader = UserStoryLoader(graph=g)
 
     generic_loader = ModelLoader()
     context.ws_model_loader = generic_loader
@@ -63,7 +76,7 @@ def before_scenario(context: Context, scenario: Scenario):
     assert scenario_var_uri is not None, f"can't parse '{scr_name}' as URI"
 
     scenario_var_model = us_loader.load_scenario_variant(
-        full_graph=model_graph, variant_id=scenario_var_uri
+        full_graph=model_graph, variant_id=scenario_var_uri, lazy=True
     )
     assert isinstance(scenario_var_model, ScenarioVariantModel)
     assert len(scenario_var_model.scene.objects) > 0, (
@@ -279,10 +292,14 @@ class PickplaceBehaviourMockup(Behaviour):
             self.agn_ids is not None and self.obj_ids is not None and self.place_ws_ids is not None
         ), "Behaviour.step: mockup behaviour expects reset() to be called first"
 
-        agn_str = " or ".join(uri.n3(namespace_manager=self._ns_manager) for uri in self.agn_ids)
-        obj_str = " or ".join(uri.n3(namespace_manager=self._ns_manager) for uri in self.obj_ids)
+        agn_str = " or ".join(
+            get_uri_str(uri=uri, ns_manager=self._ns_manager) for uri in self.agn_ids
+        )
+        obj_str = " or ".join(
+            get_uri_str(uri=uri, ns_manager=self._ns_manager) for uri in self.obj_ids
+        )
         place_ws_str = " or ".join(
-            uri.n3(namespace_manager=self._ns_manager) for uri in self.place_ws_ids
+            get_uri_str(uri=uri, ns_manager=self._ns_manager) for uri in self.place_ws_ids
         )
         print(f"'{agn_str}' picks '{obj_str}'")
         sleep(0.05)
@@ -1,14 +1,22 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
 from __future__ import annotations
-from dataclasses import dataclass
+from collections.abc import Sequence
 from typing import Any, Generator, Optional, Protocol
-from trinary import Trinary, Unknown
+import numpy as np
+from trinary import Trinary
 from rdflib import Graph, URIRef
 from rdf_utils.models.common import AttrLoaderProtocol, ModelBase
 from bdd_dsl.execution.scenario import ScenarioExecutionModel
 from bdd_dsl.models.time_constraint import get_duration
 from bdd_dsl.models.user_story import ScenarioVariantModel
 from bdd_dsl.models.clauses import FluentClauseModel
+from bdd_dsl.models.timeline import (
+    Timeline,
+    TrinaryStamped,
+    TrinaryTimeline,
+    get_float_stamp,
+    get_trinary_codes,
+)
 from bdd_dsl.models.urirefs import (
     URI_BDD_PRED_OF_CLAUSE,
     URI_OBS_TYPE_POLICY,
@@ -21,31 +29,57 @@ from bdd_dsl.models.urirefs import (
 )
 
 
-@dataclass
-class TrinaryStamped:
-    stamp: float
-    trinary: Trinary | bool
-
-
 class TrinariesPolicyProtocol(Protocol):
-    """Protocol for functions that load model attributes."""
+    """Protocol for functions that evaluate a verdict from an observation policy's trinaries.
 
-    def __call__(self, trinaries: list[TrinaryStamped], **kwargs: Any) -> bool | Trinary: ...
+    Policies are O(1) for a `TrinaryTimeline`, which maintains running aggregates, e.g.
+    `ObsPolicyModel.trinary_timeline`. Other sequences are first copied into one.
+    """
 
+    def __call__(self, trinaries: Sequence[TrinaryStamped], **kwargs: Any) -> bool | Trinary: ...
 
-def trin_policy_and(trinaries: list[TrinaryStamped], **kwargs: Any) -> bool | Trinary:
-    if len(trinaries) == 0:
-        return Unknown
 
-    result = True
+def _get_trinary_timeline(trinaries: Sequence[TrinaryStamped]) -> TrinaryTimeline:
+    if isinstance(trinaries, TrinaryTimeline):
+        return trinaries
+
+    trin_timeline = TrinaryTimeline()
     for trin_st in trinaries:
-        result &= trin_st.trinary
+        trin_timeline.insert(trin_st)
+    return trin_timeline
+
+
+def trin_policy_and(trinaries: Sequence[TrinaryStamped], **kwargs: Any) -> bool | Trinary:
+    return _get_trinary_timeline(trinaries).reduce_and()
+
+
+def trin_policy_or(trinaries: Sequence[TrinaryStamped], **kwargs: Any) -> bool | Trinary:
+    return _get_trinary_timeline(trinaries).reduce_or()
+
+
+def trin_policy_at_least(
+    trinaries: Sequence[TrinaryStamped], ratio: float, **kwargs: Any
+) -> bool | Trinary:
+    """Whether at least `ratio` (between 0 and 1) of the trinaries are True."""
+    assert 0.0 <= ratio <= 1.0, f"invalid ratio: {ratio}"
+    return _get_trinary_timeline(trinaries).reduce_at_least(ratio=ratio)
 
-    return result
+
+def trin_policy_eventually(trinaries: Sequence[TrinaryStamped], **kwargs: Any) -> bool | Trinary:
+    """Whether any trinary was True, including ones evicted from the time horizon."""
+    return _get_trinary_timeline(trinaries).reduce_eventually()
+
+
+def trin_policy_always_within(
+    trinaries: Sequence[TrinaryStamped], window: float, **kwargs: Any
+) -> bool | Trinary:
+    """Whether all trinaries within `window` seconds of the latest one are True."""
+    assert window >= 0.0, f"invalid window: {window}"
+    return _get_trinary_timeline(trinaries).reduce_always_within(window=window)
 
 
 class ObsPolicyModel(ModelBase):
-    trinary_timeline: list[TrinaryStamped]
+    trinary_timeline: TrinaryTimeline
 
     start_time: Optional[float]
     end_time: Optional[float]
@@ -67,7 +101,9 @@ class ObsPolicyModel(ModelBase):
         start_event: Optional[URIRef],
         end_event: Optional[URIRef],
         horizon: Optional[float],
+        max_samples: Optional[int] = None,
     ) -> None:
+        """`max_samples` caps the number of trinaries kept, dropping the oldest ones."""
         super().__init__(node_id=node_id, graph=graph)
         if URI_OBS_TYPE_POLICY not in self.types:
             raise ValueError(
@@ -80,21 +116,11 @@ class ObsPolicyModel(ModelBase):
         self.end_event = end_event
         self.horizon = horizon
 
-        self.trinary_timeline = []
+        self.trinary_timeline = TrinaryTimeline(max_samples=max_samples)
 
         self.start_time = None
         self.end_time = None
 
-    def _insert_trin_stamped_in_order(self, trin_st: TrinaryStamped):
-        # Find insertion point (from end)
-        for i in range(len(self.trinary_timeline) - 1, -1, -1):
-            if self.trinary_timeline[i].stamp < trin_st.stamp:
-                self.trinary_timeline.insert(i + 1, trin_st)
-                return
-
-        # Insert at beginning if smallest
-        self.trinary_timeline.insert(0, trin_st)
-
     def _discard_out_of_horizon_trin(self):
         """Clean up trinary queue for BeforeEvent type.
 
@@ -111,14 +137,9 @@ class ObsPolicyModel(ModelBase):
 
         end_t = self.end_time
         if end_t is None:
-            end_t = self.trinary_timeline[-1].stamp
+            end_t = self.trinary_timeline.last_stamp
 
-        while len(self.trinary_timeline) > 0:
-            first_trin_t = self.trinary_timeline[0].stamp
-            start_t = end_t - self.horizon
-            if first_trin_t > start_t:
-                break
-            self.trinary_timeline.pop(0)
+        self.trinary_timeline.discard_until(end_t - self.horizon)
 
     def add_trinary(self, trin_st: TrinaryStamped) -> tuple[bool, str]:
         if self.duration_type == URI_TIME_TYPE_BEFORE_EVT:
@@ -127,11 +148,11 @@ class ObsPolicyModel(ModelBase):
                 # (Unlikely) add to record if trinary within time horizon
                 assert self.start_time is not None
                 if trin_st.stamp > self.start_time and trin_st.stamp < self.end_time:
-                    self._insert_trin_stamped_in_order(trin_st)
+                    self.trinary_timeline.insert(trin_st)
                     return True, ""
                 return False, "(before) finished and out of horizon"
 
-            self._insert_trin_stamped_in_order(trin_st)
+            self.trinary_timeline.insert(trin_st)
 
             self._discard_out_of_horizon_trin()
             return True, ""
@@ -147,7 +168,7 @@ class ObsPolicyModel(ModelBase):
             if trin_st.stamp > self.end_time:
                 return False, f"(after) out of horizon - {trin_st.stamp} > {self.end_time}"
 
-            self._insert_trin_stamped_in_order(trin_st)
+            self.trinary_timeline.insert(trin_st)
             return True, ""
 
         if self.duration_type == URI_TIME_TYPE_DURING:
@@ -159,11 +180,44 @@ class ObsPolicyModel(ModelBase):
             if self.end_time is not None and trin_st.stamp > self.end_time:
                 return False, f"(during) out of horizon - {trin_st.stamp} > {self.end_time}"
 
-            self._insert_trin_stamped_in_order(trin_st)
+            self.trinary_timeline.insert(trin_st)
             return True, ""
 
         return False, "no matching type"
 
+    def add_trinaries(self, stamps: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Add samples in bulk with the same checks as `add_trinary`, see
+        `TrinaryTimeline.insert_codes`. Returns a boolean mask of the accepted samples.
+        """
+        if self.duration_type == URI_TIME_TYPE_BEFORE_EVT:
+            if self.end_time is not None:
+                assert self.start_time is not None
+                accepted = (stamps > self.start_time) & (stamps < self.end_time)
+            else:
+                accepted = np.ones(stamps.shape, dtype=np.bool_)
+        elif self.duration_type == URI_TIME_TYPE_AFTER_EVT:
+            if self.start_time is None:
+                accepted = np.zeros(stamps.shape, dtype=np.bool_)
+            else:
+                assert self.end_time is not None
+                accepted = stamps <= self.end_time
+        elif self.duration_type == URI_TIME_TYPE_DURING:
+            if self.start_time is None:
+                accepted = np.zeros(stamps.shape, dtype=np.bool_)
+            elif self.end_time is None:
+                accepted = np.ones(stamps.shape, dtype=np.bool_)
+            else:
+                accepted = stamps <= self.end_time
+        else:
+            return np.zeros(stamps.shape, dtype=np.bool_)
+
+        self.trinary_timeline.insert_codes(stamps=stamps[accepted], codes=codes[accepted])
+        if self.duration_type == URI_TIME_TYPE_BEFORE_EVT:
+            # the horizon is relative to the latest stamp, so discarding once is the same as
+            # after each sample
+            self._discard_out_of_horizon_trin()
+        return accepted
+
     def on_event(self, evt_uri: URIRef, evt_stamp: float):
         if evt_uri == self.start_event:
             if self.duration_type == URI_TIME_TYPE_AFTER_EVT:
@@ -201,6 +255,7 @@ class ObsPolicyModel(ModelBase):
         cls,
         graph: Graph,
         fc: FluentClauseModel,
+        max_samples: Optional[int] = None,
     ) -> Generator[ObsPolicyModel, None, None]:
 
         dur_spec = get_duration(constraint=fc)
@@ -247,6 +302,7 @@ class ObsPolicyModel(ModelBase):
                 start_event=start_evt,
                 end_event=end_evt,
                 horizon=hrzn,
+                max_samples=max_samples,
             )
 
 
@@ -254,17 +310,20 @@ class ObservationManager(object):
     scenario_exec: ScenarioExecutionModel
     scr_start_time: Optional[float]
     scr_end_time: Optional[float]
+    max_samples: Optional[int]
 
     bhv_result: Optional[TrinaryStamped]
 
     obs_policies: dict[URIRef, ObsPolicyModel]  # policy ID -> ObsPolicyModel
     _fluent_policy_registry: dict[URIRef, set[URIRef]]  # fluent ID -> policy IDs
 
-    event_timelines: dict[URIRef, list[float]]
+    event_timelines: dict[URIRef, Timeline[float]]
     _fluent_event_registry: dict[URIRef, set[URIRef]]  # fluent ID -> event IDs
 
-    def __init__(self, scr_exec: ScenarioExecutionModel) -> None:
+    def __init__(self, scr_exec: ScenarioExecutionModel, max_samples: Optional[int] = None) -> None:
+        """`max_samples` caps the number of trinaries kept by each observation policy."""
         self.scenario_exec = scr_exec
+        self.max_samples = max_samples
         self.scr_start_time = None
         self.scr_end_time = None
 
@@ -276,16 +335,6 @@ class ObservationManager(object):
         self.event_timelines = {}
         self._fluent_event_registry = {}
 
-    def _insert_evt_stamp_in_order(self, evt_uri: URIRef, evt_t: float):
-        # Find insertion point (from end)
-        for i in range(len(self.event_timelines[evt_uri]) - 1, -1, -1):
-            if self.event_timelines[evt_uri][i] < evt_t:
-                self.event_timelines[evt_uri].insert(i + 1, evt_t)
-                return
-
-        # Insert at beginning if smallest
-        self.event_timelines[evt_uri].insert(0, evt_t)
-
     def _register_fluent_event(self, evt_uri: URIRef | None, fc_id: URIRef) -> None:
         if evt_uri is None:
             return
@@ -308,6 +357,7 @@ class ObservationManager(object):
         for obs_pol in ObsPolicyModel.policies_for_fluent_clause(
             graph=graph,
             fc=fc,
+            max_samples=self.max_samples,
         ):
             if obs_pol.id in self.obs_policies:
                 # policy already added.
@@ -335,11 +385,34 @@ class ObservationManager(object):
 
         return self.obs_policies[policy_uri].add_trinary(trin_st)
 
+    def update_fpolicy_assertions_batch(
+        self,
+        policy_uri: URIRef,
+        stamps: np.ndarray | Sequence[float],
+        values: np.ndarray | Sequence[Trinary | bool],
+    ) -> np.ndarray:
+        """Add a batch of assertions for a policy, e.g. from a perception pipeline.
+
+        `values` can be booleans, trinary codes or trinary values, see `get_trinary_codes`.
+        Returns a boolean mask of the samples accepted by the policy's time constraint, the
+        same as `update_fpolicy_assertion` called for each sample in order.
+        """
+        if policy_uri not in self.obs_policies:
+            raise ValueError(f"ObservationPolicy not registered: '{policy_uri}'")
+
+        stamps = np.asarray(stamps, dtype=np.float64)
+        codes = get_trinary_codes(values)
+        if stamps.ndim != 1 or stamps.shape != codes.shape:
+            raise ValueError(
+                f"policy '{policy_uri}': mismatched stamps {stamps.shape} and values {codes.shape}"
+            )
+
+        return self.obs_policies[policy_uri].add_trinaries(stamps=stamps, codes=codes)
+
     def on_event(self, evt_uri: URIRef, evt_t: float):
         if evt_uri not in self.event_timelines:
-            self.event_timelines[evt_uri] = [evt_t]
-        else:
-            self._insert_evt_stamp_in_order(evt_uri=evt_uri, evt_t=evt_t)
+            self.event_timelines[evt_uri] = Timeline(get_stamp=get_float_stamp)
+        self.event_timelines[evt_uri].insert(evt_t)
 
         if evt_uri == self.scenario_exec.start_event:
             self.scr_start_time = evt_t
@@ -362,13 +435,14 @@ class ObservationManager(object):
         scr_var: ScenarioVariantModel,
         bhv_loaders: list[AttrLoaderProtocol],
         obs_loaders: list[AttrLoaderProtocol],
+        max_samples: Optional[int] = None,
     ) -> ObservationManager:
         scr_exec = ScenarioExecutionModel(
             graph=graph,
             scr_var=scr_var,
             bhv_loaders=bhv_loaders,
         )
-        obs_manager = ObservationManager(scr_exec=scr_exec)
+        obs_manager = ObservationManager(scr_exec=scr_exec, max_samples=max_samples)
         for fc in scr_var.fluent_clauses():
             obs_manager.register_fluent_obs(
                 graph=graph,
@@ -0,0 +1,201 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+from enum import StrEnum
+from typing import Any, Optional
+from rdflib import URIRef
+from bdd_dsl.models.urirefs import URI_BDD_TYPE_CART_PRODUCT
+from bdd_dsl.models.variation import TaskVariationModel, iter_task_variations
+from bdd_dsl.utils.combinatorics import (
+    count_covered_t_tuples,
+    count_t_tuples,
+    greedy_covering_array,
+    rank_product,
+    sample_ranks,
+    stratified_rows,
+    unrank_product,
+)
+
+
+class SamplingStrategy(StrEnum):
+    UNIFORM = "uniform"
+    COVERING = "covering"
+    STRATIFIED = "stratified"
+
+
+class VariationSample(object):
+    """Subset of a task variation's value sets, with the coverage it achieves.
+
+    Coverage is reported for Cartesian product variations as the fraction of distinct
+    combinations of values of any `strength` variables, and of individual variable values,
+    which appear in the sample.
+    """
+
+    task_var_id: URIRef
+    variables: list[URIRef]
+    values: list[Any]
+    total_count: int
+    strength: int
+    covered_tuples: Optional[int]
+    total_tuples: Optional[int]
+    covered_values: Optional[int]
+    total_values: Optional[int]
+
+    def __init__(
+        self,
+        task_var_id: URIRef,
+        variables: list[URIRef],
+        values: list[Any],
+        total_count: int,
+        strength: int,
+        sizes: Optional[list[int]] = None,
+        index_rows: Optional[list[tuple[int, ...]]] = None,
+    ) -> None:
+        self.task_var_id = task_var_id
+        self.variables = variables
+        self.values = values
+        self.total_count = total_count
+        self.strength = min(strength, len(variables))
+        self.covered_tuples = None
+        self.total_tuples = None
+        self.covered_values = None
+        self.total_values = None
+
+        if sizes is None or index_rows is None:
+            return
+
+        self.covered_tuples = count_covered_t_tuples(rows=index_rows, strength=self.strength)
+        self.total_tuples = count_t_tuples(sizes=sizes, strength=self.strength)
+        self.covered_values = count_covered_t_tuples(rows=index_rows, strength=1)
+        self.total_values = sum(sizes)
+
+    @property
+    def coverage(self) -> Optional[float]:
+        if self.covered_tuples is None or self.total_tuples is None:
+            return None
+        if self.total_tuples == 0:
+            return 1.0
+        return self.covered_tuples / self.total_tuples
+
+    @property
+    def value_coverage(self) -> Optional[float]:
+        if self.covered_values is None or self.total_values is None:
+            return None
+        if self.total_values == 0:
+            return 1.0
+        return self.covered_values / self.total_values
+
+    def __repr__(self) -> str:
+        coverage_str = ""
+        if self.coverage is not None and self.value_coverage is not None:
+            coverage_str = (
+                f", {self.strength}-wise coverage={self.coverage:.2%}"
+                f", value coverage={self.value_coverage:.2%}"
+            )
+        return (
+            f"VariationSample('{self.task_var_id}': {len(self.values)}"
+            f" of {self.total_count} variations{coverage_str})"
+        )
+
+
+def sample_task_variations(
+    task_var: TaskVariationModel,
+    strategy: SamplingStrategy = SamplingStrategy.UNIFORM,
+    num_samples: int = 100,
+    strength: int = 2,
+    samples_per_value: int = 1,
+    seed: Optional[int] = None,
+) -> VariationSample:
+    """Select a subset of a task variation's value sets, as an alternative to the full product.
+
+    - `UNIFORM`: `num_samples` value sets drawn uniformly without replacement, in enumeration
+      order, without enumerating the variation
+    - `COVERING`: value sets covering all combinations of values of any `strength` variables,
+      e.g. all pairs of values for the default `strength=2`
+    - `STRATIFIED`: value sets in which each value of each variable appears at least once,
+      or `samples_per_value` times if possible
+
+    Only uniform sampling is supported for table variations.
+    """
+    var_uri_list, var_vals = iter_task_variations(task_var=task_var)
+    total_count = len(var_vals)
+    is_product = URI_BDD_TYPE_CART_PRODUCT in task_var.types
+    sizes = var_vals.value_set_sizes if is_product else None
+
+    if strategy == SamplingStrategy.UNIFORM:
+        ranks = sample_ranks(count=total_count, num_samples=num_samples, seed=seed)
+        index_rows = None
+        if sizes is not None:
+            index_rows = [unrank_product(sizes=sizes, k=k) for k in ranks]
+        return VariationSample(
+            task_var_id=task_var.id,
+            variables=var_uri_list,
+            values=[var_vals.unrank(k) for k in ranks],
+            total_count=total_count,
+            strength=strength,
+            sizes=sizes,
+            index_rows=index_rows,
+        )
+
+    if sizes is None:
+        raise RuntimeError(
+            f"TaskVariation '{task_var.id}': sampling strategy '{strategy}' only supported"
+            " for Cartesian product variations"
+        )
+
+    if strategy == SamplingStrategy.COVERING:
+        index_rows = greedy_covering_array(sizes=sizes, strength=strength, seed=seed)
+    elif strategy == SamplingStrategy.STRATIFIED:
+        index_rows = stratified_rows(sizes=sizes, samples_per_value=samples_per_value, seed=seed)
+    else:
+        raise RuntimeError(f"unhandled sampling strategy: {strategy}")
+
+    # keep enumeration order
+    index_rows.sort(key=lambda row: rank_product(sizes=sizes, indices=row))
+    return VariationSample(
+        task_var_id=task_var.id,
+        variables=var_uri_list,
+        values=[var_vals.from_indices(row) for row in index_rows],
+        total_count=total_count,
+        strength=strength,
+        sizes=sizes,
+        index_rows=index_rows,
+    )
+
+
+class VariationSampler(object):
+    """Callable that samples task variations, to use as `variations_getter` when preparing
+    Jinja template data. Samples are kept in `samples` for reporting the achieved coverage.
+    """
+
+    strategy: SamplingStrategy
+    num_samples: int
+    strength: int
+    samples_per_value: int
+    seed: Optional[int]
+    samples: dict[URIRef, VariationSample]
+
+    def __init__(
+        self,
+        strategy: SamplingStrategy = SamplingStrategy.UNIFORM,
+        num_samples: int = 100,
+        strength: int = 2,
+        samples_per_value: int = 1,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.strategy = strategy
+        self.num_samples = num_samples
+        self.strength = strength
+        self.samples_per_value = samples_per_value
+        self.seed = seed
+        self.samples = {}
+
+    def __call__(self, task_var: TaskVariationModel) -> tuple[list[URIRef], list[Any]]:
+        sample = sample_task_variations(
+            task_var=task_var,
+            strategy=self.strategy,
+            num_samples=self.num_samples,
+            strength=self.strength,
+            samples_per_value=self.samples_per_value,
+            seed=self.seed,
+        )
+        self.samples[task_var.id] = sample
+        return sample.variables, sample.values
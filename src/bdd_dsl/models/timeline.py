@@ -0,0 +1,502 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from itertools import islice
+from math import inf
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, TypeVar, overload
+import numpy as np
+from trinary import Trinary, Unknown
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class TrinaryStamped:
+    stamp: float
+    trinary: Trinary | bool
+
+
+def get_trinary_stamp(trin_st: TrinaryStamped) -> float:
+    return trin_st.stamp
+
+
+def get_float_stamp(stamp: float) -> float:
+    return stamp
+
+
+class Timeline(Sequence[T]):
+    """Items kept sorted by their time stamps.
+
+    Stamps are stored in a separate list for binary search, so inserting an out-of-order item
+    takes O(log n) comparisons, and appending an in-order item, the common case, is O(1).
+    An item is inserted before existing items with the same stamp.
+
+    Old items are evicted by advancing a head offset, like in a ring buffer, and the evicted
+    part of the lists is deleted once it makes up half of them, so eviction is amortized O(1)
+    per item. If `max_samples` is set, the oldest items are evicted when it is exceeded.
+    """
+
+    _items: list[T]
+    _stamps: list[float]
+    _head: int
+    _get_stamp: Callable[[T], float]
+    max_samples: Optional[int]
+
+    def __init__(self, get_stamp: Callable[[T], float], max_samples: Optional[int] = None) -> None:
+        assert max_samples is None or max_samples > 0, f"invalid max_samples: {max_samples}"
+        self._items = []
+        self._stamps = []
+        self._head = 0
+        self._get_stamp = get_stamp
+        self.max_samples = max_samples
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    @overload
+    def __getitem__(self, idx: int) -> T: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[T]: ...
+
+    def __getitem__(self, idx: int | slice) -> T | list[T]:
+        if isinstance(idx, slice):
+            return self._items[self._head :][idx]
+
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError(f"timeline index out of range: {idx}")
+        return self._items[self._head + idx]
+
+    def __iter__(self) -> Iterator[T]:
+        return islice(self._items, self._head, None)
+
+    @property
+    def stamps(self) -> list[float]:
+        self._compact(force=True)
+        return self._stamps
+
+    def _compact(self, force: bool = False) -> None:
+        if self._head == 0:
+            return
+        if not force and self._head * 2 < len(self._items):
+            return
+        del self._items[: self._head]
+        del self._stamps[: self._head]
+        self._head = 0
+
+    def insert(self, item: T) -> int:
+        """Insert an item in order of its stamp, returns its index.
+
+        The index is -1 if `max_samples` is exceeded and the item is the oldest, i.e. evicted.
+        """
+        stamp = self._get_stamp(item)
+        stamps = self._stamps
+        if len(stamps) == self._head or stamp > stamps[-1]:
+            stamps.append(stamp)
+            self._items.append(item)
+            idx = len(stamps) - 1 - self._head
+        else:
+            idx = bisect_left(stamps, stamp, lo=self._head)
+            stamps.insert(idx, stamp)
+            self._items.insert(idx, item)
+            idx -= self._head
+
+        if self.max_samples is not None and len(stamps) - self._head > self.max_samples:
+            self._head += 1
+            idx -= 1
+            self._compact()
+        return idx
+
+    def index_after(self, stamp: float) -> int:
+        """Index of the first item with a stamp greater than `stamp`."""
+        return bisect_right(self._stamps, stamp, lo=self._head) - self._head
+
+    def discard_until(self, stamp: float) -> int:
+        """Evict all items with stamps up to and including `stamp`, returns their number."""
+        num_discarded = self.index_after(stamp)
+        self._head += num_discarded
+        self._compact()
+        return num_discarded
+
+    def pop_first(self) -> T:
+        if len(self) == 0:
+            raise IndexError("pop from empty timeline")
+        item = self._items[self._head]
+        self._head += 1
+        self._compact()
+        return item
+
+
+TRIN_CODE_FALSE = 0
+TRIN_CODE_UNKNOWN = 1
+TRIN_CODE_TRUE = 2
+# indexed by trinary codes, which are ordered so that AND is the minimum and OR the maximum
+_TRIN_VALUES: tuple[Trinary | bool, ...] = (False, Unknown, True)
+
+
+def get_trinary_code(trinary: Trinary | bool) -> int:
+    if trinary is Unknown:
+        return TRIN_CODE_UNKNOWN
+    if isinstance(trinary, (bool, np.bool_)):
+        return TRIN_CODE_TRUE if trinary else TRIN_CODE_FALSE
+    raise ValueError(f"not a trinary value: {trinary}")
+
+
+def get_trinary_value(code: int) -> Trinary | bool:
+    return _TRIN_VALUES[code]
+
+
+def get_trinary_codes(values: np.ndarray | Sequence[Trinary | bool]) -> np.ndarray:
+    """Trinary codes as an int8 array, from a boolean array, an integer array of codes or a
+    sequence of trinary values.
+    """
+    if isinstance(values, np.ndarray) and values.dtype == np.bool_:
+        return np.where(values, TRIN_CODE_TRUE, TRIN_CODE_FALSE).astype(np.int8)
+
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.integer):
+        if values.size > 0 and (values.min() < TRIN_CODE_FALSE or values.max() > TRIN_CODE_TRUE):
+            raise ValueError(f"trinary codes not in [{TRIN_CODE_FALSE}, {TRIN_CODE_TRUE}]")
+        return values.astype(np.int8, copy=False)
+
+    return np.fromiter((get_trinary_code(value) for value in values), dtype=np.int8)
+
+
+class TrinaryTimeline(Sequence[TrinaryStamped]):
+    """Trinaries sorted by their time stamps, stored in NumPy arrays.
+
+    Stamps are stored as float64 and trinaries as int8 codes, i.e. 9 bytes per sample.
+    New samples are first inserted into small sorted lists, which are merged into the arrays
+    when `FLUSH_SIZE` is reached or the arrays are accessed, so inserting doesn't pay for
+    NumPy calls per sample. Indexing and iterating create `TrinaryStamped` objects, use the
+    `stamps` & `codes` views or the reductions for vectorized access.
+
+    Ordering and eviction behave like `Timeline`. Evicted space is reclaimed when the arrays
+    run out of capacity, which is doubled only if less than half of it would be free after
+    compacting.
+
+    Running aggregates per trinary code are updated in O(1) per inserted or evicted sample,
+    so that observation policies can be evaluated in constant time:
+    - `counts`: number of samples currently in the timeline
+    - `added_counts`: number of samples ever inserted
+    - `latest_stamps`: latest stamp ever inserted, -inf if none
+    - `evicted_until`: all samples with stamps up to this one were evicted, -inf if none
+    """
+
+    INITIAL_CAPACITY = 64
+    FLUSH_SIZE = 1024
+
+    _stamps: np.ndarray
+    _codes: np.ndarray
+    _head: int
+    _tail: int
+    _pending_stamps: list[float]
+    _pending_codes: list[int]
+    max_samples: Optional[int]
+
+    counts: list[int]
+    added_counts: list[int]
+    latest_stamps: list[float]
+    evicted_until: float
+
+    def __init__(self, max_samples: Optional[int] = None) -> None:
+        assert max_samples is None or max_samples > 0, f"invalid max_samples: {max_samples}"
+        self._stamps = np.empty(TrinaryTimeline.INITIAL_CAPACITY, dtype=np.float64)
+        self._codes = np.empty(TrinaryTimeline.INITIAL_CAPACITY, dtype=np.int8)
+        self._head = 0
+        self._tail = 0
+        self._pending_stamps = []
+        self._pending_codes = []
+        self.max_samples = max_samples
+
+        self.counts = [0] * len(_TRIN_VALUES)
+        self.added_counts = [0] * len(_TRIN_VALUES)
+        self.latest_stamps = [-inf] * len(_TRIN_VALUES)
+        self.evicted_until = -inf
+
+    def __len__(self) -> int:
+        return self._tail - self._head + len(self._pending_stamps)
+
+    @overload
+    def __getitem__(self, idx: int) -> TrinaryStamped: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[TrinaryStamped]: ...
+
+    def __getitem__(self, idx: int | slice) -> TrinaryStamped | list[TrinaryStamped]:
+        if isinstance(idx, slice):
+            return [
+                TrinaryStamped(stamp=stamp, trinary=_TRIN_VALUES[code])
+                for stamp, code in zip(self.stamps[idx].tolist(), self.codes[idx].tolist())
+            ]
+
+        self.flush()
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError(f"timeline index out of range: {idx}")
+        return TrinaryStamped(
+            stamp=float(self._stamps[self._head + idx]),
+            trinary=_TRIN_VALUES[self._codes[self._head + idx]],
+        )
+
+    def __iter__(self) -> Iterator[TrinaryStamped]:
+        for stamp, code in zip(self.stamps.tolist(), self.codes.tolist()):
+            yield TrinaryStamped(stamp=stamp, trinary=_TRIN_VALUES[code])
+
+    @property
+    def stamps(self) -> np.ndarray:
+        """View of the sorted stamps, invalidated by modifications of the timeline."""
+        self.flush()
+        return self._stamps[self._head : self._tail]
+
+    @property
+    def codes(self) -> np.ndarray:
+        """View of the trinary codes, invalidated by modifications of the timeline."""
+        self.flush()
+        return self._codes[self._head : self._tail]
+
+    @property
+    def last_stamp(self) -> float:
+        if len(self) == 0:
+            raise IndexError("last stamp of empty timeline")
+
+        last_stamp = float(self._stamps[self._tail - 1]) if self._tail > self._head else -inf
+        if len(self._pending_stamps) > 0 and self._pending_stamps[-1] > last_stamp:
+            return self._pending_stamps[-1]
+        return last_stamp
+
+    @property
+    def nbytes(self) -> int:
+        return self._stamps.nbytes + self._codes.nbytes
+
+    def _reserve(self, num_samples: int) -> None:
+        capacity = self._stamps.shape[0]
+        if self._tail + num_samples <= capacity:
+            return
+
+        size = self._tail - self._head
+        if (size + num_samples) * 2 <= capacity:
+            # move to the front, NumPy handles the overlap
+            self._stamps[:size] = self._stamps[self._head : self._tail]
+            self._codes[:size] = self._codes[self._head : self._tail]
+        else:
+            capacity = max(TrinaryTimeline.INITIAL_CAPACITY, (size + num_samples) * 2)
+            stamps = np.empty(capacity, dtype=np.float64)
+            codes = np.empty(capacity, dtype=np.int8)
+            stamps[:size] = self._stamps[self._head : self._tail]
+            codes[:size] = self._codes[self._head : self._tail]
+            self._stamps = stamps
+            self._codes = codes
+
+        self._head = 0
+        self._tail = size
+
+    def flush(self) -> None:
+        """Merge pending samples into the arrays."""
+        num_pending = len(self._pending_stamps)
+        if num_pending == 0:
+            return
+
+        self._reserve(num_pending)
+        pending_stamps = np.array(self._pending_stamps, dtype=np.float64)
+        pending_codes = np.array(self._pending_codes, dtype=np.int8)
+        self._pending_stamps.clear()
+        self._pending_codes.clear()
+
+        # only the array suffix after the oldest pending sample changes
+        tail = self._tail
+        start = self._head + int(
+            np.searchsorted(self._stamps[self._head : tail], pending_stamps[0], side="left")
+        )
+        # new samples go before existing ones with the same stamp
+        positions = np.searchsorted(self._stamps[start:tail], pending_stamps, side="left")
+        merged_stamps = np.insert(self._stamps[start:tail], positions, pending_stamps)
+        merged_codes = np.insert(self._codes[start:tail], positions, pending_codes)
+        self._stamps[start : tail + num_pending] = merged_stamps
+        self._codes[start : tail + num_pending] = merged_codes
+        self._tail = tail + num_pending
+
+    def _evict_first(self) -> None:
+        # pending samples go before array samples with the same stamp
+        pending_stamps = self._pending_stamps
+        if len(pending_stamps) > 0 and (
+            self._tail == self._head or pending_stamps[0] <= self._stamps[self._head]
+        ):
+            stamp = pending_stamps.pop(0)
+            code = self._pending_codes.pop(0)
+        else:
+            stamp = float(self._stamps[self._head])
+            code = int(self._codes[self._head])
+            self._head += 1
+
+        self.counts[code] -= 1
+        if stamp > self.evicted_until:
+            self.evicted_until = stamp
+
+    def insert_value(self, stamp: float, trinary: Trinary | bool) -> None:
+        """Insert a trinary in order of its stamp."""
+        code = get_trinary_code(trinary)
+        pending_stamps = self._pending_stamps
+        if len(pending_stamps) == 0 or stamp > pending_stamps[-1]:
+            pending_stamps.append(stamp)
+            self._pending_codes.append(code)
+        else:
+            idx = bisect_left(pending_stamps, stamp)
+            pending_stamps.insert(idx, stamp)
+            self._pending_codes.insert(idx, code)
+
+        self.counts[code] += 1
+        self.added_counts[code] += 1
+        if stamp > self.latest_stamps[code]:
+            self.latest_stamps[code] = stamp
+
+        if self.max_samples is not None and len(self) > self.max_samples:
+            self._evict_first()
+        if len(pending_stamps) >= TrinaryTimeline.FLUSH_SIZE:
+            self.flush()
+
+    def insert(self, trin_st: TrinaryStamped) -> None:
+        self.insert_value(stamp=trin_st.stamp, trinary=trin_st.trinary)
+
+    def insert_codes(self, stamps: np.ndarray, codes: np.ndarray) -> None:
+        """Insert samples in bulk, same as inserting them one by one in the given order.
+
+        `stamps` & `codes` are 1-D arrays of the same length, see `get_trinary_codes`.
+        """
+        assert stamps.ndim == 1 and stamps.shape == codes.shape, (
+            f"mismatched stamps {stamps.shape} and codes {codes.shape}"
+        )
+        num_samples = stamps.shape[0]
+        if num_samples == 0:
+            return
+
+        self.flush()
+        # later samples go before earlier ones with the same stamp, like repeated inserts
+        order = np.lexsort((-np.arange(num_samples), stamps))
+        new_stamps = stamps[order].astype(np.float64, copy=False)
+        new_codes = codes[order].astype(np.int8, copy=False)
+
+        self._reserve(num_samples)
+        tail = self._tail
+        start = self._head + int(
+            np.searchsorted(self._stamps[self._head : tail], new_stamps[0], side="left")
+        )
+        positions = np.searchsorted(self._stamps[start:tail], new_stamps, side="left")
+        self._stamps[start : tail + num_samples] = np.insert(
+            self._stamps[start:tail], positions, new_stamps
+        )
+        self._codes[start : tail + num_samples] = np.insert(
+            self._codes[start:tail], positions, new_codes
+        )
+        self._tail = tail + num_samples
+
+        new_counts = np.bincount(new_codes, minlength=len(_TRIN_VALUES)).tolist()
+        for code, count in enumerate(new_counts):
+            if count == 0:
+                continue
+            self.counts[code] += count
+            self.added_counts[code] += count
+            latest_stamp = float(new_stamps[new_codes == code][-1])
+            if latest_stamp > self.latest_stamps[code]:
+                self.latest_stamps[code] = latest_stamp
+
+        if self.max_samples is None or len(self) <= self.max_samples:
+            return
+        new_head = self._tail - self.max_samples
+        evicted_counts = np.bincount(
+            self._codes[self._head : new_head], minlength=len(_TRIN_VALUES)
+        )
+        for code, count in enumerate(evicted_counts.tolist()):
+            self.counts[code] -= count
+        self.evicted_until = max(self.evicted_until, float(self._stamps[new_head - 1]))
+        self._head = new_head
+
+    def index_after(self, stamp: float) -> int:
+        """Index of the first trinary with a stamp greater than `stamp`."""
+        return int(np.searchsorted(self.stamps, stamp, side="right"))
+
+    def discard_until(self, stamp: float) -> None:
+        """Evict all trinaries with stamps up to and including `stamp`."""
+        if self._tail > self._head and self._stamps[self._head] <= stamp:
+            new_head = self._head + int(
+                np.searchsorted(self._stamps[self._head : self._tail], stamp, side="right")
+            )
+            evicted_counts = np.bincount(
+                self._codes[self._head : new_head], minlength=len(_TRIN_VALUES)
+            )
+            for code, count in enumerate(evicted_counts.tolist()):
+                self.counts[code] -= count
+            self._head = new_head
+
+        if len(self._pending_stamps) > 0 and self._pending_stamps[0] <= stamp:
+            num_discarded = bisect_right(self._pending_stamps, stamp)
+            for code in self._pending_codes[:num_discarded]:
+                self.counts[code] -= 1
+            del self._pending_stamps[:num_discarded]
+            del self._pending_codes[:num_discarded]
+
+        if stamp > self.evicted_until:
+            self.evicted_until = stamp
+
+    def pop_first(self) -> TrinaryStamped:
+        trin_st = self[0]
+        self._evict_first()
+        return trin_st
+
+    def reduce_and(self) -> Trinary | bool:
+        """Conjunction of all trinaries, `Unknown` if the timeline is empty."""
+        if len(self) == 0:
+            return Unknown
+        if self.counts[TRIN_CODE_FALSE] > 0:
+            return False
+        if self.counts[TRIN_CODE_UNKNOWN] > 0:
+            return Unknown
+        return True
+
+    def reduce_or(self) -> Trinary | bool:
+        """Disjunction of all trinaries, `Unknown` if the timeline is empty."""
+        if len(self) == 0:
+            return Unknown
+        if self.counts[TRIN_CODE_TRUE] > 0:
+            return True
+        if self.counts[TRIN_CODE_UNKNOWN] > 0:
+            return Unknown
+        return False
+
+    def reduce_at_least(self, ratio: float) -> Trinary | bool:
+        """Whether at least `ratio` of the trinaries are True.
+
+        Unknown trinaries could be either, so the result is `Unknown` if it depends on them.
+        """
+        num_samples = len(self)
+        if num_samples == 0:
+            return Unknown
+        num_true = self.counts[TRIN_CODE_TRUE]
+        if num_true >= ratio * num_samples:
+            return True
+        if num_true + self.counts[TRIN_CODE_UNKNOWN] < ratio * num_samples:
+            return False
+        return Unknown
+
+    def reduce_eventually(self) -> Trinary | bool:
+        """Whether any trinary ever inserted, including evicted ones, was True."""
+        if self.added_counts[TRIN_CODE_TRUE] > 0:
+            return True
+        if self.added_counts[TRIN_CODE_FALSE] == 0 or self.added_counts[TRIN_CODE_UNKNOWN] > 0:
+            return Unknown
+        return False
+
+    def reduce_always_within(self, window: float) -> Trinary | bool:
+        """Conjunction of the trinaries with stamps in `(last_stamp - window, last_stamp]`."""
+        if len(self) == 0:
+            return Unknown
+        window_start = max(self.last_stamp - window, self.evicted_until)
+        if self.latest_stamps[TRIN_CODE_FALSE] > window_start:
+            return False
+        if self.latest_stamps[TRIN_CODE_UNKNOWN] > window_start:
+            return Unknown
+        return True
@@ -1,5 +1,8 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Generator, Iterable, Optional
+import numpy as np
 from rdflib import RDF, Graph, URIRef, BNode
 from rdflib.query import ResultRow
 from rdf_utils.models.common import ModelBase, get_node_types
@@ -21,6 +24,25 @@ from bdd_dsl.models.clauses import (
 )
 from bdd_dsl.models.variation import TaskVariationModel
 from bdd_dsl.models.queries import Q_USER_STORY
+from bdd_dsl.utils.caching import (
+    dump_pickle_cache,
+    get_cache_dir,
+    get_cache_key,
+    get_graph_digest,
+    get_shacl_digest,
+    get_sources_digest,
+    load_pickle_cache,
+)
+from bdd_dsl.utils.binary_graph import (
+    BinaryGraph,
+    SharedGraph,
+    attach_shared_graph,
+    get_graph_binary_data,
+    load_graph_binary,
+    save_graph_binary,
+)
+from bdd_dsl.utils.graph_index import GraphIndex, get_reachable_subgraph
+from bdd_dsl.utils.shacl import check_shacl_constraints_delta
 from bdd_dsl.models.urirefs import (
     URI_BDD_PRED_GIVEN,
     URI_BDD_PRED_HAS_VARIATION,
@@ -28,6 +50,8 @@ from bdd_dsl.models.urirefs import (
     URI_BDD_PRED_WHEN,
     URI_BDD_TYPE_CONFIG,
     URI_BDD_TYPE_SCENARIO,
+    URI_BDD_TYPE_SCENARIO_TMPL,
+    URI_BDD_TYPE_SCENARIO_VARIANT,
     URI_BDD_TYPE_SCENE_AGN,
     URI_BDD_TYPE_SCENE_OBJ,
     URI_BDD_PRED_HAS_SCENE,
@@ -35,6 +59,7 @@ from bdd_dsl.models.urirefs import (
     URI_BDD_PRED_OF_TMPL,
     URI_BDD_PRED_HAS_AC,
     URI_BDD_TYPE_SCENE_WS,
+    URI_BDD_TYPE_TASK_VAR,
     URI_BDD_TYPE_US,
     URI_BDD_TYPE_WHEN_BHV,
     URI_BHV_PRED_OF_BHV,
@@ -59,6 +84,17 @@ BDD_SHACL_URLS = {
     f"{URL_SECORO_MM}/acceptance-criteria/bdd/execution-context.shacl.ttl": "turtle",
     URL_MM_PYTHON_SHACL: "turtle",
 }
+# types of concepts matched by the 'Q_USER_STORY' query
+US_QUERY_TYPES = (
+    URI_BDD_TYPE_US,
+    URI_BDD_TYPE_SCENARIO_VARIANT,
+    URI_BDD_TYPE_SCENARIO_TMPL,
+    URI_BDD_TYPE_SCENARIO,
+    URI_BDD_TYPE_TASK_VAR,
+    URI_BDD_TYPE_SCENE_OBJ,
+    URI_BDD_TYPE_SCENE_WS,
+    URI_BDD_TYPE_SCENE_AGN,
+)
 Q_US_VAR = f"""
 SELECT DISTINCT ?us ?var WHERE {{
     ?us a {URI_BDD_TYPE_US.n3()} .
@@ -67,6 +103,21 @@ SELECT DISTINCT ?us ?var WHERE {{
 """
 
 
+CACHE_KEY_US_GRAPH = "us_graph"
+CACHE_KEY_SCR_VARS = "scenario_variants"
+BIN_DIR_FULL_GRAPH = "full"
+BIN_DIR_US_GRAPH = "user-stories"
+
+
+def get_us_loader_cache_path(model_sources: Iterable[str], shacl_check: bool) -> str:
+    """Path of the cached UserStoryLoader data for the models parsed from the given files or
+    URLs, keyed by the sources' content, see `get_sources_digest`, and the SHACL shapes
+    """
+    shacl_digest = get_shacl_digest(shacl_dict=BDD_SHACL_URLS) if shacl_check else "no-shacl"
+    cache_key = get_cache_key(get_sources_digest(sources=model_sources), shacl_digest)
+    return os.path.join(get_cache_dir("user-stories"), f"{cache_key}.pickle")
+
+
 class ScenarioModel(ModelBase):
     given: URIRef
     when: URIRef
@@ -215,15 +266,22 @@ class IHasClause(ModelBase):
         types: Optional[set[URIRef]] = None,
     ) -> None:
         super().__init__(node_id=node_id, graph=graph, types=types)
-        self.variables = set()
         self.scenario = scenario
+        self._fluent_loader = fluent_loader
+        self._bhv_loader = bhv_loader
+        self._init_clause_collections()
+
+    def _init_clause_collections(self) -> None:
+        self.variables = set()
         self.clauses = {}
-        self.clauses_by_role = {scenario.given: [], scenario.when: [], scenario.then: []}
+        self.clauses_by_role = {
+            self.scenario.given: [],
+            self.scenario.when: [],
+            self.scenario.then: [],
+        }
         self.exists_clauses = set()
         self._forall_id = None
         self._when_bhv_id = None
-        self._fluent_loader = fluent_loader
-        self._bhv_loader = bhv_loader
         self._path_to_clauses = {}
 
     def _process_iclause(self, clause: IClause):
@@ -498,18 +556,27 @@ class ScenarioVariantModel(IHasClause):
         self.tmpl = ModelBase(node_id=node_val, graph=full_graph)
         process_time_constraint_model(constraint=self.tmpl, graph=full_graph)
 
-        scene_id = us_graph.value(subject=var_id, predicate=URI_BDD_PRED_HAS_SCENE)
-        assert scene_id is not None and isinstance(scene_id, URIRef), (
-            f"ScenarioVariant '{var_id}' does not refer to a Scene"
-        )
-        self.scene = SceneModel(us_graph=us_graph, full_graph=full_graph, scene_id=scene_id)
-
         us_ids = list(us_graph.subjects(object=var_id, predicate=URI_BDD_PRED_HAS_AC))
         assert len(us_ids) == 1 and isinstance(us_ids[0], URIRef), (
             f"ScenarioVariant 'var_id' is not referred from exactly 1 UserStory, found: {us_ids}"
         )
         self.us_id = us_ids[0]
 
+        self._load_components(us_graph=us_graph, full_graph=full_graph)
+
+    def _load_components(self, us_graph: Graph, full_graph: Graph) -> None:
+        self.scene = self._load_scene(us_graph=us_graph, full_graph=full_graph)
+        self._load_variant_clauses(full_graph=full_graph)
+        self.task_variation = self._load_task_variation(us_graph=us_graph, full_graph=full_graph)
+
+    def _load_scene(self, us_graph: Graph, full_graph: Graph) -> SceneModel:
+        scene_id = us_graph.value(subject=self.id, predicate=URI_BDD_PRED_HAS_SCENE)
+        assert scene_id is not None and isinstance(scene_id, URIRef), (
+            f"ScenarioVariant '{self.id}' does not refer to a Scene"
+        )
+        return SceneModel(us_graph=us_graph, full_graph=full_graph, scene_id=scene_id)
+
+    def _load_variant_clauses(self, full_graph: Graph) -> None:
         self._tmpl_clauses = set()
         self._variant_clauses = set()
 
@@ -517,13 +584,12 @@ class ScenarioVariantModel(IHasClause):
         self._load_clauses_re(node_id=self.tmpl.id, graph=full_graph, has_clause_set=clause_set)
         self._load_clauses_re(node_id=self.id, graph=full_graph, has_clause_set=clause_set)
 
-        task_var_id = us_graph.value(subject=var_id, predicate=URI_BDD_PRED_HAS_VARIATION)
+    def _load_task_variation(self, us_graph: Graph, full_graph: Graph) -> TaskVariationModel:
+        task_var_id = us_graph.value(subject=self.id, predicate=URI_BDD_PRED_HAS_VARIATION)
         assert task_var_id is not None and isinstance(task_var_id, URIRef), (
-            f"ScenarioVariant '{var_id}' does not refer to a TaskVariation"
-        )
-        self.task_variation = TaskVariationModel(
-            us_graph=us_graph, full_graph=full_graph, task_var_id=task_var_id
+            f"ScenarioVariant '{self.id}' does not refer to a TaskVariation"
         )
+        return TaskVariationModel(us_graph=us_graph, full_graph=full_graph, task_var_id=task_var_id)
 
     @property
     def when_bhv_id(self) -> URIRef:
@@ -551,11 +617,179 @@ class ScenarioVariantModel(IHasClause):
         return whn_bhv
 
 
+# attributes of ScenarioVariantModel that are populated when loading the clause tree
+_LAZY_CLAUSE_ATTRS = frozenset(
+    (
+        "variables",
+        "clauses",
+        "clauses_by_role",
+        "exists_clauses",
+        "_forall_id",
+        "_when_bhv_id",
+        "_path_to_clauses",
+        "_tmpl_clauses",
+        "_variant_clauses",
+    )
+)
+
+
+class LazyScenarioVariantModel(ScenarioVariantModel):
+    """ScenarioVariantModel which loads its scene, clauses and task variation on first access.
+
+    Only the scenario, template and user story are loaded on construction. The graphs are kept
+    until all components are loaded with `load_all`. A pickled model has all components loaded
+    and no graphs, while the model itself is left unchanged.
+    """
+
+    _us_graph: Optional[Graph]
+    _full_graph: Optional[Graph]
+
+    def __init__(
+        self,
+        us_graph: Graph,
+        full_graph: Graph,
+        var_id: URIRef,
+        fluent_loaders: dict[URIRef, FluentClauseLoaderProtocol] = DEFAULT_FLUENT_LOADERS,
+        bhv_loaders: list[WhenBhvLoaderProtocol] = [load_bhv_pickplace],
+    ) -> None:
+        self._us_graph = us_graph
+        self._full_graph = full_graph
+        super().__init__(
+            us_graph=us_graph,
+            full_graph=full_graph,
+            var_id=var_id,
+            fluent_loaders=fluent_loaders,
+            bhv_loaders=bhv_loaders,
+        )
+
+    def _init_clause_collections(self) -> None:
+        # deferred to the first access of a clause attribute
+        return
+
+    def _load_components(self, us_graph: Graph, full_graph: Graph) -> None:
+        # deferred to the first access of a component
+        return
+
+    def __getattr__(self, name: str) -> Any:
+        # only called if the attribute is not yet set
+        if name == "scene":
+            self.scene = self._load_scene(
+                us_graph=self._get_us_graph(), full_graph=self._get_full_graph()
+            )
+            return self.scene
+
+        if name == "task_variation":
+            self.task_variation = self._load_task_variation(
+                us_graph=self._get_us_graph(), full_graph=self._get_full_graph()
+            )
+            return self.task_variation
+
+        if name in _LAZY_CLAUSE_ATTRS:
+            IHasClause._init_clause_collections(self)
+            self._load_variant_clauses(full_graph=self._get_full_graph())
+            return self.__dict__[name]
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _get_us_graph(self) -> Graph:
+        us_graph = self.__dict__.get("_us_graph", None)
+        assert us_graph is not None, f"LazyScenarioVariant '{self.id}': no user story graph"
+        return us_graph
+
+    def _get_full_graph(self) -> Graph:
+        full_graph = self.__dict__.get("_full_graph", None)
+        assert full_graph is not None, f"LazyScenarioVariant '{self.id}': no model graph"
+        return full_graph
+
+    def load_all(self) -> None:
+        """Load all components not yet accessed and release the references to the graphs"""
+        _ = self.scene
+        _ = self.task_variation
+        _ = self.clauses
+        self._us_graph = None
+        self._full_graph = None
+
+    def __getstate__(self) -> dict:
+        if self.__dict__.get("_us_graph", None) is None:
+            return self.__dict__.copy()
+
+        # load the remaining components into a copy, so that this model stays lazy
+        loaded = object.__new__(type(self))
+        loaded.__dict__.update(self.__dict__)
+        loaded.load_all()
+        return loaded.__dict__
+
+
+def _load_scenario_variant_binary(
+    us_data: tuple[dict, dict[str, np.ndarray]],
+    full_data: tuple[dict, dict[str, np.ndarray]],
+    variant_id: URIRef,
+) -> ScenarioVariantModel:
+    """Construct a scenario variant from the binary data of its subgraphs, e.g. in a worker
+    process, see `get_graph_binary_data`
+    """
+    us_meta, us_arrays = us_data
+    full_meta, full_arrays = full_data
+    return ScenarioVariantModel(
+        us_graph=BinaryGraph(meta=us_meta, arrays=us_arrays),
+        full_graph=BinaryGraph(meta=full_meta, arrays=full_arrays),
+        var_id=variant_id,
+    )
+
+
 class UserStoryLoader(object):
-    def __init__(self, graph: Graph, shacl_check=True, quiet=False) -> None:
+    _us_graph: Graph
+    _us_index: GraphIndex | BinaryGraph
+    _full_index: Optional[GraphIndex]
+    _full_index_graph: Optional[Graph]
+    _scenario_variants: dict[URIRef, ScenarioVariantModel]
+    _cache_path: Optional[str]
+    _model_sources: list[str]
+    _shacl_check: bool
+
+    def __init__(
+        self,
+        graph: Graph,
+        shacl_check=True,
+        quiet=False,
+        use_cache=False,
+        model_sources: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Validate the model graph and query user stories from it.
+
+        If `use_cache` is set, the validated user story graph and the scenario variants stored
+        via `save_cache()` are loaded from the user's cache directory, keyed by the files or
+        URLs in `model_sources`, which `graph` must have been parsed from, and the SHACL shapes.
+        Local files are checked by modification time & size, see `get_sources_digest`. A cache
+        hit skips both the SHACL validation and the user story query. Cached scenario variants
+        assume `full_graph` given to `load_scenario_variant` has the same content as `graph`.
+        """
+        self._scenario_variants = {}
+        self._cache_path = None
+        self._full_index = None
+        self._full_index_graph = None
+        self._model_sources = []
+        self._shacl_check = shacl_check
+
+        if use_cache:
+            assert model_sources is not None, "UserStoryLoader: caching requires 'model_sources'"
+            self._model_sources = list(model_sources)
+            self._cache_path = get_us_loader_cache_path(
+                model_sources=self._model_sources, shacl_check=shacl_check
+            )
+            if self._load_cache():
+                self._us_index = GraphIndex(self._us_graph)
+                return
+
         if shacl_check:
             check_shacl_constraints(graph=graph, shacl_dict=BDD_SHACL_URLS, quiet=quiet)
 
+        self._query_us_graph(graph=graph)
+
+        if use_cache:
+            self.save_cache()
+
+    def _query_us_graph(self, graph: Graph) -> None:
         q_result = graph.query(Q_USER_STORY)
         assert (
             q_result.type == "CONSTRUCT" and q_result.graph is not None and len(q_result.graph) > 0
@@ -566,18 +800,260 @@ class UserStoryLoader(object):
         for prefix, uri in graph.namespaces():
             self._us_graph.bind(prefix=prefix, namespace=uri, override=True)
 
+        self._us_index = GraphIndex(self._us_graph)
+
+    def _get_full_index(self, full_graph: Graph) -> GraphIndex | BinaryGraph:
+        """Index of the full model graph, rebuilt if a different graph is given.
+
+        Modifications of the graph are not detected, the index is dropped explicitly by
+        `add_models`, `load_all_scenario_variants` and `clear_full_index`.
+        """
+        if isinstance(full_graph, (GraphIndex, BinaryGraph)):
+            return full_graph
+
+        if self._full_index is None or self._full_index_graph is not full_graph:
+            self._full_index = GraphIndex(full_graph)
+            self._full_index_graph = full_graph
+        return self._full_index
+
+    def clear_full_index(self) -> None:
+        """Drop the index of the full model graph, e.g. after modifying the graph directly"""
+        self._full_index = None
+        self._full_index_graph = None
+
+    def add_models(
+        self,
+        full_graph: Graph,
+        delta_graph: Graph,
+        shacl_check=True,
+        quiet=False,
+        model_sources: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Update the loader after new models, e.g. execution or variation models, are added.
+
+        `full_graph` must already contain the triples of `delta_graph`. Only the nodes touched
+        by the new triples are validated, and the user story graph is only re-queried if the
+        new triples add BDD concepts relevant for the `Q_USER_STORY` query. Loaded scenario
+        variants are always discarded, since the new triples may change them. If the loader uses
+        a cache, `model_sources` should list the files or URLs of the new models, otherwise
+        caching is disabled. Caching is also disabled if a validated loader gets an unchecked
+        delta, so that cache entries are either fully validated or not at all.
+        """
+        if shacl_check:
+            check_shacl_constraints_delta(
+                graph=full_graph, delta_graph=delta_graph, shacl_dict=BDD_SHACL_URLS, quiet=quiet
+            )
+
+        if self._cache_path is not None:
+            if model_sources is None or (self._shacl_check and not shacl_check):
+                self._cache_path = None
+            else:
+                self._model_sources.extend(model_sources)
+                self._cache_path = get_us_loader_cache_path(
+                    model_sources=self._model_sources, shacl_check=self._shacl_check
+                )
+
         self._scenario_variants = {}
+        self.clear_full_index()
+
+        if any((None, RDF.type, us_type) in delta_graph for us_type in US_QUERY_TYPES):
+            self._query_us_graph(graph=full_graph)
 
-    def load_scenario_variant(self, full_graph: Graph, variant_id: URIRef) -> ScenarioVariantModel:
+    def save_binary(self, full_graph: Graph, dir_path: str) -> None:
+        """Write binary snapshots of the full model graph & the user story graph to a directory.
+
+        Loading them with `load_binary` skips parsing the model files, SHACL validation and the
+        user story query, e.g. for a fast start of behave worker processes.
+        """
+        save_graph_binary(graph=full_graph, dir_path=os.path.join(dir_path, BIN_DIR_FULL_GRAPH))
+        save_graph_binary(graph=self._us_graph, dir_path=os.path.join(dir_path, BIN_DIR_US_GRAPH))
+
+    @classmethod
+    def _from_binary_graph(cls, us_graph: BinaryGraph) -> "UserStoryLoader":
+        us_loader = cls.__new__(cls)
+        us_loader._scenario_variants = {}
+        us_loader._cache_path = None
+        us_loader._model_sources = []
+        us_loader._shacl_check = False
+        us_loader._full_index = None
+        us_loader._full_index_graph = None
+        us_loader._us_graph = us_graph
+        us_loader._us_index = us_graph
+        return us_loader
+
+    @classmethod
+    def load_binary(cls, dir_path: str, mmap: bool = True) -> tuple[Graph, "UserStoryLoader"]:
+        """Load the full model graph & a loader from snapshots written with `save_binary`.
+
+        Both graphs are read-only `BinaryGraph` instances, with the triple indices
+        memory-mapped if `mmap` is set.
+        """
+        full_graph = load_graph_binary(
+            dir_path=os.path.join(dir_path, BIN_DIR_FULL_GRAPH), mmap=mmap
+        )
+        us_graph = load_graph_binary(dir_path=os.path.join(dir_path, BIN_DIR_US_GRAPH), mmap=mmap)
+        return full_graph, cls._from_binary_graph(us_graph=us_graph)
+
+    def share_memory(self, full_graph: Graph) -> tuple[SharedGraph, SharedGraph]:
+        """Put the full model graph & the user story graph in shared memory blocks.
+
+        Worker processes attach to them by name with `attach_shared_memory`, so the models are
+        loaded & validated only once, and their indices stored only once. The caller owns the
+        returned blocks and should close them when the workers are done.
+        """
+        return SharedGraph(graph=full_graph), SharedGraph(graph=self._us_graph)
+
+    @classmethod
+    def attach_shared_memory(
+        cls, full_graph_name: str, us_graph_name: str
+    ) -> tuple[Graph, "UserStoryLoader"]:
+        """Attach to the shared memory blocks created with `share_memory`"""
+        full_graph = attach_shared_graph(name=full_graph_name)
+        us_graph = attach_shared_graph(name=us_graph_name)
+        return full_graph, cls._from_binary_graph(us_graph=us_graph)
+
+    def _load_cache(self) -> bool:
+        assert self._cache_path is not None, "UserStoryLoader: no cache path"
+        cache_data = load_pickle_cache(cache_path=self._cache_path)
+        if not isinstance(cache_data, dict):
+            return False
+
+        us_graph = cache_data.get(CACHE_KEY_US_GRAPH, None)
+        scr_vars = cache_data.get(CACHE_KEY_SCR_VARS, None)
+        if not isinstance(us_graph, Graph) or not isinstance(scr_vars, dict):
+            return False
+
+        self._us_graph = us_graph
+        self._scenario_variants = scr_vars
+        return True
+
+    def save_cache(self) -> None:
+        """Store the user story graph & the scenario variants loaded so far in the cache.
+
+        Does nothing if the loader was not created with `use_cache=True`.
+        """
+        if self._cache_path is None:
+            return
+
+        dump_pickle_cache(
+            cache_path=self._cache_path,
+            data={
+                CACHE_KEY_US_GRAPH: self._us_graph,
+                CACHE_KEY_SCR_VARS: self._scenario_variants,
+            },
+        )
+
+    def load_scenario_variant(
+        self, full_graph: Graph, variant_id: URIRef, lazy: bool = False
+    ) -> ScenarioVariantModel:
+        """Load a scenario variant, or return the one loaded previously.
+
+        If `lazy` is set, a `LazyScenarioVariantModel` is returned, which only loads the scene,
+        clauses and task variation when they are first accessed.
+        """
         if variant_id in self._scenario_variants:
             return self._scenario_variants[variant_id]
 
-        var_model = ScenarioVariantModel(
-            us_graph=self._us_graph, full_graph=full_graph, var_id=variant_id
+        var_model_cls = LazyScenarioVariantModel if lazy else ScenarioVariantModel
+        var_model = var_model_cls(
+            us_graph=self._us_index,
+            full_graph=self._get_full_index(full_graph=full_graph),
+            var_id=variant_id,
         )
         self._scenario_variants[variant_id] = var_model
         return var_model
 
+    def get_variant_subgraphs(self, full_graph: Graph, variant_id: URIRef) -> tuple[Graph, Graph]:
+        """Extract the parts of the user story graph & the full graph needed to load a variant.
+
+        Both subgraphs consist of the triples reachable from the variant, plus the link from
+        its user story in the user story graph.
+        """
+        us_subgraph = get_reachable_subgraph(graph=self._us_index, root_ids=[variant_id])
+        for us_id in self._us_index.subjects(predicate=URI_BDD_PRED_HAS_AC, object=variant_id):
+            us_subgraph.add((us_id, URI_BDD_PRED_HAS_AC, variant_id))
+
+        full_subgraph = get_reachable_subgraph(
+            graph=self._get_full_index(full_graph=full_graph), root_ids=[variant_id]
+        )
+        return us_subgraph, full_subgraph
+
+    def get_user_story_digest(self, full_graph: Graph, us_id: URIRef) -> str:
+        """Content hash of the models contributing to a user story's features.
+
+        Covers the triples reachable from each of the user story's scenario variants, i.e. their
+        templates, clauses, task variations and scenes, see `get_variant_subgraphs`.
+        """
+        us_var_dict = self.get_us_scenario_variants()
+        assert us_id in us_var_dict, f"get_user_story_digest: unknown user story '{us_id}'"
+
+        us_subgraph = Graph()
+        for var_id in us_var_dict[us_id]:
+            var_us_subgraph, var_full_subgraph = self.get_variant_subgraphs(
+                full_graph=full_graph, variant_id=var_id
+            )
+            us_subgraph += var_us_subgraph
+            us_subgraph += var_full_subgraph
+
+        return get_graph_digest(graph=us_subgraph)
+
+    def load_all_scenario_variants(
+        self,
+        full_graph: Graph,
+        workers: Optional[int] = None,
+        var_ids: Optional[Iterable[URIRef]] = None,
+    ) -> dict[URIRef, ScenarioVariantModel]:
+        """Load all scenario variants of all user stories, using a pool of `workers` processes.
+
+        Each worker receives the binary data of the subgraphs relevant for one variant, see
+        `get_variant_subgraphs` and `get_graph_binary_data`. If `workers` is None, the number of
+        CPUs is used. If `var_ids` is specified, only these variants are loaded. Returns the
+        loaded variants, which are also stored for `load_scenario_variant`. The index of
+        `full_graph` is rebuilt, so triples added directly to the graph are taken into account.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        assert workers > 0, f"UserStoryLoader: invalid number of workers: {workers}"
+        # index the graph's current content
+        self.clear_full_index()
+
+        if var_ids is None:
+            var_ids = set()
+            for us_var_ids in self.get_us_scenario_variants().values():
+                var_ids.update(us_var_ids)
+        else:
+            var_ids = set(var_ids)
+        to_load = [var_id for var_id in var_ids if var_id not in self._scenario_variants]
+
+        if workers == 1 or len(to_load) < 2:
+            for var_id in to_load:
+                self.load_scenario_variant(full_graph=full_graph, variant_id=var_id)
+            return {var_id: self._scenario_variants[var_id] for var_id in var_ids}
+
+        # binary data keeps the blank node IDs & namespace bindings of the models
+        us_data_list = []
+        full_data_list = []
+        for var_id in to_load:
+            us_subgraph, full_subgraph = self.get_variant_subgraphs(
+                full_graph=full_graph, variant_id=var_id
+            )
+            us_data_list.append(get_graph_binary_data(graph=us_subgraph))
+            full_data_list.append(get_graph_binary_data(graph=full_subgraph))
+
+        workers = min(workers, len(to_load))
+        chunksize = max(1, len(to_load) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for var_model in executor.map(
+                _load_scenario_variant_binary,
+                us_data_list,
+                full_data_list,
+                to_load,
+                chunksize=chunksize,
+            ):
+                self._scenario_variants[var_model.id] = var_model
+
+        return {var_id: self._scenario_variants[var_id] for var_id in var_ids}
+
     def get_us_scenario_variants(self) -> dict[URIRef, set[URIRef]]:
         """
         returns { <UserStory URI> : [ <list of ScenarioVariant URIs> ] }
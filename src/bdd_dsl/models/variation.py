@@ -1,10 +1,21 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
-from typing import Any, Iterable, Iterator, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional, Protocol
 import itertools
+import math
 from rdflib import BNode, Graph, URIRef, Literal
 from rdf_utils.collection import load_list_re
 from rdf_utils.models.common import ModelBase, get_node_types
 from bdd_dsl.models.namespace import NS_MM_BDD
+from bdd_dsl.utils.combinatorics import (
+    rank_combination,
+    rank_combination_with_replacement,
+    rank_permutation,
+    rank_product,
+    unrank_combination,
+    unrank_combination_with_replacement,
+    unrank_permutation,
+    unrank_product,
+)
 from bdd_dsl.models.urirefs import (
     URI_BDD_PRED_ELEMS,
     URI_BDD_PRED_OF_SETS,
@@ -92,7 +103,8 @@ class SetEnumerationModel(ModelBase):
                 f"SetEnumeration: '{self.id}': 'length' property is not a positive integer: {length}"
             )
 
-        assert length <= len(from_list), (
+        # with repetition, sequences can be longer than the set
+        assert rep_allowed or length <= len(from_list), (
             f"SetEnumeration '{self.id}': 'length'(={length}) > set size(={len(from_list)})"
         )
         self.set_attr(key=URI_BDD_PRED_LENGTH, val=length)
@@ -113,11 +125,90 @@ class SetEnumerationModel(ModelBase):
             return itertools.combinations(from_list, r=length)
 
         if self.enumeration_type == URI_BDD_TYPE_PERMUTATION:
-            # repetition is not handled by itertools for permutations
+            if rep_allowed:
+                # permutations with repetition are all sequences of the given length
+                return itertools.product(from_list, repeat=length)
             return itertools.permutations(from_list, r=length)
 
         raise RuntimeError(f"SetEnumeration.enumerate: '{self.id}' has no handled enumeration type")
 
+    def count(self) -> int:
+        """Number of elements produced by `enumerate()`, computed without enumerating"""
+        from_list = self.get_attr(key=URI_BDD_PRED_FROM)
+        length = self.get_attr(key=URI_BDD_PRED_LENGTH)
+        rep_allowed = self.get_attr(key=URI_BDD_PRED_REP_ALLOWED)
+        assert (
+            isinstance(from_list, list)
+            and isinstance(length, int)
+            and isinstance(rep_allowed, bool)
+        ), f"SetEnumeration.count: '{self.id}' does not have expected attributes"
+
+        if self.enumeration_type == URI_BDD_TYPE_COMBINATION:
+            if rep_allowed:
+                return math.comb(len(from_list) + length - 1, length)
+            return math.comb(len(from_list), length)
+
+        if self.enumeration_type == URI_BDD_TYPE_PERMUTATION:
+            if rep_allowed:
+                return len(from_list) ** length
+            return math.perm(len(from_list), length)
+
+        raise RuntimeError(f"SetEnumeration.count: '{self.id}' has no handled enumeration type")
+
+    def unrank(self, k: int) -> tuple:
+        """The k-th element produced by `enumerate()`, computed without enumerating"""
+        from_list = self.get_attr(key=URI_BDD_PRED_FROM)
+        length = self.get_attr(key=URI_BDD_PRED_LENGTH)
+        rep_allowed = self.get_attr(key=URI_BDD_PRED_REP_ALLOWED)
+        assert (
+            isinstance(from_list, list)
+            and isinstance(length, int)
+            and isinstance(rep_allowed, bool)
+        ), f"SetEnumeration.unrank: '{self.id}' does not have expected attributes"
+
+        if self.enumeration_type == URI_BDD_TYPE_COMBINATION:
+            if rep_allowed:
+                indices = unrank_combination_with_replacement(n=len(from_list), r=length, k=k)
+            else:
+                indices = unrank_combination(n=len(from_list), r=length, k=k)
+        elif self.enumeration_type == URI_BDD_TYPE_PERMUTATION:
+            if rep_allowed:
+                indices = unrank_product(sizes=[len(from_list)] * length, k=k)
+            else:
+                indices = unrank_permutation(n=len(from_list), r=length, k=k)
+        else:
+            raise RuntimeError(
+                f"SetEnumeration.unrank: '{self.id}' has no handled enumeration type"
+            )
+
+        return tuple(from_list[idx] for idx in indices)
+
+    def rank(self, values: Iterable[Any]) -> int:
+        """Position of the given element in the sequence produced by `enumerate()`"""
+        from_list = self.get_attr(key=URI_BDD_PRED_FROM)
+        rep_allowed = self.get_attr(key=URI_BDD_PRED_REP_ALLOWED)
+        assert isinstance(from_list, list) and isinstance(rep_allowed, bool), (
+            f"SetEnumeration.rank: '{self.id}' does not have expected attributes"
+        )
+
+        indices = []
+        for val in values:
+            if val not in from_list:
+                raise ValueError(f"SetEnumeration.rank: '{val}' not in set of '{self.id}'")
+            indices.append(from_list.index(val))
+
+        if self.enumeration_type == URI_BDD_TYPE_COMBINATION:
+            if rep_allowed:
+                return rank_combination_with_replacement(n=len(from_list), indices=indices)
+            return rank_combination(n=len(from_list), indices=indices)
+
+        if self.enumeration_type == URI_BDD_TYPE_PERMUTATION:
+            if rep_allowed:
+                return rank_product(sizes=[len(from_list)] * len(indices), indices=indices)
+            return rank_permutation(n=len(from_list), indices=indices)
+
+        raise RuntimeError(f"SetEnumeration.rank: '{self.id}' has no handled enumeration type")
+
 
 class TaskVariationModel(ModelBase):
     task_id: URIRef
@@ -222,62 +313,215 @@ class TaskVariationModel(ModelBase):
         return var_list
 
 
-def get_task_variations(task_var: TaskVariationModel) -> tuple[list[URIRef], list[Iterable[Any]]]:
-    var_uri_list = task_var.get_attr(key=URI_BDD_PRED_VAR_LIST)
-    assert isinstance(var_uri_list, list), (
-        f"TaskVariation '{task_var.id}' does not have a list of variables as attr"
-    )
+def _iter_product_re(
+    iter_factories: list[Callable[[], Iterable[Any]]], idx: int, prefix: tuple
+) -> Iterator[tuple]:
+    """Cartesian product in the same order as `itertools.product`, but without storing the
+    values of the input iterables, which are recreated for each combination of outer values.
+    """
+    if idx == len(iter_factories) - 1:
+        for val in iter_factories[idx]():
+            yield prefix + (val,)
+        return
+
+    for val in iter_factories[idx]():
+        yield from _iter_product_re(
+            iter_factories=iter_factories, idx=idx + 1, prefix=prefix + (val,)
+        )
+
+
+class TaskVariationIterable(object):
+    """Re-iterable, lazily evaluated collection of the values of a variation's variables.
 
-    if URI_BDD_TYPE_CART_PRODUCT in task_var.types:
-        var_value_sets = task_var.get_attr(key=URI_BDD_PRED_OF_SETS)
+    Values are produced one set at a time, so iterating over large combinatorial variations
+    requires constant memory. `len()` is computed combinatorially without iterating, and the
+    k-th value set can be accessed directly with `unrank(k)` or indexing.
+    """
+
+    _task_var: TaskVariationModel
+    _iter_factories: list[Callable[[], Iterable[Any]]]
+    _set_sizes: list[int]
+    _set_unrankers: list[Callable[[int], Any]]
+    _set_rankers: list[Callable[[Any], int]]
+    _count: int
+
+    def __init__(self, task_var: TaskVariationModel) -> None:
+        self._task_var = task_var
+        self._iter_factories = []
+        self._set_sizes = []
+        self._set_unrankers = []
+        self._set_rankers = []
+
+        if URI_BDD_TYPE_CART_PRODUCT in task_var.types:
+            self._init_cart_product()
+            return
+
+        if URI_BDD_TYPE_TABLE_VAR in task_var.types:
+            uri_rows = task_var.get_attr(key=URI_BDD_PRED_ROWS)
+            assert isinstance(uri_rows, list), (
+                f"TaskVariation {task_var.id}: table rows are not a list: {uri_rows}"
+            )
+            self._count = len(uri_rows)
+            return
+
+        raise RuntimeError(f"TaskVariation '{task_var.id}' has unhandled types: {task_var.types}")
+
+    def _init_cart_product(self) -> None:
+        var_uri_list = self._task_var.get_attr(key=URI_BDD_PRED_VAR_LIST)
+        var_value_sets = self._task_var.get_attr(key=URI_BDD_PRED_OF_SETS)
         assert isinstance(var_value_sets, list), (
-            f"TaskVariation '{task_var.id}' does not have a list of variable values as attr"
+            f"TaskVariation '{self._task_var.id}' does not have a list of variable values as attr"
         )
-        assert len(var_uri_list) == len(var_value_sets), (
-            f"TaskVariation '{task_var.id}': number of varibles doesn't match set of values"
+        assert isinstance(var_uri_list, list) and len(var_uri_list) == len(var_value_sets), (
+            f"TaskVariation '{self._task_var.id}': number of varibles doesn't match set of values"
         )
 
-        uri_iterables = []
         for set_data in var_value_sets:
             if isinstance(set_data, URIRef):
-                if set_data in task_var.const_sets:
-                    uri_iterables.append(list(task_var.const_sets[set_data]))
-                elif set_data in task_var.set_enums:
-                    set_data_vals = list(task_var.set_enums[set_data].enumerate())
-                    uri_iterables.append(set_data_vals)
+                if set_data in self._task_var.const_sets:
+                    self._add_list_set(set_vals=self._task_var.const_sets[set_data])
+                elif set_data in self._task_var.set_enums:
+                    set_enum = self._task_var.set_enums[set_data]
+                    self._iter_factories.append(set_enum.enumerate)
+                    self._set_sizes.append(set_enum.count())
+                    self._set_unrankers.append(set_enum.unrank)
+                    self._set_rankers.append(set_enum.rank)
                 else:
                     raise RuntimeError(
-                        f"unhandled set URI '{set_data}' for variation '{task_var.id}'"
+                        f"unhandled set URI '{set_data}' for variation '{self._task_var.id}'"
                     )
             elif isinstance(set_data, list):
-                # list
-                uri_iterables.append(set_data)
+                self._add_list_set(set_vals=set_data)
             else:
                 raise RuntimeError(
-                    f"TaskVariation {task_var.id}: sets for cartesian product not list or URIRef: {set_data}"
+                    f"TaskVariation {self._task_var.id}: sets for cartesian product not list or"
+                    f" URIRef: {set_data}"
                 )
 
-        return var_uri_list, list(itertools.product(*uri_iterables))
+        self._count = math.prod(self._set_sizes)
+
+    def _add_list_set(self, set_vals: list[Any]) -> None:
+        self._iter_factories.append(lambda: set_vals)
+        self._set_sizes.append(len(set_vals))
+        self._set_unrankers.append(set_vals.__getitem__)
+        self._set_rankers.append(set_vals.index)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        if URI_BDD_TYPE_TABLE_VAR in self._task_var.types:
+            return self._iter_table_rows()
+
+        if self._count == 0:
+            return iter(())
+
+        if len(self._iter_factories) == 0:
+            return iter(((),))
+
+        return _iter_product_re(iter_factories=self._iter_factories, idx=0, prefix=())
+
+    def _iter_table_rows(self) -> Iterator[list]:
+        for row in self._task_var.get_attr(key=URI_BDD_PRED_ROWS):
+            yield self._get_table_row(row=row)
+
+    def _get_table_row(self, row: list) -> list:
+        # handle sets in row values
+        const_sets = self._task_var.const_sets
+        return [
+            const_sets[cell_val]
+            if isinstance(cell_val, URIRef) and cell_val in const_sets
+            else cell_val
+            for cell_val in row
+        ]
+
+    @property
+    def value_set_sizes(self) -> list[int]:
+        """Number of values of each variable in a Cartesian product variation"""
+        assert URI_BDD_TYPE_CART_PRODUCT in self._task_var.types, (
+            f"TaskVariation '{self._task_var.id}': value set sizes only defined for Cartesian"
+            " products"
+        )
+        return list(self._set_sizes)
+
+    def from_indices(self, indices: Iterable[int]) -> tuple:
+        """Value set of a Cartesian product variation from the indices of each variable's value"""
+        return tuple(unranker(idx) for unranker, idx in zip(self._set_unrankers, indices))
+
+    def __getitem__(self, k: int) -> Any:
+        if k < 0:
+            k += self._count
+        return self.unrank(k)
+
+    def unrank(self, k: int) -> Any:
+        """The k-th value set in iteration order, computed in time linear to the variables"""
+        if k < 0 or k >= self._count:
+            raise IndexError(
+                f"TaskVariation '{self._task_var.id}': index {k} out of range for"
+                f" {self._count} variations"
+            )
 
-    if URI_BDD_TYPE_TABLE_VAR in task_var.types:
-        uri_rows = task_var.get_attr(key=URI_BDD_PRED_ROWS)
-        assert isinstance(uri_rows, list), (
-            f"TaskVariation {task_var.id}: table rows are not a list: {uri_rows}"
+        if URI_BDD_TYPE_TABLE_VAR in self._task_var.types:
+            return self._get_table_row(row=self._task_var.get_attr(key=URI_BDD_PRED_ROWS)[k])
+
+        return self.from_indices(unrank_product(sizes=self._set_sizes, k=k))
+
+    def rank(self, values: Iterable[Any]) -> int:
+        """Position of the given value set in iteration order"""
+        if URI_BDD_TYPE_TABLE_VAR in self._task_var.types:
+            values = list(values)
+            for k, row in enumerate(self._iter_table_rows()):
+                if row == values:
+                    return k
+            raise ValueError(f"TaskVariation '{self._task_var.id}': values not in table: {values}")
+
+        values = tuple(values)
+        assert len(values) == len(self._set_rankers), (
+            f"TaskVariation '{self._task_var.id}': expected {len(self._set_rankers)} values:"
+            f" {values}"
         )
-        # handle sets in row values:
-        for row_i, row in enumerate(uri_rows):
-            for col_i, cell_val in enumerate(row):
-                if not isinstance(cell_val, URIRef):
-                    continue
-                if cell_val not in task_var.const_sets:
-                    continue
-                uri_rows[row_i][col_i] = task_var.const_sets[cell_val]
-        return var_uri_list, uri_rows
+        indices = [ranker(val) for ranker, val in zip(self._set_rankers, values)]
+        return rank_product(sizes=self._set_sizes, indices=indices)
+
+
+def iter_task_variations(
+    task_var: TaskVariationModel,
+) -> tuple[list[URIRef], TaskVariationIterable]:
+    """Return the variation's variables and a lazily evaluated iterable of their value sets"""
+    var_uri_list = task_var.get_attr(key=URI_BDD_PRED_VAR_LIST)
+    assert isinstance(var_uri_list, list), (
+        f"TaskVariation '{task_var.id}' does not have a list of variables as attr"
+    )
+    return var_uri_list, TaskVariationIterable(task_var=task_var)
+
+
+class TaskVariationsGetterProtocol(Protocol):
+    """Protocol for functions that return a variation's variables and their value sets."""
+
+    def __call__(self, task_var: TaskVariationModel) -> tuple[list[URIRef], Iterable[Any]]: ...
+
+
+def count_task_variations(task_var: TaskVariationModel) -> int:
+    """Number of value sets of a variation, computed without enumerating them"""
+    return len(TaskVariationIterable(task_var=task_var))
+
+
+def get_task_variations(task_var: TaskVariationModel) -> tuple[list[URIRef], list[Iterable[Any]]]:
+    var_uri_list, var_vals_iter = iter_task_variations(task_var=task_var)
+    return var_uri_list, list(var_vals_iter)
+
+
+def iter_task_var_dicts(task_var: TaskVariationModel) -> Iterator[dict[URIRef, Any]]:
+    """Generate variations as dictionaries mapping variables to their corresponding values"""
+    var_uri_list, var_vals_iter = iter_task_variations(task_var=task_var)
+    for val_set in var_vals_iter:
+        yield dict(zip(var_uri_list, val_set))
 
-    raise RuntimeError(f"TaskVariation '{task_var.id}' has unhandled types: {task_var.types}")
 
+def get_task_var_dicts(task_var: TaskVariationModel) -> Iterator[dict[URIRef, Any]]:
+    """Return variations as dictionaries mapping variables to their corresponding values.
 
-def get_task_var_dicts(task_var: TaskVariationModel) -> list[dict[URIRef, Any]]:
-    """Return list of variations as dictionaries mapping variables to their corresponding values"""
-    var_uri_list, var_value_sets = get_task_variations(task_var=task_var)
-    return [dict(zip(var_uri_list, val_set)) for val_set in var_value_sets]
+    Variations are generated lazily by `iter_task_var_dicts`, convert to a list if they need to
+    be iterated more than once.
+    """
+    return iter_task_var_dicts(task_var=task_var)
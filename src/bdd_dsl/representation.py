@@ -19,6 +19,8 @@ from bdd_dsl.models.urirefs import (
     URI_BDD_TYPE_CONFIG,
     URI_BDD_TYPE_IS_HELD,
     URI_BDD_TYPE_LOCATED_AT,
+    URI_BDD_TYPE_MOVE_SAFE,
+    URI_BDD_TYPE_SORTED,
     URI_BDD_TYPE_STR_TMPL,
     URI_BHV_PRED_TARGET_AGN,
     URI_BHV_PRED_TARGET_OBJ,
@@ -32,6 +34,7 @@ from bdd_dsl.models.urirefs import (
     URI_TIME_TYPE_DURING,
 )
 from bdd_dsl.models.user_story import ScenarioModel, ScenarioVariantModel
+from bdd_dsl.utils.uri import get_uri_str
 
 
 def get_clause_role_rep(scenario: ScenarioModel, clause: IClause) -> str:
@@ -46,7 +49,7 @@ def get_clause_role_rep(scenario: ScenarioModel, clause: IClause) -> str:
 
 def var_val_to_str(var_val: Any, ns_manager: Optional[NamespaceManager] = None) -> str:
     if isinstance(var_val, URIRef):
-        return var_val.n3(namespace_manager=ns_manager)
+        return get_uri_str(uri=var_val, ns_manager=ns_manager)
 
     if isinstance(var_val, str):
         return var_val
@@ -58,7 +61,7 @@ def var_val_to_str(var_val: Any, ns_manager: Optional[NamespaceManager] = None)
         uri_str_list = []
         for uri in var_val:
             assert isinstance(uri, URIRef), f"not an Iterable of URIRef: {var_val}"
-            uri_str_list.append(uri.n3(namespace_manager=ns_manager))
+            uri_str_list.append(get_uri_str(uri=uri, ns_manager=ns_manager))
 
         return str(uri_str_list)
 
@@ -230,7 +233,7 @@ class ClauseRepBuilder:
 
         tmpl = self._clause_templates[clause.id]
         if tmpl is None:
-            clause_rep = clause.id.n3(ns_manager)
+            clause_rep = get_uri_str(uri=clause.id, ns_manager=ns_manager)
         else:
             clause_rep = tmpl.render(var_values=val_dict, ns_manager=ns_manager)
 
@@ -266,7 +269,7 @@ class ScenarioVariantRep:
         val_dict: dict[URIRef, Any],
         ns_manager: Optional[NamespaceManager] = None,
     ) -> None:
-        self.variant_rep = scr_var.id.n3(ns_manager)
+        self.variant_rep = get_uri_str(uri=scr_var.id, ns_manager=ns_manager)
         self.bhv_rep = clause_rep_builder.render_when_bhv_clause(
             clause=scr_var.when_bhv_model,
             val_dict=val_dict,
@@ -405,6 +408,52 @@ def get_tmpl_fc_is_held(model: ModelBase, **kwargs) -> Optional[VariableStrTempl
     )
 
 
+def get_tmpl_fc_move_safe(model: ModelBase, **kwargs) -> Optional[VariableStrTemplate]:
+    if not isinstance(model, FluentClauseModel):
+        return None
+
+    if URI_BDD_TYPE_MOVE_SAFE not in model.types:
+        return None
+
+    assert URI_BDD_PRED_REF_AGN in model.variable_by_role, (
+        f"MoveSafe fluent '{model.id}' does not have 'ref-agn' property"
+    )
+    agn_id = model.variable_by_role[URI_BDD_PRED_REF_AGN][0]
+    assert isinstance(agn_id, URIRef), (
+        f"MoveSafe fluent '{model.id}' does not have URI 'ref-agn' property"
+    )
+
+    return VariableStrTemplate(tmpl_str='"{agn}" moves safely', var_map={agn_id: "agn"})
+
+
+def get_tmpl_fc_sorted(model: ModelBase, **kwargs) -> Optional[VariableStrTemplate]:
+    if not isinstance(model, FluentClauseModel):
+        return None
+
+    if URI_BDD_TYPE_SORTED not in model.types:
+        return None
+
+    assert URI_BDD_PRED_REF_OBJ in model.variable_by_role, (
+        f"SortedInto fluent '{model.id}' does not have 'ref-obj' property"
+    )
+    obj_id = model.variable_by_role[URI_BDD_PRED_REF_OBJ][0]
+    assert isinstance(obj_id, URIRef), (
+        f"SortedInto fluent '{model.id}' does not have URI 'ref-obj' property"
+    )
+
+    assert URI_BDD_PRED_REF_WS in model.variable_by_role, (
+        f"SortedInto fluent '{model.id}' does not have 'ref-ws' property"
+    )
+    ws_id = model.variable_by_role[URI_BDD_PRED_REF_WS][0]
+    assert isinstance(ws_id, URIRef), (
+        f"SortedInto fluent '{model.id}' does not have URI 'ref-ws' property"
+    )
+
+    return VariableStrTemplate(
+        tmpl_str='"{objs}" are sorted into "{ws}"', var_map={obj_id: "objs", ws_id: "ws"}
+    )
+
+
 def get_tmpl_fc_config(model: ModelBase, **kwargs) -> Optional[VariableStrTemplate]:
     if not isinstance(model, FluentClauseModel):
         return None
@@ -425,9 +474,10 @@ def get_tmpl_fc_config(model: ModelBase, **kwargs) -> Optional[VariableStrTempla
     cfg_name = model.get_attr(URI_BDD_PRED_CFG_NAME)
     target_uri = model.get_attr(URI_BDD_PRED_CFG_TARGET)
     assert isinstance(target_uri, URIRef)
+    target_str = get_uri_str(uri=target_uri, ns_manager=ns_manager)
 
     return VariableStrTemplate(
-        tmpl_str=f'"{target_uri.n3(ns_manager)}" has config "{cfg_name}" = "{{cfg_val}}"',
+        tmpl_str=f'"{target_str}" has config "{cfg_name}" = "{{cfg_val}}"',
         var_map={cfg_var_id: "cfg_val"},
     )
 
@@ -0,0 +1,431 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Compact binary snapshots of parsed graphs, which can be loaded without parsing.
+
+A snapshot contains a term table and three sorted NumPy arrays of triple keys, one per index
+order (SPO, POS, OSP). Each key packs the three term IDs of a triple into a single 64-bit
+integer, so that all triples matching a pattern with bound leading terms form a contiguous
+range, found by binary search. The term table is also stored in arrays: the term kinds, a
+UTF-8 blob of the term strings and the end offsets of each term's value, datatype & language
+in the blob. Term IDs follow the sort order of the encoded terms, so a term's ID is also
+found by binary search. All arrays can be memory-mapped from files, or shared between
+processes in a shared memory block, and terms are only decoded when they are accessed.
+"""
+
+import json
+import os
+import sys
+from bisect import bisect_left
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Generator, Optional
+import numpy as np
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.paths import Path
+from rdflib.term import Node
+
+
+BIN_GRAPH_VERSION = 2
+BIN_GRAPH_META_FILE = "meta.json"
+# arrays of a snapshot & their types, each saved to '<name>.npy'
+BIN_GRAPH_ARRAYS = {
+    "kinds": np.int8,
+    "ends": np.int64,
+    "strings": np.uint8,
+    "spo": np.int64,
+    "pos": np.int64,
+    "osp": np.int64,
+}
+# term IDs are packed into an int64 key, i.e. 3 x 21 bits
+BIN_GRAPH_MAX_TERMS = 2**21
+
+_TERM_URI = 0
+_TERM_BNODE = 1
+_TERM_LITERAL = 2
+_STR_ENCODING = "utf-8"
+_STR_ERRORS = "surrogatepass"
+
+
+def _encode_str(value: str) -> bytes:
+    return value.encode(_STR_ENCODING, _STR_ERRORS)
+
+
+def _encode_term(term: Node) -> tuple[int, bytes, bytes, bytes]:
+    """(kind, value, datatype, language) of a term, which also defines the order of term IDs"""
+    if isinstance(term, URIRef):
+        return (_TERM_URI, _encode_str(term), b"", b"")
+    if isinstance(term, BNode):
+        return (_TERM_BNODE, _encode_str(term), b"", b"")
+    if isinstance(term, Literal):
+        datatype = b"" if term.datatype is None else _encode_str(term.datatype)
+        lang = b"" if term.language is None else _encode_str(term.language)
+        return (_TERM_LITERAL, _encode_str(term), datatype, lang)
+    raise ValueError(f"binary graph: unhandled term type '{type(term)}': {term}")
+
+
+def _decode_term(encoded: tuple[int, bytes, bytes, bytes]) -> Node:
+    kind = encoded[0]
+    value, datatype, lang = [field.decode(_STR_ENCODING, _STR_ERRORS) for field in encoded[1:]]
+    if kind == _TERM_URI:
+        return URIRef(value)
+    if kind == _TERM_BNODE:
+        return BNode(value)
+    if kind == _TERM_LITERAL:
+        # language-tagged literals can't also be given a datatype
+        if len(lang) > 0:
+            return Literal(value, lang=lang)
+        return Literal(value, datatype=URIRef(datatype) if len(datatype) > 0 else None)
+    raise ValueError(f"binary graph: unhandled term kind: {kind}")
+
+
+def get_graph_binary_data(graph: Graph) -> tuple[dict, dict[str, np.ndarray]]:
+    """Metadata & arrays of the term table and sorted triple keys of each index order.
+
+    Both can be pickled, e.g. to send a graph to another process, which can access it as
+    `BinaryGraph(meta=meta, arrays=arrays)` with the exact same terms and namespace bindings.
+    """
+    term_ids: dict[Node, int] = {}
+    id_triples = []
+    for triple in graph.triples((None, None, None)):
+        id_triple = []
+        for term in triple:
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = len(term_ids)
+                term_ids[term] = term_id
+            id_triple.append(term_id)
+        id_triples.append(id_triple)
+
+    num_terms = len(term_ids)
+    if num_terms > BIN_GRAPH_MAX_TERMS:
+        raise ValueError(
+            f"binary graph: {num_terms} terms exceeds the maximum of {BIN_GRAPH_MAX_TERMS}"
+        )
+
+    # renumber terms in the order of their encoding, for lookups by binary search
+    encoded_terms = [_encode_term(term) for term in term_ids]
+    sorted_ids = sorted(range(num_terms), key=encoded_terms.__getitem__)
+    new_ids = np.empty(num_terms, dtype=np.int64)
+    new_ids[sorted_ids] = np.arange(num_terms, dtype=np.int64)
+
+    kinds = np.empty(num_terms, dtype=np.int8)
+    ends = np.empty((num_terms, 3), dtype=np.int64)
+    str_parts = []
+    offset = 0
+    for new_id, old_id in enumerate(sorted_ids):
+        kind, value, datatype, lang = encoded_terms[old_id]
+        kinds[new_id] = kind
+        for field_idx, field in enumerate((value, datatype, lang)):
+            offset += len(field)
+            ends[new_id, field_idx] = offset
+            str_parts.append(field)
+
+    ids = new_ids[np.array(id_triples, dtype=np.int64).reshape(-1, 3)]
+    s_ids, p_ids, o_ids = ids[:, 0], ids[:, 1], ids[:, 2]
+    sq_terms = num_terms * num_terms
+    # duplicate triples may come from different contexts of a Dataset
+    arrays = {
+        "kinds": kinds,
+        "ends": ends,
+        "strings": np.frombuffer(b"".join(str_parts), dtype=np.uint8),
+        "spo": np.unique(s_ids * sq_terms + p_ids * num_terms + o_ids),
+        "pos": np.unique(p_ids * sq_terms + o_ids * num_terms + s_ids),
+        "osp": np.unique(o_ids * sq_terms + s_ids * num_terms + p_ids),
+    }
+    meta = {
+        "version": BIN_GRAPH_VERSION,
+        "namespaces": [(prefix, str(uri)) for prefix, uri in graph.namespaces()],
+    }
+    return meta, arrays
+
+
+def save_graph_binary(graph: Graph, dir_path: str) -> None:
+    """Write a binary snapshot of the graph's triples and namespace bindings to a directory."""
+    meta, arrays = get_graph_binary_data(graph=graph)
+
+    os.makedirs(dir_path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(dir_path, f"{name}.npy"), array)
+    with open(os.path.join(dir_path, BIN_GRAPH_META_FILE), mode="w", encoding="utf-8") as meta_file:
+        json.dump(meta, meta_file)
+
+
+def load_graph_binary(dir_path: str, mmap: bool = True) -> "BinaryGraph":
+    """Load a snapshot written with `save_graph_binary`, memory-mapping the arrays if `mmap`"""
+    with open(os.path.join(dir_path, BIN_GRAPH_META_FILE), mode="r", encoding="utf-8") as meta_file:
+        meta = json.load(meta_file)
+
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(dir_path, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in BIN_GRAPH_ARRAYS
+    }
+    return BinaryGraph(meta=meta, arrays=arrays)
+
+
+class BinaryGraph(Graph):
+    """Read-only graph over the arrays of a binary snapshot, e.g. loaded from files with
+    `load_graph_binary` or attached from shared memory with `attach_shared_graph`.
+
+    Like `GraphIndex`, this can be passed wherever the models expect a graph, including to
+    SPARQL queries, since all lookups go through `triples()`. Terms are decoded from the term
+    table when first accessed.
+    """
+
+    _kinds: memoryview
+    _ends: memoryview
+    _strings: memoryview
+    _num_terms: int
+    _terms: list[Optional[Node]]
+    _term_ids: dict[Node, int]
+    _spo: np.ndarray
+    _pos: np.ndarray
+    _osp: np.ndarray
+    _buffer_owner: Any
+
+    def __init__(self, meta: dict, arrays: dict[str, np.ndarray], buffer_owner: Any = None) -> None:
+        """`buffer_owner` is kept alive for as long as the graph, e.g. if the arrays are views
+        of a shared memory block.
+        """
+        super().__init__()
+        assert meta.get("version") == BIN_GRAPH_VERSION, (
+            f"BinaryGraph: unsupported version: {meta.get('version')}"
+        )
+
+        for prefix, uri in meta["namespaces"]:
+            self.namespace_manager.bind(prefix, URIRef(uri), override=True, replace=True)
+
+        # the term table is read per term, which is faster through memory views
+        self._kinds = memoryview(arrays["kinds"])
+        self._ends = memoryview(np.ascontiguousarray(arrays["ends"]).reshape(-1))
+        self._strings = memoryview(arrays["strings"])
+        self._num_terms = len(self._kinds)
+        self._terms = [None] * self._num_terms
+        self._term_ids = {}
+        self._spo = arrays["spo"]
+        self._pos = arrays["pos"]
+        self._osp = arrays["osp"]
+        self._buffer_owner = buffer_owner
+
+    def add(self, triple: Any) -> "BinaryGraph":
+        raise TypeError("BinaryGraph is read-only")
+
+    def addN(self, quads: Any) -> "BinaryGraph":
+        raise TypeError("BinaryGraph is read-only")
+
+    def remove(self, triple: Any) -> "BinaryGraph":
+        raise TypeError("BinaryGraph is read-only")
+
+    def __len__(self) -> int:
+        return len(self._spo)
+
+    def _get_encoded_term(self, term_id: int) -> tuple[int, bytes, bytes, bytes]:
+        ends_idx = 3 * term_id
+        start = 0 if term_id == 0 else self._ends[ends_idx - 1]
+        value_end, dt_end, lang_end = self._ends[ends_idx : ends_idx + 3]
+        return (
+            self._kinds[term_id],
+            self._strings[start:value_end].tobytes(),
+            self._strings[value_end:dt_end].tobytes(),
+            self._strings[dt_end:lang_end].tobytes(),
+        )
+
+    def _get_term(self, term_id: int) -> Node:
+        term = self._terms[term_id]
+        if term is None:
+            term = _decode_term(self._get_encoded_term(term_id))
+            self._terms[term_id] = term
+            self._term_ids[term] = term_id
+        return term
+
+    def _get_terms(self, term_ids: list[int]) -> list[Node]:
+        terms = self._terms
+        for term_id in term_ids:
+            if terms[term_id] is None:
+                self._get_term(term_id)
+        return [terms[term_id] for term_id in term_ids]
+
+    def _get_term_id(self, term: Node) -> Optional[int]:
+        term_id = self._term_ids.get(term)
+        if term_id is not None:
+            return term_id
+
+        try:
+            encoded = _encode_term(term)
+        except ValueError:
+            # e.g. SPARQL variables, which can't be in the graph
+            return None
+        term_id = bisect_left(range(self._num_terms), encoded, key=self._get_encoded_term)
+        if term_id == self._num_terms or self._get_encoded_term(term_id) != encoded:
+            return None
+
+        self._terms[term_id] = term
+        self._term_ids[term] = term_id
+        return term_id
+
+    def _iter_range(
+        self, keys: np.ndarray, first_id: Optional[int] = None, second_id: Optional[int] = None
+    ) -> Generator[tuple[Node, Node, Node], None, None]:
+        """Terms of the keys which start with the given IDs, in index order"""
+        sq_terms = self._num_terms * self._num_terms
+        if first_id is None:
+            range_keys = np.asarray(keys)
+        else:
+            if second_id is None:
+                start_key = first_id * sq_terms
+                end_key = start_key + sq_terms
+            else:
+                start_key = first_id * sq_terms + second_id * self._num_terms
+                end_key = start_key + self._num_terms
+
+            start = int(np.searchsorted(keys, start_key, side="left"))
+            end = int(np.searchsorted(keys, end_key, side="left"))
+            range_keys = np.asarray(keys[start:end])
+
+        firsts, rem = np.divmod(range_keys, sq_terms)
+        seconds, thirds = np.divmod(rem, self._num_terms)
+        yield from zip(
+            self._get_terms(firsts.tolist()),
+            self._get_terms(seconds.tolist()),
+            self._get_terms(thirds.tolist()),
+        )
+
+    def triples(self, triple: Any) -> Generator[Any, None, None]:
+        s, p, o = triple
+        if isinstance(p, Path):
+            for _s, _o in p.eval(self, s, o):
+                yield _s, p, _o
+            return
+
+        ids = []
+        for term in (s, p, o):
+            if term is None:
+                ids.append(None)
+                continue
+            term_id = self._get_term_id(term)
+            if term_id is None:
+                return
+            ids.append(term_id)
+        s_id, p_id, o_id = ids
+
+        if s_id is not None:
+            if o_id is not None and p_id is None:
+                for _, _, p_found in self._iter_range(self._osp, o_id, s_id):
+                    yield s, p_found, o
+                return
+
+            for _, p_found, o_found in self._iter_range(self._spo, s_id, p_id):
+                if o_id is None or o_found == o:
+                    yield s, p_found, o_found
+            return
+
+        if p_id is not None:
+            for _, o_found, s_found in self._iter_range(self._pos, p_id, o_id):
+                yield s_found, p, o_found
+            return
+
+        if o_id is not None:
+            for _, s_found, p_found in self._iter_range(self._osp, o_id):
+                yield s_found, p_found, o
+            return
+
+        yield from self._iter_range(self._spo)
+
+    def __contains__(self, triple: Any) -> bool:
+        for _ in self.triples(triple):
+            return True
+        return False
+
+
+_INT64_SIZE = np.dtype(np.int64).itemsize
+# header of shared memory blocks: size of the JSON metadata & length of each array
+_SHM_HEADER_SIZE = (1 + len(BIN_GRAPH_ARRAYS)) * _INT64_SIZE
+# names of the blocks created by this process, which is responsible for unlinking them
+_OWNED_SHM_NAMES: set[str] = set()
+
+
+def _get_shm_offsets(meta_size: int, lengths: list[int]) -> tuple[list[int], int]:
+    """Offsets of the arrays in a shared memory block, each aligned to 8 bytes, and the size
+    of the block
+    """
+    offsets = []
+    offset = _SHM_HEADER_SIZE + meta_size
+    for length, dtype in zip(lengths, BIN_GRAPH_ARRAYS.values()):
+        offset += -offset % _INT64_SIZE
+        offsets.append(offset)
+        offset += length * np.dtype(dtype).itemsize
+    return offsets, offset
+
+
+class SharedGraph(object):
+    """Shared memory block holding a binary snapshot of a graph, created by the parent process.
+
+    Other processes attach to the block by its `name` with `attach_shared_graph`, sharing the
+    term table & triple indices without copying. Only the owner should call `close`, which
+    frees the block once all processes detach from it.
+    """
+
+    _shm: SharedMemory
+
+    def __init__(self, graph: Graph) -> None:
+        meta, arrays = get_graph_binary_data(graph=graph)
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        flat_arrays = [arrays[name].reshape(-1) for name in BIN_GRAPH_ARRAYS]
+        lengths = [len(array) for array in flat_arrays]
+        offsets, shm_size = _get_shm_offsets(meta_size=len(meta_bytes), lengths=lengths)
+
+        self._shm = SharedMemory(create=True, size=shm_size)
+        _OWNED_SHM_NAMES.add(self._shm.name)
+        header = np.ndarray((1 + len(lengths),), dtype=np.int64, buffer=self._shm.buf)
+        header[:] = [len(meta_bytes)] + lengths
+        self._shm.buf[_SHM_HEADER_SIZE : _SHM_HEADER_SIZE + len(meta_bytes)] = meta_bytes
+        for array, offset in zip(flat_arrays, offsets):
+            shm_array = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=self._shm.buf, offset=offset
+            )
+            shm_array[:] = array
+            del shm_array
+        del header
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def close(self) -> None:
+        _OWNED_SHM_NAMES.discard(self._shm.name)
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedGraph":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    # the owner is responsible for unlinking the block, which the resource tracker of another
+    # process would otherwise do when that process exits
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    shm = SharedMemory(name=name)
+    # only POSIX blocks are tracked, under their name with a leading slash, also skipped in
+    # forked processes, which share the owner's resource tracker
+    if os.name == "posix" and name not in _OWNED_SHM_NAMES:
+        resource_tracker.unregister(f"/{shm.name}", "shared_memory")
+    return shm
+
+
+def attach_shared_graph(name: str) -> BinaryGraph:
+    """Read-only graph over the shared memory block of a `SharedGraph`"""
+    shm = _attach_shared_memory(name=name)
+
+    header = np.ndarray((1 + len(BIN_GRAPH_ARRAYS),), dtype=np.int64, buffer=shm.buf).tolist()
+    meta_size, lengths = header[0], header[1:]
+    meta = json.loads(bytes(shm.buf[_SHM_HEADER_SIZE : _SHM_HEADER_SIZE + meta_size]))
+    offsets, _ = _get_shm_offsets(meta_size=meta_size, lengths=lengths)
+    arrays = {}
+    for (array_name, dtype), length, offset in zip(BIN_GRAPH_ARRAYS.items(), lengths, offsets):
+        arrays[array_name] = np.ndarray((length,), dtype=dtype, buffer=shm.buf, offset=offset)
+        arrays[array_name].flags.writeable = False
+    return BinaryGraph(meta=meta, arrays=arrays, buffer_owner=shm)
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import hashlib
+import os
+import pickle
+from itertools import chain
+from typing import Any, Iterable, Optional
+from platformdirs import user_cache_dir
+from rdflib import BNode, Graph
+from rdf_utils.caching import read_url_and_cache
+from bdd_dsl.utils.common import BDD_DSL_VERSION
+
+
+BDD_DSL_CACHE_DIR = user_cache_dir(appname="bdd-dsl")
+
+
+def get_cache_dir(*sub_dirs: str) -> str:
+    """Return (and create if necessary) a directory under the user's cache directory."""
+    cache_dir = os.path.join(BDD_DSL_CACHE_DIR, *sub_dirs)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _get_bnode_labels(graph: Graph) -> dict[BNode, str]:
+    """Skolemize blank nodes with a hash of the triples reachable from them.
+
+    Unlike the labels from the parser, the hashes don't depend on the parsing process. Blank
+    nodes in cycles are not distinguished from each other.
+    """
+    labels = {}
+    for bnode in chain(graph.subjects(unique=True), graph.objects(unique=True)):
+        if not isinstance(bnode, BNode) or bnode in labels:
+            continue
+
+        # post-order traversal, children are labelled before their parents
+        visiting = set()
+        stack = [(bnode, False)]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            if node in labels:
+                continue
+
+            if expanded:
+                po_lines = []
+                for pred, obj in graph.predicate_objects(subject=node):
+                    if isinstance(obj, BNode):
+                        obj_str = labels.get(obj, "_:cycle")
+                    else:
+                        obj_str = obj.n3()
+                    po_lines.append(f"{pred.n3()} {obj_str}")
+                po_lines.sort()
+                po_digest = hashlib.sha256("\n".join(po_lines).encode()).hexdigest()
+                labels[node] = f"_:{po_digest}"
+                visiting.discard(node)
+                continue
+
+            if node in visiting:
+                continue
+            visiting.add(node)
+            stack.append((node, True))
+            for obj in graph.objects(subject=node):
+                if isinstance(obj, BNode) and obj not in labels and obj not in visiting:
+                    stack.append((obj, False))
+    return labels
+
+
+def get_graph_digest(graph: Graph) -> str:
+    """Compute a content hash of the triples in a graph.
+
+    Hashes the sorted N-Triples of the graph, with blank nodes skolemized by the content
+    reachable from them, so the same model files parsed in different processes produce the same
+    digest. This is much cheaper than the canonicalization in `rdflib.compare`.
+    """
+    bnode_labels = _get_bnode_labels(graph=graph)
+    nt_lines = []
+    for subj, pred, obj in graph.triples((None, None, None)):
+        subj_str = bnode_labels[subj] if isinstance(subj, BNode) else subj.n3()
+        obj_str = bnode_labels[obj] if isinstance(obj, BNode) else obj.n3()
+        nt_lines.append(f"{subj_str} {pred.n3()} {obj_str} .\n")
+    nt_lines.sort()
+
+    hasher = hashlib.sha256()
+    for line in nt_lines:
+        hasher.update(line.encode())
+    return hasher.hexdigest()
+
+
+def get_sources_digest(sources: Iterable[str]) -> str:
+    """Compute a hash of model sources, given as local file paths or URLs, in any order.
+
+    Local files are identified by their absolute path, modification time & size, without
+    reading them. URLs are identified by a hash of their content in the download cache.
+    """
+    hasher = hashlib.sha256()
+    for source in sorted(set(sources)):
+        if os.path.isfile(source):
+            file_stat = os.stat(source)
+            source_id = f"{os.path.abspath(source)}\0{file_stat.st_mtime_ns}\0{file_stat.st_size}"
+            hasher.update(source_id.encode())
+        else:
+            hasher.update(source.encode())
+            hasher.update(hashlib.sha256(read_url_and_cache(source).encode()).digest())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def get_shacl_digest(shacl_dict: dict[str, str]) -> str:
+    """Compute a content hash of the SHACL shapes, given as a dict of URL -> format."""
+    hasher = hashlib.sha256()
+    for url in sorted(shacl_dict):
+        hasher.update(url.encode())
+        hasher.update(shacl_dict[url].encode())
+        hasher.update(read_url_and_cache(url).encode())
+    return hasher.hexdigest()
+
+
+def get_cache_key(*digests: str) -> str:
+    """Combine digests into a single cache key, also keyed by the package version."""
+    hasher = hashlib.sha256(BDD_DSL_VERSION.encode())
+    for digest in digests:
+        hasher.update(digest.encode())
+    return hasher.hexdigest()
+
+
+def load_pickle_cache(cache_path: str) -> Optional[Any]:
+    """Load a pickled object from the cache, returning None if missing or unreadable."""
+    if not os.path.isfile(cache_path):
+        return None
+
+    try:
+        with open(cache_path, mode="rb") as cache_file:
+            return pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def dump_pickle_cache(cache_path: str, data: Any) -> None:
+    """Pickle an object to the cache, replacing any existing cache file atomically."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode="wb") as cache_file:
+        pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
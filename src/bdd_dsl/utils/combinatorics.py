@@ -0,0 +1,296 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+"""Ranking & unranking of combinatorial sequences in the order produced by `itertools`, and
+sampling of Cartesian products.
+
+Elements are represented as indices into the pool(s) being enumerated. Unranking maps a position
+`k` in the enumeration to the corresponding index tuple without enumerating the first k - 1
+elements; ranking is the inverse.
+"""
+
+import itertools
+import random
+import sys
+from math import comb, perm, prod
+from typing import Optional, Sequence
+
+
+def _check_rank(k: int, count: int) -> None:
+    if k < 0 or k >= count:
+        raise IndexError(f"rank {k} out of range for enumeration of size {count}")
+
+
+def unrank_product(sizes: Sequence[int], k: int) -> tuple[int, ...]:
+    """Indices of the k-th element of `itertools.product` over pools of the given sizes"""
+    _check_rank(k=k, count=prod(sizes))
+    indices = [0] * len(sizes)
+    for i in range(len(sizes) - 1, -1, -1):
+        k, indices[i] = divmod(k, sizes[i])
+    return tuple(indices)
+
+
+def rank_product(sizes: Sequence[int], indices: Sequence[int]) -> int:
+    """Position of the given indices in `itertools.product` over pools of the given sizes"""
+    assert len(sizes) == len(indices), f"rank_product: expected {len(sizes)} indices: {indices}"
+    k = 0
+    for size, idx in zip(sizes, indices):
+        if idx < 0 or idx >= size:
+            raise ValueError(f"rank_product: index {idx} out of range for pool of size {size}")
+        k = k * size + idx
+    return k
+
+
+def unrank_combination(n: int, r: int, k: int) -> tuple[int, ...]:
+    """Indices of the k-th element of `itertools.combinations(range(n), r)`"""
+    _check_rank(k=k, count=comb(n, r))
+    indices = []
+    candidate = 0
+    for pos in range(r):
+        while True:
+            # number of combinations with the current candidate at this position
+            num_with_cand = comb(n - candidate - 1, r - pos - 1)
+            if k < num_with_cand:
+                break
+            k -= num_with_cand
+            candidate += 1
+        indices.append(candidate)
+        candidate += 1
+    return tuple(indices)
+
+
+def rank_combination(n: int, indices: Sequence[int]) -> int:
+    """Position of the given indices in `itertools.combinations(range(n), len(indices))`"""
+    r = len(indices)
+    k = 0
+    candidate = 0
+    for pos, idx in enumerate(indices):
+        if idx < candidate or idx >= n:
+            raise ValueError(f"rank_combination: not a combination of {n} elements: {indices}")
+        while candidate < idx:
+            k += comb(n - candidate - 1, r - pos - 1)
+            candidate += 1
+        candidate += 1
+    return k
+
+
+def unrank_combination_with_replacement(n: int, r: int, k: int) -> tuple[int, ...]:
+    """Indices of the k-th element of `itertools.combinations_with_replacement(range(n), r)`"""
+    _check_rank(k=k, count=comb(n + r - 1, r))
+    indices = []
+    candidate = 0
+    for pos in range(r):
+        remaining = r - pos - 1
+        while True:
+            # number of multisets of the remaining size from the elements >= candidate
+            num_with_cand = comb(n - candidate + remaining - 1, remaining)
+            if k < num_with_cand:
+                break
+            k -= num_with_cand
+            candidate += 1
+        indices.append(candidate)
+    return tuple(indices)
+
+
+def rank_combination_with_replacement(n: int, indices: Sequence[int]) -> int:
+    """Position of the given indices in `itertools.combinations_with_replacement`"""
+    r = len(indices)
+    k = 0
+    candidate = 0
+    for pos, idx in enumerate(indices):
+        if idx < candidate or idx >= n:
+            raise ValueError(
+                f"rank_combination_with_replacement: not a multiset of {n} elements: {indices}"
+            )
+        remaining = r - pos - 1
+        while candidate < idx:
+            k += comb(n - candidate + remaining - 1, remaining)
+            candidate += 1
+    return k
+
+
+def unrank_permutation(n: int, r: int, k: int) -> tuple[int, ...]:
+    """Indices of the k-th element of `itertools.permutations(range(n), r)`"""
+    _check_rank(k=k, count=perm(n, r))
+    pool = list(range(n))
+    indices = []
+    for pos in range(r):
+        block_size = perm(n - pos - 1, r - pos - 1)
+        pool_idx, k = divmod(k, block_size)
+        indices.append(pool.pop(pool_idx))
+    return tuple(indices)
+
+
+def rank_permutation(n: int, indices: Sequence[int]) -> int:
+    """Position of the given indices in `itertools.permutations(range(n), len(indices))`"""
+    r = len(indices)
+    pool = list(range(n))
+    k = 0
+    for pos, idx in enumerate(indices):
+        if idx not in pool:
+            raise ValueError(f"rank_permutation: not a permutation of {n} elements: {indices}")
+        pool_idx = pool.index(idx)
+        pool.pop(pool_idx)
+        k += pool_idx * perm(n - pos - 1, r - pos - 1)
+    return k
+
+
+def sample_ranks(count: int, num_samples: int, seed: Optional[int] = None) -> list[int]:
+    """Sorted ranks of a uniform random sample without replacement from `count` elements"""
+    rng = random.Random(seed)
+    if count <= sys.maxsize:
+        return sorted(rng.sample(range(count), k=min(num_samples, count)))
+
+    # range too large for random.sample, collisions are unlikely for such sizes
+    ranks = set()
+    while len(ranks) < num_samples:
+        ranks.add(rng.randrange(count))
+    return sorted(ranks)
+
+
+def get_t_tuples(row: Sequence[int], strength: int) -> set[tuple[tuple[int, ...], tuple[int, ...]]]:
+    """All (columns, values) tuples of size `strength` covered by a row of the product"""
+    return {
+        (cols, tuple(row[col] for col in cols))
+        for cols in itertools.combinations(range(len(row)), strength)
+    }
+
+
+def count_t_tuples(sizes: Sequence[int], strength: int) -> int:
+    """Number of distinct value tuples of size `strength` in a product over the given pools"""
+    return sum(
+        prod(sizes[col] for col in cols)
+        for cols in itertools.combinations(range(len(sizes)), strength)
+    )
+
+
+def count_covered_t_tuples(rows: Sequence[Sequence[int]], strength: int) -> int:
+    """Number of distinct value tuples of size `strength` covered by the rows"""
+    covered = set()
+    for row in rows:
+        covered.update(get_t_tuples(row=row, strength=strength))
+    return len(covered)
+
+
+def greedy_covering_array(
+    sizes: Sequence[int], strength: int = 2, seed: Optional[int] = None, num_candidates: int = 20
+) -> list[tuple[int, ...]]:
+    """Rows of the product over pools of the given sizes covering all `strength`-wise tuples.
+
+    Uses the AETG-style greedy heuristic: each row is the best of `num_candidates` candidates,
+    each built by starting from an uncovered tuple, then assigning the remaining columns in
+    random order to the values covering the most new tuples. The result is usually much
+    smaller than the full product, but not necessarily minimal.
+    """
+    num_cols = len(sizes)
+    if num_cols == 0 or any(size == 0 for size in sizes):
+        return []
+    if strength >= num_cols:
+        return list(itertools.product(*[range(size) for size in sizes]))
+    assert strength > 0, f"greedy_covering_array: invalid strength: {strength}"
+
+    rng = random.Random(seed)
+    # the list keeps a reproducible order for sampling, covered entries are removed lazily
+    uncovered_list = []
+    for cols in itertools.combinations(range(num_cols), strength):
+        for vals in itertools.product(*[range(sizes[col]) for col in cols]):
+            uncovered_list.append((cols, vals))
+    uncovered = set(uncovered_list)
+
+    rows = []
+    while len(uncovered) > 0:
+        if len(uncovered_list) > 2 * len(uncovered):
+            uncovered_list = [t_tuple for t_tuple in uncovered_list if t_tuple in uncovered]
+
+        # sample distinct indices, skipping covered entries
+        num_starts = min(num_candidates, len(uncovered))
+        start_idxs = set()
+        start_tuples = []
+        while len(start_tuples) < num_starts:
+            idx = rng.randrange(len(uncovered_list))
+            if idx in start_idxs:
+                continue
+            start_idxs.add(idx)
+            if uncovered_list[idx] in uncovered:
+                start_tuples.append(uncovered_list[idx])
+
+        best_row = None
+        best_num_new = -1
+        for start_cols, start_vals in start_tuples:
+            row = _build_candidate_row(
+                sizes=sizes,
+                strength=strength,
+                uncovered=uncovered,
+                start_cols=start_cols,
+                start_vals=start_vals,
+                rng=rng,
+            )
+            num_new = len(get_t_tuples(row=row, strength=strength) & uncovered)
+            if num_new > best_num_new:
+                best_row = row
+                best_num_new = num_new
+
+        assert best_row is not None
+        uncovered -= get_t_tuples(row=best_row, strength=strength)
+        rows.append(best_row)
+
+    return rows
+
+
+def _build_candidate_row(
+    sizes: Sequence[int],
+    strength: int,
+    uncovered: set,
+    start_cols: tuple[int, ...],
+    start_vals: tuple[int, ...],
+    rng: random.Random,
+) -> tuple[int, ...]:
+    row: list[Optional[int]] = [None] * len(sizes)
+    for col, val in zip(start_cols, start_vals):
+        row[col] = val
+    assigned = list(start_cols)
+
+    free_cols = [col for col in range(len(sizes)) if row[col] is None]
+    rng.shuffle(free_cols)
+    for col in free_cols:
+        best_vals = []
+        best_num_new = -1
+        for val in range(sizes[col]):
+            # new tuples formed by this value and the already assigned columns
+            num_new = 0
+            for other_cols in itertools.combinations(assigned, strength - 1):
+                cols = tuple(sorted(other_cols + (col,)))
+                vals = tuple(val if c == col else row[c] for c in cols)
+                if (cols, vals) in uncovered:
+                    num_new += 1
+            if num_new > best_num_new:
+                best_vals = [val]
+                best_num_new = num_new
+            elif num_new == best_num_new:
+                best_vals.append(val)
+        row[col] = rng.choice(best_vals)
+        assigned.append(col)
+
+    return tuple(val for val in row if val is not None)
+
+
+def stratified_rows(
+    sizes: Sequence[int], samples_per_value: int = 1, seed: Optional[int] = None
+) -> list[tuple[int, ...]]:
+    """Rows of the product in which every value of every pool appears `samples_per_value` times.
+
+    The number of rows is the largest pool size times `samples_per_value`. Values of smaller
+    pools are repeated evenly, and each column is shuffled independently. Duplicate rows are
+    removed, so some values of the smaller pools may appear less often.
+    """
+    if len(sizes) == 0 or any(size == 0 for size in sizes):
+        return []
+    assert samples_per_value > 0, f"stratified_rows: invalid samples per value: {samples_per_value}"
+
+    rng = random.Random(seed)
+    num_rows = max(sizes) * samples_per_value
+    columns = []
+    for size in sizes:
+        col_vals = [row_idx % size for row_idx in range(num_rows)]
+        rng.shuffle(col_vals)
+        columns.append(col_vals)
+
+    return list(dict.fromkeys(zip(*columns)))
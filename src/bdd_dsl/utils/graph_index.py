@@ -0,0 +1,140 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+from typing import Any, Generator, Iterable, Optional
+from rdflib import Graph, Literal
+from rdflib.paths import Path
+from rdflib.term import Node
+
+
+class GraphIndex(Graph):
+    """Read-only, dictionary-based index of one or more graphs, built in a single pass.
+
+    Triples are indexed as subject -> predicate -> objects and predicate -> object -> subjects
+    dictionaries, so the point lookups issued by the model constructors, e.g. `value()`,
+    `objects()`, `subjects()` and `items()`, become dictionary accesses instead of pattern
+    matching over all contexts of a large `Dataset`. Since this is a `Graph`, it can be passed
+    wherever the models expect one, including to SPARQL queries.
+
+    The index is a snapshot: triples added to the source graphs afterwards are not reflected.
+    """
+
+    _spo: dict[Node, dict[Node, set[Node]]]
+    _pos: dict[Node, dict[Node, set[Node]]]
+    _num_triples: int
+
+    def __init__(self, *graphs: Graph) -> None:
+        assert len(graphs) > 0, "GraphIndex: no graph to index"
+        super().__init__(namespace_manager=graphs[0].namespace_manager)
+        self._spo = {}
+        self._pos = {}
+        self._num_triples = 0
+        for graph in graphs:
+            self._index_graph(graph=graph)
+
+    def _index_graph(self, graph: Graph) -> None:
+        for s, p, o in graph.triples((None, None, None)):
+            pred_dict = self._spo.setdefault(s, {})
+            objs = pred_dict.setdefault(p, set())
+            if o in objs:
+                continue
+            objs.add(o)
+            self._pos.setdefault(p, {}).setdefault(o, set()).add(s)
+            self._num_triples += 1
+
+    def add(self, triple: Any) -> "GraphIndex":
+        raise TypeError("GraphIndex is read-only")
+
+    def addN(self, quads: Any) -> "GraphIndex":
+        raise TypeError("GraphIndex is read-only")
+
+    def remove(self, triple: Any) -> "GraphIndex":
+        raise TypeError("GraphIndex is read-only")
+
+    def __len__(self) -> int:
+        return self._num_triples
+
+    def triples(self, triple: Any) -> Generator[Any, None, None]:
+        s, p, o = triple
+        if isinstance(p, Path):
+            for _s, _o in p.eval(self, s, o):
+                yield _s, p, _o
+            return
+
+        if s is not None:
+            pred_dict = self._spo.get(s)
+            if pred_dict is None:
+                return
+            preds = pred_dict if p is None else (p,)
+            for pred in preds:
+                objs = pred_dict.get(pred)
+                if objs is None:
+                    continue
+                if o is None:
+                    for obj in objs:
+                        yield s, pred, obj
+                elif o in objs:
+                    yield s, pred, o
+            return
+
+        if p is not None:
+            obj_dict = self._pos.get(p)
+            if obj_dict is None:
+                return
+            objs = obj_dict if o is None else (o,)
+            for obj in objs:
+                for subj in obj_dict.get(obj, ()):
+                    yield subj, p, obj
+            return
+
+        for pred, obj_dict in self._pos.items():
+            objs = obj_dict if o is None else (o,)
+            for obj in objs:
+                for subj in obj_dict.get(obj, ()):
+                    yield subj, pred, obj
+
+    def objects(
+        self, subject: Optional[Any] = None, predicate: Optional[Any] = None, unique: bool = False
+    ) -> Generator[Node, None, None]:
+        if not isinstance(subject, Node) or not isinstance(predicate, Node):
+            yield from super().objects(subject=subject, predicate=predicate, unique=unique)
+            return
+
+        pred_dict = self._spo.get(subject)
+        if pred_dict is None:
+            return
+        yield from pred_dict.get(predicate, ())
+
+    def subjects(
+        self, predicate: Optional[Any] = None, object: Optional[Any] = None, unique: bool = False
+    ) -> Generator[Node, None, None]:
+        if not isinstance(predicate, Node) or not isinstance(object, Node):
+            yield from super().subjects(predicate=predicate, object=object, unique=unique)
+            return
+
+        obj_dict = self._pos.get(predicate)
+        if obj_dict is None:
+            return
+        yield from obj_dict.get(object, ())
+
+
+def get_reachable_subgraph(graph: Graph, root_ids: Iterable[Node]) -> Graph:
+    """Collect all triples reachable from the root nodes by following predicates forward.
+
+    Useful for extracting the self-contained description of a model, e.g. a scenario variant
+    with its template, clauses, RDF lists and variation, to be shipped to another process.
+    """
+    subgraph = Graph(namespace_manager=graph.namespace_manager)
+    visited = set()
+    to_visit = list(root_ids)
+    while len(to_visit) > 0:
+        node = to_visit.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+
+        for triple in graph.triples((node, None, None)):
+            subgraph.add(triple)
+            obj = triple[2]
+            if obj not in visited and not isinstance(obj, Literal):
+                to_visit.append(obj)
+
+    return subgraph
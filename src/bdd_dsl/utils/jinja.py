@@ -1,9 +1,20 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
-from typing import Any, Iterable, Optional, Protocol
-from jinja2 import Environment, FileSystemLoader, Template
+import heapq
+import os
+from itertools import islice
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, Protocol
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    FunctionLoader,
+    Template,
+)
+from jinja2.bccache import Bucket
 from rdflib import Graph, URIRef
 from rdflib.namespace import NamespaceManager
-from rdf_utils.caching import read_file_and_cache, read_url_and_cache
+from rdf_utils.caching import read_url_and_cache
+from rdf_utils.models.common import ModelBase
 from bdd_dsl.models.clauses import (
     FluentClauseModel,
     WhenBehaviourModel,
@@ -20,9 +31,6 @@ from bdd_dsl.models.urirefs import (
     URI_BDD_TYPE_CONFIG,
     URI_BDD_TYPE_MOVE_SAFE,
     URI_BDD_TYPE_SORTED,
-    URI_BDD_PRED_REF_AGN,
-    URI_BDD_PRED_REF_OBJ,
-    URI_BDD_PRED_REF_WS,
     URI_BDD_TYPE_IS_HELD,
     URI_BDD_TYPE_LOCATED_AT,
     URI_BDD_TYPE_STR_TMPL,
@@ -37,9 +45,11 @@ from bdd_dsl.models.user_story import (
     ThereExistsModel,
     UserStoryLoader,
 )
-from bdd_dsl.models.variation import get_task_variations
+from bdd_dsl.models.variation import TaskVariationsGetterProtocol, iter_task_variations
 from bdd_dsl.representation import (
     ModelToStrProtocol,
+    VariableStrTemplate,
+    VarTmplCreatorProtocol,
     get_str_tc_after_event,
     get_str_tc_before_event,
     get_str_tc_during_events,
@@ -47,32 +57,96 @@ from bdd_dsl.representation import (
     get_tmpl_fc_config,
     get_tmpl_fc_is_held,
     get_tmpl_fc_located_at,
+    get_tmpl_fc_move_safe,
+    get_tmpl_fc_sorted,
     get_tmpl_fc_str_tmpl,
     var_val_to_str,
 )
+from bdd_dsl.utils.caching import get_cache_dir
+from bdd_dsl.utils.uri import check_uri_str_cache, get_ns_snapshot, get_uri_str
 
 
-def load_template_from_file(file_path: str) -> Template:
-    """Create template instance from text content of a file.
-
-    Not using Jinja's environment loading mechanism may break more advanced features like
-    template inheritance and filters.
+class _SourceBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache which also keys templates without a file name, e.g. those loaded from
+    URLs, on a checksum of their source, so that each version of the content gets its own entry.
     """
-    return Template(read_file_and_cache(file_path), autoescape=True)
 
+    def get_bucket(
+        self, environment: Environment, name: str, filename: Optional[str], source: str
+    ) -> Bucket:
+        if filename is not None:
+            return super().get_bucket(
+                environment=environment, name=name, filename=filename, source=source
+            )
 
-def load_template_from_url(url: str) -> Template:
-    """Create template instance by downloading a remote template URL.
+        checksum = self.get_source_checksum(source)
+        bucket = Bucket(environment, f"{self.get_cache_key(name)}-{checksum}", checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+
+_JINJA_BC_CACHE: Optional[FileSystemBytecodeCache] = None
+_JINJA_ENV: Optional[Environment] = None
+_JINJA_DIR_ENVS: dict[str, Environment] = {}
+
+
+def _get_bytecode_cache() -> FileSystemBytecodeCache:
+    global _JINJA_BC_CACHE
+    if _JINJA_BC_CACHE is None:
+        _JINJA_BC_CACHE = _SourceBytecodeCache(directory=get_cache_dir("jinja"))
+    return _JINJA_BC_CACHE
+
+
+def _load_template_source(name: str) -> tuple[str, Optional[str], Callable[[], bool]]:
+    if name.startswith(("http://", "https://")):
+        # the download cache may be refreshed, in which case the template is reloaded
+        source = read_url_and_cache(name)
+        return source, None, lambda: read_url_and_cache(name) == source
+
+    mtime = os.path.getmtime(name)
+    with open(name, mode="r", encoding="utf-8") as tmpl_file:
+        source = tmpl_file.read()
+    return source, name, lambda: os.path.isfile(name) and os.path.getmtime(name) == mtime
 
-    Not using Jinja's environment loading mechanism may break more advanced features like
-    template inheritance and filters.
+
+def get_jinja_env(dir_name: Optional[str] = None) -> Environment:
+    """Shared Jinja environment, which keeps compiled templates in memory and their bytecode
+    in the user's cache directory, so templates are compiled only once across processes & runs.
+
+    Without `dir_name`, template names are file paths or URLs. Otherwise, templates are loaded
+    from the directory.
     """
-    return Template(read_url_and_cache(url), autoescape=True)
+    global _JINJA_ENV
+    if dir_name is None:
+        if _JINJA_ENV is None:
+            _JINJA_ENV = Environment(
+                loader=FunctionLoader(_load_template_source),
+                autoescape=True,
+                bytecode_cache=_get_bytecode_cache(),
+            )
+        return _JINJA_ENV
+
+    if dir_name not in _JINJA_DIR_ENVS:
+        _JINJA_DIR_ENVS[dir_name] = Environment(
+            loader=FileSystemLoader(dir_name),
+            autoescape=True,
+            bytecode_cache=_get_bytecode_cache(),
+        )
+    return _JINJA_DIR_ENVS[dir_name]
+
+
+def load_template_from_file(file_path: str) -> Template:
+    """Load template from a file using the shared environment, see `get_jinja_env`."""
+    return get_jinja_env().get_template(os.path.abspath(file_path))
+
+
+def load_template_from_url(url: str) -> Template:
+    """Load template from a remote URL using the shared environment, see `get_jinja_env`."""
+    return get_jinja_env().get_template(url)
 
 
 def load_template(template_name: str, dir_name: str) -> Template:
-    env = Environment(loader=FileSystemLoader(dir_name), autoescape=True)
-    return env.get_template(template_name)
+    return get_jinja_env(dir_name=dir_name).get_template(template_name)
 
 
 DEFAULT_TIME_CSTR_STR_GENS = {
@@ -90,84 +164,44 @@ class FluentClauseToStringProtocol(Protocol):
     ) -> str: ...
 
 
-def get_fc_str_located_at(
-    clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    tmpl = get_tmpl_fc_located_at(model=clause)
-    assert tmpl is not None, f"LocatedAt clause {clause.id.n3(ns_manager)} has wrong types"
-    return tmpl.render(var_values=var_values, ns_manager=ns_manager)
-
-
-def get_fc_str_is_held(
-    clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    tmpl = get_tmpl_fc_is_held(model=clause)
-    assert tmpl is not None, f"IsHeld clause {clause.id.n3(ns_manager)} has wrong types"
-    return tmpl.render(var_values=var_values, ns_manager=ns_manager)
-
-
-def get_fc_str_move_safe(
-    clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    assert URI_BDD_PRED_REF_AGN in clause.variable_by_role, (
-        f"MoveSafe fluent '{clause.id}' does not have 'ref-agn' property"
-    )
-    agn_id = clause.variable_by_role[URI_BDD_PRED_REF_AGN][0]
-    assert isinstance(agn_id, URIRef), (
-        f"MoveSafe fluent '{clause.id}' does not have URI 'ref-agn' property"
-    )
-    assert agn_id in var_values, (
-        f"MoveSafe fluent '{clause.id}': no value for agn '{agn_id}', available vars: {list(var_values.keys())}"
-    )
-    agn_value_str = var_val_to_str(var_val=var_values[agn_id], ns_manager=ns_manager)
-    return f'"{agn_value_str}" moves safely'
+class VarTmplStrGen(object):
+    """Clause string generator backed by a `VariableStrTemplate`.
 
+    `GherkinClauseStrGen` creates the template only once per clause, so that rendering the
+    clause for each variation only substitutes the variable values.
+    """
 
-def get_fc_str_sorted(
-    clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    assert URI_BDD_PRED_REF_OBJ in clause.variable_by_role, (
-        f"SortedInto fluent '{clause.id}' does not have 'ref-obj' property"
-    )
-    obj_id = clause.variable_by_role[URI_BDD_PRED_REF_OBJ][0]
-    assert isinstance(obj_id, URIRef), (
-        f"SortedInto fluent '{clause.id}' does not have URI 'ref-obj' property"
-    )
-    assert obj_id in var_values, (
-        f"SortedInto fluent '{clause.id}': no value for obj '{obj_id}', available vars: {list(var_values.keys())}"
-    )
-    obj_value_str = var_val_to_str(var_val=var_values[obj_id], ns_manager=ns_manager)
+    _tmpl_creator: VarTmplCreatorProtocol
 
-    assert URI_BDD_PRED_REF_WS in clause.variable_by_role, (
-        f"SortedInto fluent '{clause.id}' does not have 'ref-ws' property"
-    )
-    ws_id = clause.variable_by_role[URI_BDD_PRED_REF_WS][0]
-    assert isinstance(ws_id, URIRef), (
-        f"SortedInto fluent '{clause.id}' does not have URI 'ref-ws' property"
-    )
-    assert ws_id in var_values, (
-        f"SortedInto fluent '{clause.id}': no value for ws '{ws_id}', available vars: {list(var_values.keys())}"
-    )
-    ws_value_str = var_val_to_str(var_val=var_values[ws_id], ns_manager=ns_manager)
+    def __init__(self, tmpl_creator: VarTmplCreatorProtocol) -> None:
+        self._tmpl_creator = tmpl_creator
 
-    return f'"{obj_value_str}" are sorted into "{ws_value_str}"'
+    def create_template(
+        self, model: ModelBase, ns_manager: NamespaceManager
+    ) -> Optional[VariableStrTemplate]:
+        return self._tmpl_creator(model=model, ns_manager=ns_manager)
 
+    def _render(
+        self, model: ModelBase, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
+    ) -> str:
+        tmpl = self.create_template(model=model, ns_manager=ns_manager)
+        assert tmpl is not None, f"clause '{model.id.n3(ns_manager)}' has wrong types"
+        return tmpl.render(var_values=var_values, ns_manager=ns_manager)
 
-def get_fc_str_tmpl(
-    clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    tmpl = get_tmpl_fc_str_tmpl(model=clause, ns_manager=ns_manager)
-    assert tmpl is not None, f"StringTemplate clause {clause.id.n3(ns_manager)} has wrong types"
-    return tmpl.render(var_values=var_values, ns_manager=ns_manager)
 
+class FluentClauseTmplStrGen(VarTmplStrGen):
+    def __call__(
+        self, clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
+    ) -> str:
+        return self._render(model=clause, var_values=var_values, ns_manager=ns_manager)
 
-def get_fc_str_config(
-    clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    tmpl = get_tmpl_fc_config(model=clause, ns_manager=ns_manager)
-    assert tmpl is not None, f"HasConfig clause {clause.id.n3(ns_manager)} has wrong types"
-    return tmpl.render(var_values=var_values, ns_manager=ns_manager)
 
+get_fc_str_located_at = FluentClauseTmplStrGen(get_tmpl_fc_located_at)
+get_fc_str_is_held = FluentClauseTmplStrGen(get_tmpl_fc_is_held)
+get_fc_str_move_safe = FluentClauseTmplStrGen(get_tmpl_fc_move_safe)
+get_fc_str_sorted = FluentClauseTmplStrGen(get_tmpl_fc_sorted)
+get_fc_str_tmpl = FluentClauseTmplStrGen(get_tmpl_fc_str_tmpl)
+get_fc_str_config = FluentClauseTmplStrGen(get_tmpl_fc_config)
 
 DEFAULT_FLUENT_CLAUSE_STR_GENS = {
     URI_BDD_TYPE_LOCATED_AT: get_fc_str_located_at,
@@ -190,20 +224,39 @@ class WhenBhvToStringProtocol(Protocol):
     ) -> str: ...
 
 
-def get_bhv_str_pickplace(
-    when_bhv: WhenBehaviourModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-) -> str:
-    tmpl = get_tmpl_bhv_pickplace(model=when_bhv)
-    assert tmpl is not None, (
-        f"WhenBehaviour '{when_bhv.id.n3(ns_manager)}' has wrong types: {when_bhv.types}"
-    )
-    return tmpl.render(var_values=var_values, ns_manager=ns_manager)
+class WhenBhvTmplStrGen(VarTmplStrGen):
+    def __call__(
+        self,
+        when_bhv: WhenBehaviourModel,
+        var_values: dict[URIRef, Any],
+        ns_manager: NamespaceManager,
+    ) -> str:
+        return self._render(model=when_bhv, var_values=var_values, ns_manager=ns_manager)
+
+
+get_bhv_str_pickplace = WhenBhvTmplStrGen(get_tmpl_bhv_pickplace)
+
+DEFAULT_WHEN_BHV_STR_GENS = [get_bhv_str_pickplace]
 
 
 class GherkinClauseStrGen(object):
+    """Generate Gherkin strings for clauses, caching what doesn't change across variations.
+
+    Templates from `VarTmplStrGen` generators and time constraint strings are created once per
+    clause URI and reused for all variations and scenario variants rendered with the same
+    namespace manager. Other generators are called for every rendering. The caches are cleared
+    when a different manager is used, or by `check_ns_manager` if its bindings changed.
+    """
+
     _tc_str_gens: dict[URIRef, ModelToStrProtocol]
     _fc_str_gens: dict[URIRef, FluentClauseToStringProtocol]
     _wb_str_gens: list[WhenBhvToStringProtocol]
+    _ns_manager: Optional[NamespaceManager]
+    _ns_snapshot: Optional[tuple]
+    _clause_templates: dict[URIRef, Optional[VariableStrTemplate]]
+    _clause_fc_str_gens: dict[URIRef, FluentClauseToStringProtocol]
+    _clause_wb_str_gens: dict[URIRef, WhenBhvToStringProtocol]
+    _clause_tc_strs: dict[URIRef, str]
 
     def __init__(
         self,
@@ -214,22 +267,51 @@ class GherkinClauseStrGen(object):
         self._tc_str_gens = tc_str_gens
         self._fc_str_gens = fc_str_gens
         self._wb_str_gens = wb_str_gens
-
-    def get_fluent_clause_str(
-        self, clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
-    ) -> str:
-        clause_str = None
+        self._ns_manager = None
+        self._ns_snapshot = None
+        self._clear_caches()
+
+    def _clear_caches(self) -> None:
+        self._clause_templates = {}
+        self._clause_fc_str_gens = {}
+        self._clause_wb_str_gens = {}
+        self._clause_tc_strs = {}
+
+    def check_ns_manager(self, ns_manager: NamespaceManager) -> None:
+        """Clear the cached templates & strings if they were created with a different namespace
+        manager, or if the manager's bindings changed since, e.g. once per scenario variant.
+        """
+        # cached templates & strings may contain URIs shortened with the namespace manager
+        ns_snapshot = get_ns_snapshot(ns_manager=ns_manager)
+        if ns_manager is self._ns_manager and ns_snapshot == self._ns_snapshot:
+            return
+        self._clear_caches()
+        self._ns_manager = ns_manager
+        self._ns_snapshot = ns_snapshot
+
+    def _check_ns_manager(self, ns_manager: NamespaceManager) -> None:
+        # bindings are only compared in `check_ns_manager`, not for every clause
+        if ns_manager is not self._ns_manager:
+            self.check_ns_manager(ns_manager=ns_manager)
+
+    def _init_fluent_clause(self, clause: FluentClauseModel, ns_manager: NamespaceManager) -> None:
+        fc_str_gen = None
         for fluent_type in self._fc_str_gens:
             if fluent_type not in clause.types:
                 continue
-            clause_str = self._fc_str_gens[fluent_type](
-                clause=clause, var_values=var_values, ns_manager=ns_manager
-            )
+            fc_str_gen = self._fc_str_gens[fluent_type]
             break
-        assert clause_str is not None, (
+        assert fc_str_gen is not None, (
             f"get_fluent_clause_str: clause '{clause.id}' has unhandled fluent types: {clause.types}"
         )
 
+        tmpl = None
+        if isinstance(fc_str_gen, VarTmplStrGen):
+            tmpl = fc_str_gen.create_template(model=clause, ns_manager=ns_manager)
+            assert tmpl is not None, (
+                f"get_fluent_clause_str: clause '{clause.id}' has wrong types: {clause.types}"
+            )
+
         tc_str = None
         for tc_type in self._tc_str_gens:
             if tc_type not in clause.types:
@@ -241,19 +323,76 @@ class GherkinClauseStrGen(object):
             f"get_fluent_clause_str: clause '{clause.id}' has unhandled time constraint types: {clause.types}"
         )
 
+        self._clause_templates[clause.id] = tmpl
+        self._clause_fc_str_gens[clause.id] = fc_str_gen
+        self._clause_tc_strs[clause.id] = tc_str
+
+    def get_fluent_clause_template(
+        self, clause: FluentClauseModel, ns_manager: NamespaceManager
+    ) -> tuple[Optional[VariableStrTemplate], str]:
+        """Cached template of a fluent clause and its time constraint string.
+
+        The template is None if the clause's string generator is not template-based.
+        """
+        self._check_ns_manager(ns_manager=ns_manager)
+        if clause.id not in self._clause_tc_strs:
+            self._init_fluent_clause(clause=clause, ns_manager=ns_manager)
+
+        return self._clause_templates[clause.id], self._clause_tc_strs[clause.id]
+
+    def get_fluent_clause_str(
+        self, clause: FluentClauseModel, var_values: dict[URIRef, Any], ns_manager: NamespaceManager
+    ) -> str:
+        tmpl, tc_str = self.get_fluent_clause_template(clause=clause, ns_manager=ns_manager)
+        if tmpl is not None:
+            clause_str = tmpl.render(var_values=var_values, ns_manager=ns_manager)
+        else:
+            clause_str = self._clause_fc_str_gens[clause.id](
+                clause=clause, var_values=var_values, ns_manager=ns_manager
+            )
+
         return f"{clause_str} {tc_str}"
 
+    def _init_bhv(self, when_bhv: WhenBehaviourModel, ns_manager: NamespaceManager) -> None:
+        for bhv_str_gen in self._wb_str_gens:
+            tmpl = None
+            if isinstance(bhv_str_gen, VarTmplStrGen):
+                tmpl = bhv_str_gen.create_template(model=when_bhv, ns_manager=ns_manager)
+                if tmpl is None:
+                    continue
+
+            self._clause_templates[when_bhv.id] = tmpl
+            self._clause_wb_str_gens[when_bhv.id] = bhv_str_gen
+            return
+
+        raise RuntimeError(
+            f"get_bhv_str: WhenBehaviour '{when_bhv.id}' has unhandled behaviour types: {when_bhv.behaviour.types}"
+        )
+
+    def get_bhv_template(
+        self, when_bhv: WhenBehaviourModel, ns_manager: NamespaceManager
+    ) -> Optional[VariableStrTemplate]:
+        """Cached template of a WhenBehaviour clause, None if its string generator is not
+        template-based.
+        """
+        self._check_ns_manager(ns_manager=ns_manager)
+        if when_bhv.id not in self._clause_wb_str_gens:
+            self._init_bhv(when_bhv=when_bhv, ns_manager=ns_manager)
+
+        return self._clause_templates[when_bhv.id]
+
     def get_bhv_str(
         self,
         when_bhv: WhenBehaviourModel,
         var_values: dict[URIRef, Any],
         ns_manager: NamespaceManager,
     ) -> str:
-        for bhv_str_gen in self._wb_str_gens:
-            return bhv_str_gen(when_bhv=when_bhv, var_values=var_values, ns_manager=ns_manager)
+        tmpl = self.get_bhv_template(when_bhv=when_bhv, ns_manager=ns_manager)
+        if tmpl is not None:
+            return tmpl.render(var_values=var_values, ns_manager=ns_manager)
 
-        raise RuntimeError(
-            f"get_bhv_str: WhenBehaviour '{when_bhv.id}' has unhandled behaviour types: {when_bhv.behaviour.types}"
+        return self._clause_wb_str_gens[when_bhv.id](
+            when_bhv=when_bhv, var_values=var_values, ns_manager=ns_manager
         )
 
 
@@ -295,7 +434,7 @@ def get_gherkin_clauses_re(
             assert isinstance(elem_id, URIRef), (
                 f"ThereExists '{exists_model.id}': not a URI: {elem_id}"
             )
-            exists_str_set.append(elem_id.n3(namespace_manager=ns_manager))
+            exists_str_set.append(get_uri_str(uri=elem_id, ns_manager=ns_manager))
         var_values[exists_model.quantified_var] = f"any of {exists_str_set}"
 
     for g_clause_id in has_clause_model.clauses_by_role[has_clause_model.scenario.given]:
@@ -377,106 +516,461 @@ def get_gherkin_clauses_re(
         raise RuntimeError(f"clause '{t_clause_id}' not a fluent clause model: {type(t_clause)}")
 
 
-def prepare_scenario_variant_data(
+def _get_template_clause_lines(
+    has_clause_model: IHasClause, clause_str_gen: GherkinClauseStrGen, ns_manager: NamespaceManager
+) -> Optional[list[tuple[str, VariableStrTemplate, str]]]:
+    """(prefix, template, suffix) of each Gherkin clause line, or None if some clause is
+    quantified or not template-based.
+    """
+    if len(has_clause_model.exists_clauses) > 0:
+        return None
+
+    clause_lines = []
+    for role_str, role_id in [
+        ("Given", has_clause_model.scenario.given),
+        ("When", has_clause_model.scenario.when),
+        ("Then", has_clause_model.scenario.then),
+    ]:
+        for clause_id in has_clause_model.clauses_by_role[role_id]:
+            clause = has_clause_model.clauses[clause_id]
+            if isinstance(clause, FluentClauseModel) and role_str != "When":
+                tmpl, tc_str = clause_str_gen.get_fluent_clause_template(
+                    clause=clause, ns_manager=ns_manager
+                )
+                suffix = f" {tc_str}"
+            elif isinstance(clause, WhenBehaviourModel) and role_str == "When":
+                tmpl = clause_str_gen.get_bhv_template(when_bhv=clause, ns_manager=ns_manager)
+                suffix = ""
+            else:
+                return None
+
+            if tmpl is None:
+                return None
+            clause_lines.append((f"{role_str} ", tmpl, suffix))
+
+    return clause_lines
+
+
+def _get_value_key(var_val: Any) -> Any:
+    # lists of URIs, e.g. from table variations, are not hashable
+    if isinstance(var_val, list):
+        return tuple(var_val)
+    return var_val
+
+
+def get_gherkin_clauses_batch(
+    has_clause_model: IHasClause,
+    clause_str_gen: GherkinClauseStrGen,
+    ns_manager: NamespaceManager,
+    var_uri_list: list[URIRef],
+    var_vals_list: list[Any],
+) -> list[list[str]]:
+    """Gherkin clause strings of all variations of a scenario variant.
+
+    If all clauses are template-based and none is quantified, the strings are assembled one
+    clause at a time for all variations: each distinct variable value is converted to a string
+    only once, and each clause is formatted only once per distinct combination of the values
+    it refers to. Otherwise, clauses are rendered per variation with `get_gherkin_clauses_re`.
+    """
+    clause_lines = _get_template_clause_lines(
+        has_clause_model=has_clause_model, clause_str_gen=clause_str_gen, ns_manager=ns_manager
+    )
+    if clause_lines is None:
+        clauses_list = []
+        for var_value_set in var_vals_list:
+            clauses = []
+            get_gherkin_clauses_re(
+                has_clause_model=has_clause_model,
+                clause_str_gen=clause_str_gen,
+                ns_manager=ns_manager,
+                var_values=dict(zip(var_uri_list, var_value_set)),
+                clause_list=clauses,
+            )
+            clauses_list.append(clauses)
+        return clauses_list
+
+    if len(clause_lines) == 0:
+        return [[] for _ in var_vals_list]
+
+    # string columns of the variables, with shared strings for repeated values
+    str_cols = {}
+    for var_idx, var_uri in enumerate(var_uri_list):
+        val_strs = {}
+        str_col = []
+        for var_value_set in var_vals_list:
+            var_val = var_value_set[var_idx]
+            val_key = _get_value_key(var_val)
+            if val_key not in val_strs:
+                val_strs[val_key] = var_val_to_str(var_val=var_val, ns_manager=ns_manager)
+            str_col.append(val_strs[val_key])
+        str_cols[var_uri] = str_col
+
+    line_cols = []
+    for prefix, tmpl, suffix in clause_lines:
+        sub_keys = []
+        sub_cols = []
+        for var_uri, sub_key in tmpl.var_map.items():
+            assert var_uri in str_cols, (
+                f"get_gherkin_clauses_batch: no value supplied for {var_uri.n3(ns_manager)}"
+            )
+            sub_keys.append(sub_key)
+            sub_cols.append(str_cols[var_uri])
+
+        line_strs = {}
+        line_col = []
+        sub_rows = zip(*sub_cols) if len(sub_cols) > 0 else [()] * len(var_vals_list)
+        for sub_vals in sub_rows:
+            if sub_vals not in line_strs:
+                clause_str = tmpl.tmpl_str.format(**dict(zip(sub_keys, sub_vals)))
+                line_strs[sub_vals] = f"{prefix}{clause_str}{suffix}"
+            line_col.append(line_strs[sub_vals])
+        line_cols.append(line_col)
+
+    return [list(clauses) for clauses in zip(*line_cols)]
+
+
+VARIATION_CHUNK_SIZE = 1024
+
+
+def _iter_variation_data(
+    scr_var_model: ScenarioVariantModel,
+    ns_manager: NamespaceManager,
+    scr_var_name: str,
+    scene_data: dict,
+    var_uri_list: list[URIRef],
+    var_vals_iter: Iterator[Any],
+    clause_str_gen: GherkinClauseStrGen,
+    chunk_size: int,
+) -> Generator[dict, None, None]:
+    var_idx = 0
+    while True:
+        # render fixed-size chunks, so that intermediate columns don't grow with the variations
+        var_vals_list = list(islice(var_vals_iter, chunk_size))
+        if len(var_vals_list) == 0:
+            break
+
+        clauses_list = get_gherkin_clauses_batch(
+            has_clause_model=scr_var_model,
+            clause_str_gen=clause_str_gen,
+            ns_manager=ns_manager,
+            var_uri_list=var_uri_list,
+            var_vals_list=var_vals_list,
+        )
+        for var_value_set, clauses in zip(var_vals_list, clauses_list):
+            # Variable scene elements
+            var_scene_elems = set()
+            var_scene_data = scene_data.copy()
+            for var_val in var_value_set:
+                scr_var_model.scene.get_variable_elems_re(
+                    var_val=var_val, var_elems=var_scene_elems
+                )
+            if len(var_scene_elems) > 0:
+                var_scene_data["elements"] = [
+                    get_uri_str(uri=elem_id, ns_manager=ns_manager) for elem_id in var_scene_elems
+                ]
+
+            var_idx += 1
+            yield {
+                FR_NAME: f"{scr_var_name} -- {var_idx}",
+                "clauses": clauses,
+                "scene": var_scene_data,
+            }
+
+
+def iter_scenario_variant_data(
     scr_var_model: ScenarioVariantModel,
     ns_manager: NamespaceManager,
     tc_str_gens: dict[URIRef, ModelToStrProtocol],
     fc_str_gens: dict[URIRef, FluentClauseToStringProtocol],
     wb_str_gens: list[WhenBhvToStringProtocol],
+    variations_getter: TaskVariationsGetterProtocol = iter_task_variations,
+    clause_str_gen: Optional[GherkinClauseStrGen] = None,
+    chunk_size: int = VARIATION_CHUNK_SIZE,
 ) -> dict:
-    scr_var_name = scr_var_model.id.n3(namespace_manager=ns_manager)
-    scr_var_data = {FR_NAME: scr_var_name, FR_VARIATIONS: []}
+    """Template data for a scenario variant, with its variations under `FR_VARIATIONS` as a
+    generator, see `prepare_scenario_variant_data`.
+
+    Variations are consumed from `variations_getter` and rendered in chunks of `chunk_size`
+    only as the generator is iterated, so at most one chunk is kept in memory while streaming
+    a template's output.
+    """
+    assert chunk_size > 0, f"iter_scenario_variant_data: invalid chunk size: {chunk_size}"
+    # prefixes may have been bound since URIs were last shortened with this manager
+    check_uri_str_cache(ns_manager=ns_manager)
+    scr_var_name = get_uri_str(uri=scr_var_model.id, ns_manager=ns_manager)
 
     # Scene data
     scene_data = {}
-    scene_data[FR_NAME] = scr_var_model.scene.id.n3(namespace_manager=ns_manager)
+    scene_data[FR_NAME] = get_uri_str(uri=scr_var_model.scene.id, ns_manager=ns_manager)
 
     obj_list = []
     for obj_id in scr_var_model.scene.objects:
-        obj_list.append(obj_id.n3(namespace_manager=ns_manager))
+        obj_list.append(get_uri_str(uri=obj_id, ns_manager=ns_manager))
     if len(obj_list) > 0:
         scene_data[FR_OBJECTS] = obj_list
 
     ws_list = []
     for ws_id in scr_var_model.scene.workspaces:
-        ws_list.append(ws_id.n3(namespace_manager=ns_manager))
+        ws_list.append(get_uri_str(uri=ws_id, ns_manager=ns_manager))
     if len(ws_list) > 0:
         scene_data[FR_WS] = ws_list
 
     agn_list = []
     for agn_id in scr_var_model.scene.agents:
-        agn_list.append(agn_id.n3(namespace_manager=ns_manager))
+        agn_list.append(get_uri_str(uri=agn_id, ns_manager=ns_manager))
     if len(agn_list) > 0:
         scene_data[FR_AGENTS] = agn_list
 
-    var_uri_list, var_vals_list = get_task_variations(scr_var_model.task_variation)
-    var_count = 1
-    string_gen = GherkinClauseStrGen(
+    var_uri_list, var_vals_iter = variations_getter(task_var=scr_var_model.task_variation)
+    if clause_str_gen is None:
+        clause_str_gen = GherkinClauseStrGen(
+            tc_str_gens=tc_str_gens,
+            fc_str_gens=fc_str_gens,
+            wb_str_gens=wb_str_gens,
+        )
+    clause_str_gen.check_ns_manager(ns_manager=ns_manager)
+
+    return {
+        FR_NAME: scr_var_name,
+        FR_VARIATIONS: _iter_variation_data(
+            scr_var_model=scr_var_model,
+            ns_manager=ns_manager,
+            scr_var_name=scr_var_name,
+            scene_data=scene_data,
+            var_uri_list=var_uri_list,
+            var_vals_iter=iter(var_vals_iter),
+            clause_str_gen=clause_str_gen,
+            chunk_size=chunk_size,
+        ),
+    }
+
+
+def prepare_scenario_variant_data(
+    scr_var_model: ScenarioVariantModel,
+    ns_manager: NamespaceManager,
+    tc_str_gens: dict[URIRef, ModelToStrProtocol],
+    fc_str_gens: dict[URIRef, FluentClauseToStringProtocol],
+    wb_str_gens: list[WhenBhvToStringProtocol],
+    variations_getter: TaskVariationsGetterProtocol = iter_task_variations,
+    clause_str_gen: Optional[GherkinClauseStrGen] = None,
+    chunk_size: int = VARIATION_CHUNK_SIZE,
+) -> dict:
+    """Template data for a scenario variant and all its variations.
+
+    `clause_str_gen` can be shared between scenario variants to reuse its cached clause
+    templates, otherwise one is created from the string generators. Variations are consumed
+    from `variations_getter` and rendered in chunks of `chunk_size`.
+    """
+    scr_var_data = iter_scenario_variant_data(
+        scr_var_model=scr_var_model,
+        ns_manager=ns_manager,
         tc_str_gens=tc_str_gens,
         fc_str_gens=fc_str_gens,
         wb_str_gens=wb_str_gens,
+        variations_getter=variations_getter,
+        clause_str_gen=clause_str_gen,
+        chunk_size=chunk_size,
     )
-    for var_value_set in var_vals_list:
-        var_values = dict(zip(var_uri_list, var_value_set))
-
-        # Variable scene elements
-        var_scene_elems = set()
-        var_scene_data = scene_data.copy()
-        for var_val in var_values.values():
-            scr_var_model.scene.get_variable_elems_re(var_val=var_val, var_elems=var_scene_elems)
-        if len(var_scene_elems) > 0:
-            var_scene_data["elements"] = [
-                elem_id.n3(namespace_manager=ns_manager) for elem_id in var_scene_elems
-            ]
-
-        clauses = []
-        get_gherkin_clauses_re(
-            has_clause_model=scr_var_model,
-            clause_str_gen=string_gen,
+    scr_var_data[FR_VARIATIONS] = list(scr_var_data[FR_VARIATIONS])
+    return scr_var_data
+
+
+def _iter_scenario_variant_data(
+    us_loader: UserStoryLoader,
+    full_graph: Graph,
+    scr_var_ids: Iterable[URIRef],
+    ns_manager: NamespaceManager,
+    tc_str_gens: dict[URIRef, ModelToStrProtocol],
+    fc_str_gens: dict[URIRef, FluentClauseToStringProtocol],
+    wb_str_gens: list[WhenBhvToStringProtocol],
+    variations_getter: TaskVariationsGetterProtocol,
+    clause_str_gen: GherkinClauseStrGen,
+) -> Generator[dict, None, None]:
+    for scr_var_id in scr_var_ids:
+        scr_var = us_loader.load_scenario_variant(full_graph=full_graph, variant_id=scr_var_id)
+        yield iter_scenario_variant_data(
+            scr_var_model=scr_var,
             ns_manager=ns_manager,
-            var_values=var_values,
-            clause_list=clauses,
-        )
-        scr_var_data[FR_VARIATIONS].append(
-            {FR_NAME: f"{scr_var_name} -- {var_count}", "clauses": clauses, "scene": var_scene_data}
+            tc_str_gens=tc_str_gens,
+            fc_str_gens=fc_str_gens,
+            wb_str_gens=wb_str_gens,
+            variations_getter=variations_getter,
+            clause_str_gen=clause_str_gen,
         )
-        var_count += 1
-
-    return scr_var_data
 
 
-def prepare_jinja2_template_data(
+def iter_jinja2_template_data(
     us_loader: UserStoryLoader,
     full_graph: Graph,
     ns_manager: Optional[NamespaceManager] = None,
     tc_str_gens: dict[URIRef, ModelToStrProtocol] = DEFAULT_TIME_CSTR_STR_GENS,
     fc_str_gens: dict[URIRef, FluentClauseToStringProtocol] = DEFAULT_FLUENT_CLAUSE_STR_GENS,
-    wb_str_gens: list[WhenBhvToStringProtocol] = [get_bhv_str_pickplace],
-) -> list[dict]:
-    """TODO(minhnh): specify which template"""
+    wb_str_gens: list[WhenBhvToStringProtocol] = DEFAULT_WHEN_BHV_STR_GENS,
+    workers: int = 1,
+    variations_getter: TaskVariationsGetterProtocol = iter_task_variations,
+    us_ids: Optional[Iterable[URIRef]] = None,
+) -> Generator[dict, None, None]:
+    """Yield the template data of one user story at a time, see `prepare_jinja2_template_data`.
+
+    The scenario variant data under `FR_CRITERIA` is a generator, which prepares each variant
+    only when iterated, e.g. while streaming a template's output with `render_template_to_file`.
+    The variations of each variant under `FR_VARIATIONS` are also generators, which render
+    them in chunks, see `iter_scenario_variant_data`. Only the current chunk of variations is
+    then kept in memory. Templates which iterate the criteria or variations more than once or
+    need their length, or functions like `shard_us_data`, need the data converted to lists
+    first with `get_us_data_lists`. If `us_ids` is specified, only these user stories are
+    yielded.
+    """
     if ns_manager is None:
         ns_manager = full_graph.namespace_manager
+    # prefixes may have been bound since URIs were last shortened with this manager
+    check_uri_str_cache(ns_manager=ns_manager)
 
     us_var_dict = us_loader.get_us_scenario_variants()
-    jinja_data = []
+    if us_ids is not None:
+        us_var_dict = {us_id: us_var_dict[us_id] for us_id in us_ids}
+
+    if workers > 1:
+        # only the variants of the user stories to be rendered
+        us_loader.load_all_scenario_variants(
+            full_graph=full_graph,
+            workers=workers,
+            var_ids={var_id for scr_var_set in us_var_dict.values() for var_id in scr_var_set},
+        )
+    clause_str_gen = GherkinClauseStrGen(
+        tc_str_gens=tc_str_gens, fc_str_gens=fc_str_gens, wb_str_gens=wb_str_gens
+    )
     for us_id, scr_var_set in us_var_dict.items():
-        us_id_str = us_id.n3(namespace_manager=ns_manager)
-        us_data = {FR_NAME: us_id_str, FR_CRITERIA: []}
-
-        for scr_var_id in scr_var_set:
-            scr_var = us_loader.load_scenario_variant(full_graph=full_graph, variant_id=scr_var_id)
-
-            # ScenarioVariant data
-            scr_var_data = prepare_scenario_variant_data(
-                scr_var_model=scr_var,
+        yield {
+            FR_NAME: get_uri_str(uri=us_id, ns_manager=ns_manager),
+            FR_CRITERIA: _iter_scenario_variant_data(
+                us_loader=us_loader,
+                full_graph=full_graph,
+                scr_var_ids=scr_var_set,
                 ns_manager=ns_manager,
                 tc_str_gens=tc_str_gens,
                 fc_str_gens=fc_str_gens,
                 wb_str_gens=wb_str_gens,
-            )
+                variations_getter=variations_getter,
+                clause_str_gen=clause_str_gen,
+            ),
+        }
+
 
-            us_data[FR_CRITERIA].append(scr_var_data)
+def get_us_data_lists(us_data: dict) -> dict:
+    """Convert the generators of a user story's data from `iter_jinja2_template_data` to lists"""
+    criteria = []
+    for scr_var_data in us_data[FR_CRITERIA]:
+        scr_var_data[FR_VARIATIONS] = list(scr_var_data[FR_VARIATIONS])
+        criteria.append(scr_var_data)
+    us_data[FR_CRITERIA] = criteria
+    return us_data
 
-        jinja_data.append(us_data)
+
+def prepare_jinja2_template_data(
+    us_loader: UserStoryLoader,
+    full_graph: Graph,
+    ns_manager: Optional[NamespaceManager] = None,
+    tc_str_gens: dict[URIRef, ModelToStrProtocol] = DEFAULT_TIME_CSTR_STR_GENS,
+    fc_str_gens: dict[URIRef, FluentClauseToStringProtocol] = DEFAULT_FLUENT_CLAUSE_STR_GENS,
+    wb_str_gens: list[WhenBhvToStringProtocol] = DEFAULT_WHEN_BHV_STR_GENS,
+    workers: int = 1,
+    variations_getter: TaskVariationsGetterProtocol = iter_task_variations,
+) -> list[dict]:
+    """TODO(minhnh): specify which template
+
+    If `workers` > 1, all scenario variants are first loaded in parallel processes.
+    `variations_getter` selects the variations to render, e.g. all of them or a sample using
+    `bdd_dsl.models.sampling.VariationSampler`.
+    """
+    jinja_data = []
+    for us_data in iter_jinja2_template_data(
+        us_loader=us_loader,
+        full_graph=full_graph,
+        ns_manager=ns_manager,
+        tc_str_gens=tc_str_gens,
+        fc_str_gens=fc_str_gens,
+        wb_str_gens=wb_str_gens,
+        workers=workers,
+        variations_getter=variations_getter,
+    ):
+        jinja_data.append(get_us_data_lists(us_data=us_data))
 
     return jinja_data
+
+
+def render_template_to_file(template: Template, file_path: str, **kwargs: Any) -> None:
+    """Write the output of a template to a file as it is generated, without building the whole
+    output string in memory. Keyword arguments are passed to the template as context.
+    """
+    with open(file_path, mode="w", encoding="utf-8") as of:
+        of.writelines(template.generate(**kwargs))
+
+
+def get_variation_cost(var_data: dict) -> int:
+    """Estimated execution cost of a rendered variation, i.e. its number of steps"""
+    return max(1, len(var_data.get("clauses", [])))
+
+
+def shard_us_data(us_data: dict, num_shards: int, by_cost: bool = False) -> list[dict]:
+    """Partition the variations of a user story's template data into balanced shards.
+
+    Each shard has the same structure as `us_data` and contains a subset of the variations,
+    so it can be rendered into a separate feature file. By default, shards contain contiguous
+    runs of variations of near-equal count. If `by_cost` is set, variations are distributed
+    greedily to balance the total estimated cost, see `get_variation_cost`. Empty shards are
+    omitted, so fewer than `num_shards` shards may be returned.
+    """
+    assert num_shards > 0, f"shard_us_data: invalid number of shards: {num_shards}"
+
+    # (criterion index, variation index) of all variations
+    var_indices = []
+    for crit_idx, scr_var_data in enumerate(us_data[FR_CRITERIA]):
+        for var_idx in range(len(scr_var_data[FR_VARIATIONS])):
+            var_indices.append((crit_idx, var_idx))
+
+    shard_indices = [[] for _ in range(num_shards)]
+    if by_cost:
+        costs = {
+            (crit_idx, var_idx): get_variation_cost(
+                us_data[FR_CRITERIA][crit_idx][FR_VARIATIONS][var_idx]
+            )
+            for crit_idx, var_idx in var_indices
+        }
+        # longest processing time first: assign most costly variations to least loaded shards
+        shard_loads = [(0, shard_idx) for shard_idx in range(num_shards)]
+        for indices in sorted(var_indices, key=lambda idx: costs[idx], reverse=True):
+            load, shard_idx = heapq.heappop(shard_loads)
+            shard_indices[shard_idx].append(indices)
+            heapq.heappush(shard_loads, (load + costs[indices], shard_idx))
+        for indices in shard_indices:
+            indices.sort()
+    else:
+        shard_size, remainder = divmod(len(var_indices), num_shards)
+        start = 0
+        for shard_idx in range(num_shards):
+            end = start + shard_size + (1 if shard_idx < remainder else 0)
+            shard_indices[shard_idx] = var_indices[start:end]
+            start = end
+
+    shards = []
+    for indices in shard_indices:
+        if len(indices) == 0:
+            continue
+
+        shard_data = {key: val for key, val in us_data.items() if key != FR_CRITERIA}
+        shard_data[FR_CRITERIA] = []
+        crit_data = None
+        last_crit_idx = None
+        for crit_idx, var_idx in indices:
+            scr_var_data = us_data[FR_CRITERIA][crit_idx]
+            if crit_idx != last_crit_idx:
+                crit_data = {key: val for key, val in scr_var_data.items() if key != FR_VARIATIONS}
+                crit_data[FR_VARIATIONS] = []
+                shard_data[FR_CRITERIA].append(crit_data)
+                last_crit_idx = crit_idx
+            assert crit_data is not None
+            crit_data[FR_VARIATIONS].append(scr_var_data[FR_VARIATIONS][var_idx])
+        shards.append(shard_data)
+
+    return shards
@@ -0,0 +1,138 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable, Optional
+from urllib.parse import urljoin, urlsplit
+from rdflib import Graph
+from rdf_utils.caching import read_url_and_cache
+
+
+JSONLD_KEY_BASE = "@base"
+JSONLD_KEY_CONTEXT = "@context"
+# resolved contexts, keyed by the JSON content of the `@context` value
+_JSONLD_CONTEXTS: dict[str, list] = {}
+_JSONLD_CONTEXTS_LOCK = Lock()
+
+
+def _is_absolute_context(context_data: Any) -> bool:
+    """Whether the context can be resolved without a document base, i.e. it only references
+    context documents with absolute URLs and doesn't set `@base`.
+    """
+    ctx_list = context_data if isinstance(context_data, list) else [context_data]
+    for ctx in ctx_list:
+        if isinstance(ctx, str) and not urlsplit(ctx).scheme:
+            return False
+        if isinstance(ctx, dict) and JSONLD_KEY_BASE in ctx:
+            return False
+        if not isinstance(ctx, (str, dict)):
+            return False
+    return True
+
+
+def _resolve_context(context_data: Any, context_url: Optional[str] = None) -> list:
+    """Context value with the referenced context documents replaced by their `@context`"""
+    resolved = []
+    ctx_list = context_data if isinstance(context_data, list) else [context_data]
+    for ctx in ctx_list:
+        if not isinstance(ctx, str):
+            resolved.append(ctx)
+            continue
+
+        # context documents may reference others relative to their own URL
+        ctx_doc_url = ctx if context_url is None else urljoin(context_url, ctx)
+        ctx_doc = json.loads(read_url_and_cache(ctx_doc_url))
+        if not isinstance(ctx_doc, dict) or JSONLD_KEY_CONTEXT not in ctx_doc:
+            raise ValueError(
+                f"JSON-LD: no '{JSONLD_KEY_CONTEXT}' in context document '{ctx_doc_url}'"
+            )
+        resolved.extend(_resolve_context(ctx_doc[JSONLD_KEY_CONTEXT], context_url=ctx_doc_url))
+    return resolved
+
+
+def get_jsonld_context(context_data: Any) -> Optional[list]:
+    """Resolve a JSON-LD `@context` value, cached by its JSON content.
+
+    The result is a list of the context's inline definitions, where the referenced context
+    documents are replaced by their own `@context` content, so it can be given to rdflib's
+    JSON-LD parser via the `context` argument without fetching any document. Returns None if
+    the context references documents by relative URLs or sets `@base`, since those depend on
+    the base of the document containing it. The returned list must not be modified.
+    """
+    if not _is_absolute_context(context_data):
+        return None
+
+    ctx_key = json.dumps(context_data, sort_keys=True)
+    with _JSONLD_CONTEXTS_LOCK:
+        context = _JSONLD_CONTEXTS.get(ctx_key)
+        if context is None:
+            context = _resolve_context(context_data)
+            _JSONLD_CONTEXTS[ctx_key] = context
+        return context
+
+
+def clear_jsonld_context_cache() -> None:
+    with _JSONLD_CONTEXTS_LOCK:
+        _JSONLD_CONTEXTS.clear()
+
+
+def parse_jsonld(graph: Graph, data: Any, base: str) -> None:
+    """Add triples from decoded JSON-LD data to `graph`, same as `graph.parse(format="json-ld")`.
+
+    The top-level `@context` is resolved once per distinct value via `get_jsonld_context`
+    instead of once per document.
+    """
+    context = None
+    if isinstance(data, dict) and data.get(JSONLD_KEY_CONTEXT):
+        context = get_jsonld_context(data[JSONLD_KEY_CONTEXT])
+
+    if context is None:
+        graph.parse(data=json.dumps(data), format="json-ld", base=base)
+        return
+
+    doc_data = {key: val for key, val in data.items() if key != JSONLD_KEY_CONTEXT}
+    graph.parse(data=json.dumps(doc_data), format="json-ld", base=base, context=context)
+
+
+def _get_source_base(source: str) -> str:
+    if os.path.isfile(source):
+        return Path(source).resolve().as_uri()
+    return source
+
+
+def read_jsonld_source(source: str) -> Any:
+    """Decode the JSON content of a local file or a URL, the latter cached on disk."""
+    if os.path.isfile(source):
+        with open(source, mode="r", encoding="utf-8") as jsonld_file:
+            data = json.load(jsonld_file)
+    else:
+        data = json.loads(read_url_and_cache(source))
+
+    # resolve the context while still in the worker thread
+    if isinstance(data, dict) and data.get(JSONLD_KEY_CONTEXT):
+        get_jsonld_context(data[JSONLD_KEY_CONTEXT])
+    return data
+
+
+def load_jsonld_models(graph: Graph, sources: Iterable[str], workers: int = 1) -> Graph:
+    """Parse JSON-LD models from local files or URLs into `graph`.
+
+    With `workers > 1`, the sources are read, decoded and have their contexts resolved in a
+    thread pool. Triples are added to `graph` in the order of `sources` from the calling
+    thread, since rdflib stores are not thread-safe.
+    """
+    assert workers > 0, f"invalid number of workers: {workers}"
+    source_list = list(sources)
+
+    if workers == 1:
+        for source in source_list:
+            parse_jsonld(graph, read_jsonld_source(source), base=_get_source_base(source))
+        return graph
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for source, data in zip(source_list, executor.map(read_jsonld_source, source_list)):
+            parse_jsonld(graph, data, base=_get_source_base(source))
+
+    return graph
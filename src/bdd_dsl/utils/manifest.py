@@ -0,0 +1,89 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import json
+import os
+from bdd_dsl.utils.common import BDD_DSL_VERSION
+
+
+MANIFEST_FILENAME = ".bdd-manifest.json"
+_KEY_VERSION = "version"
+_KEY_CONTEXT = "context"
+_KEY_FEATURES = "features"
+_KEY_DIGEST = "digest"
+_KEY_FILES = "files"
+
+
+class FeatureManifest(object):
+    """Record of the model digests from which the feature files of each user story were generated.
+
+    Used to only regenerate the features of user stories whose models changed. `context`
+    should identify the other generation inputs, e.g. the Jinja template & sampling settings;
+    all entries are discarded if it or the package version differs from the stored manifest.
+    Feature file paths are stored relative to the manifest's directory.
+    """
+
+    file_path: str
+    context: str
+    _features: dict[str, dict]
+
+    def __init__(self, file_path: str, context: str = "") -> None:
+        self.file_path = file_path
+        self.context = context
+        self._features = {}
+
+        if not os.path.isfile(file_path):
+            return
+
+        try:
+            with open(file_path, mode="r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(manifest, dict):
+            return
+        if manifest.get(_KEY_VERSION) != BDD_DSL_VERSION or manifest.get(_KEY_CONTEXT) != context:
+            return
+
+        features = manifest.get(_KEY_FEATURES)
+        if isinstance(features, dict):
+            self._features = features
+
+    def _get_rel_path(self, feature_path: str) -> str:
+        return os.path.relpath(feature_path, start=os.path.dirname(os.path.abspath(self.file_path)))
+
+    def _get_abs_path(self, rel_path: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.file_path)), rel_path)
+
+    def is_up_to_date(self, us_name: str, digest: str) -> bool:
+        """Whether the features of a user story were generated from models with the same digest
+        and all still exist.
+        """
+        entry = self._features.get(us_name)
+        if entry is None or entry.get(_KEY_DIGEST) != digest:
+            return False
+
+        return all(os.path.isfile(self._get_abs_path(rel_path)) for rel_path in entry[_KEY_FILES])
+
+    def update(self, us_name: str, digest: str, feature_paths: list[str]) -> None:
+        self._features[us_name] = {
+            _KEY_DIGEST: digest,
+            _KEY_FILES: [self._get_rel_path(feature_path) for feature_path in feature_paths],
+        }
+
+    def save(self) -> None:
+        """Write the manifest, replacing any existing file atomically."""
+        manifest_dir = os.path.dirname(os.path.abspath(self.file_path))
+        os.makedirs(manifest_dir, exist_ok=True)
+        tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as manifest_file:
+            json.dump(
+                {
+                    _KEY_VERSION: BDD_DSL_VERSION,
+                    _KEY_CONTEXT: self.context,
+                    _KEY_FEATURES: self._features,
+                },
+                manifest_file,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.file_path)
@@ -0,0 +1,89 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+from typing import Iterable
+from pyshacl import validate
+from rdflib import BNode, Graph, URIRef
+from rdf_utils.caching import read_url_and_cache
+from bdd_dsl.exception import BDDConstraintViolation
+
+
+_SHAPES_GRAPHS: dict[frozenset, Graph] = {}
+
+
+def load_shacl_graph(shacl_dict: dict[str, str]) -> Graph:
+    """Parse SHACL shapes given as a dict of URL -> format, reusing previously parsed shapes."""
+    shapes_key = frozenset(shacl_dict.items())
+    if shapes_key in _SHAPES_GRAPHS:
+        return _SHAPES_GRAPHS[shapes_key]
+
+    shacl_g = Graph()
+    for url, fmt in shacl_dict.items():
+        shacl_g.parse(data=read_url_and_cache(url), format=fmt, publicID=url)
+
+    _SHAPES_GRAPHS[shapes_key] = shacl_g
+    return shacl_g
+
+
+def _get_uri_referrers_re(graph: Graph, node: BNode, visited: set[BNode]) -> Iterable[URIRef]:
+    if node in visited:
+        return
+    visited.add(node)
+
+    for referrer in graph.subjects(object=node):
+        if isinstance(referrer, URIRef):
+            yield referrer
+        elif isinstance(referrer, BNode):
+            yield from _get_uri_referrers_re(graph=graph, node=referrer, visited=visited)
+
+
+def get_delta_focus_nodes(graph: Graph, delta_graph: Graph) -> set[URIRef]:
+    """Collect the nodes whose SHACL validation may be affected by the triples in `delta_graph`.
+
+    These are the URI subjects & objects of the new triples, the URI nodes which own blank nodes
+    in the new triples, e.g. RDF lists, and the URI nodes in `graph` referring to any of them.
+    """
+    delta_nodes = set()
+    visited_bnodes = set()
+    for subj, _, obj in delta_graph.triples((None, None, None)):
+        for node in (subj, obj):
+            if isinstance(node, URIRef):
+                delta_nodes.add(node)
+            elif isinstance(node, BNode):
+                for uri in _get_uri_referrers_re(graph=graph, node=node, visited=visited_bnodes):
+                    delta_nodes.add(uri)
+
+    focus_nodes = set(delta_nodes)
+    for node in delta_nodes:
+        for referrer in graph.subjects(object=node):
+            if isinstance(referrer, URIRef):
+                focus_nodes.add(referrer)
+
+    return focus_nodes
+
+
+def check_shacl_constraints_delta(
+    graph: Graph, delta_graph: Graph, shacl_dict: dict[str, str], quiet: bool = False
+) -> bool:
+    """Validate only the nodes touched by newly added triples against SHACL shapes.
+
+    `graph` must already contain the triples in `delta_graph`, and should have been validated
+    against the same shapes before the new triples were added. The validation cost is then
+    proportional to the size of the delta rather than the full graph.
+
+    :raises BDDConstraintViolation: if the affected nodes violate the constraints
+    """
+    focus_nodes = get_delta_focus_nodes(graph=graph, delta_graph=delta_graph)
+    if len(focus_nodes) == 0:
+        return True
+
+    conforms, _, report_text = validate(
+        data_graph=graph,
+        shacl_graph=load_shacl_graph(shacl_dict=shacl_dict),
+        focus_nodes=list(focus_nodes),
+    )
+    if not quiet:
+        print(report_text)
+
+    if not conforms:
+        raise BDDConstraintViolation(report_text)
+
+    return True
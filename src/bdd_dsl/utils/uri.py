@@ -0,0 +1,76 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+from functools import lru_cache, partial
+from typing import Callable, Optional
+from weakref import WeakKeyDictionary, ref
+from rdflib import URIRef
+from rdflib.namespace import NamespaceManager
+
+
+URI_STR_CACHE_SIZE = 4096
+# per namespace manager: snapshot of its bindings & cached conversion function
+_URI_STR_FUNCS: "WeakKeyDictionary[NamespaceManager, tuple[tuple, Callable[[URIRef], str]]]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_ns_snapshot(ns_manager: NamespaceManager) -> tuple:
+    """Prefix bindings of a namespace manager, to detect changes to them"""
+    return tuple(ns_manager.namespaces())
+
+
+def _bind_and_clear(ns_manager: NamespaceManager, *args, **kwargs) -> None:
+    NamespaceManager.bind(ns_manager, *args, **kwargs)
+    _URI_STR_FUNCS.pop(ns_manager, None)
+
+
+def _create_uri_str_func(ns_manager: NamespaceManager) -> Callable[[URIRef], str]:
+    # weak reference, since the cache is a value of the weak-keyed dictionary
+    ns_manager_ref = ref(ns_manager)
+
+    @lru_cache(maxsize=URI_STR_CACHE_SIZE)
+    def uri_str_func(uri: URIRef) -> str:
+        return uri.n3(namespace_manager=ns_manager_ref())
+
+    return uri_str_func
+
+
+def clear_uri_str_cache(ns_manager: Optional[NamespaceManager] = None) -> None:
+    """Drop the cached strings of a namespace manager, or of all managers if not specified"""
+    if ns_manager is None:
+        _URI_STR_FUNCS.clear()
+        return
+
+    _URI_STR_FUNCS.pop(ns_manager, None)
+
+
+def check_uri_str_cache(ns_manager: NamespaceManager) -> None:
+    """Clear the cached strings of a namespace manager if its bindings changed since they were
+    cached, e.g. once before rendering the models of a graph.
+    """
+    cache_entry = _URI_STR_FUNCS.get(ns_manager)
+    if cache_entry is not None and cache_entry[0] != get_ns_snapshot(ns_manager=ns_manager):
+        del _URI_STR_FUNCS[ns_manager]
+
+
+def get_uri_str(uri: URIRef, ns_manager: Optional[NamespaceManager] = None) -> str:
+    """Same as `uri.n3(namespace_manager=ns_manager)`, with results cached per namespace manager.
+
+    The cache is bounded by `URI_STR_CACHE_SIZE` and dropped whenever a prefix is bound through
+    the manager, e.g. with `Graph.bind`. Bindings added to the underlying store by other means
+    are detected by `check_uri_str_cache`.
+    """
+    if ns_manager is None:
+        return uri.n3()
+
+    cache_entry = _URI_STR_FUNCS.get(ns_manager)
+    if cache_entry is None:
+        if "bind" not in vars(ns_manager):
+            # only this manager's bind, the class is left unchanged
+            ns_manager.bind = partial(_bind_and_clear, ns_manager)
+        cache_entry = (
+            get_ns_snapshot(ns_manager=ns_manager),
+            _create_uri_str_func(ns_manager=ns_manager),
+        )
+        _URI_STR_FUNCS[ns_manager] = cache_entry
+
+    return cache_entry[1](uri)
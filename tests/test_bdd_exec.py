@@ -1,7 +1,9 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
 import unittest
 from urllib.request import HTTPError
-from rdflib import Dataset
+from pyshacl import validate
+from rdflib import Dataset, Graph
+from rdflib.namespace import SH
 from rdf_utils.namespace import URL_SECORO_M, URL_MM_PYTHON_SHACL
 from rdf_utils.models.python import (
     URI_PY_TYPE_MODULE_ATTR,
@@ -20,6 +22,12 @@ from bdd_dsl.models.agent import AgentModel
 from bdd_dsl.models.environment import ObjectModel
 from rdf_utils.models.vocab import URI_EXEC_PRED_PATH, URI_EXEC_TYPE_SYS_RES
 from bdd_dsl.models.user_story import UserStoryLoader
+from bdd_dsl.exception import BDDConstraintViolation
+from bdd_dsl.utils.shacl import (
+    check_shacl_constraints_delta,
+    get_delta_focus_nodes,
+    load_shacl_graph,
+)
 
 
 SPEC_MODEL_URLS = {
@@ -40,6 +48,17 @@ SHACL_URLS = {
 }
 
 
+def _get_violations(results_graph: Graph) -> set[tuple]:
+    return {
+        (
+            results_graph.value(result, SH.focusNode),
+            results_graph.value(result, SH.resultPath),
+            results_graph.value(result, SH.sourceConstraintComponent),
+        )
+        for result in results_graph.subjects(SH.resultSeverity, SH.Violation)
+    }
+
+
 class BDDExecTest(unittest.TestCase):
     def setUp(self):
         install_resolver()
@@ -54,13 +73,54 @@ class BDDExecTest(unittest.TestCase):
         # UserStoryLoader should not need execution info
         self.us_loader = UserStoryLoader(self.graph)
 
+        exec_graph = Graph()
         for url, fmt in EXEC_MODEL_URLS.items():
             try:
-                self.graph.parse(url, format=fmt)
+                exec_graph.parse(url, format=fmt)
             except HTTPError as e:
                 raise RuntimeError(f"HTTPError for URL '{url}': {e}")
+        for triple in exec_graph:
+            self.graph.add(triple)
 
         check_shacl_constraints(graph=self.graph, shacl_dict=SHACL_URLS)
+        # the full graph was validated above
+        self.us_loader.add_models(full_graph=self.graph, delta_graph=exec_graph, shacl_check=False)
+        self.exec_graph = exec_graph
+
+    def test_delta_validation(self):
+        # invalid execution models: Python module attributes without module & attribute names
+        removed_preds = (URI_PY_PRED_MODULE_NAME, URI_PY_PRED_ATTR_NAME)
+        invalid_graph = Graph()
+        for triple in self.graph.triples((None, None, None)):
+            if triple in self.exec_graph and triple[1] in removed_preds:
+                continue
+            invalid_graph.add(triple)
+        invalid_delta = Graph()
+        for triple in self.exec_graph:
+            if triple[1] not in removed_preds:
+                invalid_delta.add(triple)
+
+        shacl_graph = load_shacl_graph(shacl_dict=SHACL_URLS)
+        _, full_results, _ = validate(data_graph=invalid_graph, shacl_graph=shacl_graph)
+        full_violations = _get_violations(full_results)
+        self.assertGreater(len(full_violations), 0)
+
+        focus_nodes = get_delta_focus_nodes(graph=invalid_graph, delta_graph=invalid_delta)
+        _, delta_results, _ = validate(
+            data_graph=invalid_graph, shacl_graph=shacl_graph, focus_nodes=list(focus_nodes)
+        )
+        self.assertEqual(_get_violations(delta_results), full_violations)
+        with self.assertRaises(BDDConstraintViolation):
+            check_shacl_constraints_delta(
+                graph=invalid_graph, delta_graph=invalid_delta, shacl_dict=SHACL_URLS, quiet=True
+            )
+
+        # the valid execution models pass the delta validation
+        self.assertTrue(
+            check_shacl_constraints_delta(
+                graph=self.graph, delta_graph=self.exec_graph, shacl_dict=SHACL_URLS, quiet=True
+            )
+        )
 
     def _test_obj_model(self, obj_model: ObjectModel):
         if URI_EXEC_TYPE_SYS_RES in obj_model.model_types:
@@ -1,11 +1,33 @@
 # SPDX-License-Identifier:  GPL-3.0-or-later
+import os
+import pickle
+import tempfile
 import unittest
+from typing import Callable, Generator, Optional
 import rdflib
+from rdflib import RDF, BNode, Literal
+from rdflib.namespace import NamespaceManager
 from rdf_utils.resolver import install_resolver
 from rdf_utils.namespace import URL_SECORO_M
-from bdd_dsl.models.user_story import UserStoryLoader
-from bdd_dsl.models.frames import FR_CRITERIA, FR_VARIATIONS
-from bdd_dsl.utils.jinja import prepare_jinja2_template_data
+from bdd_dsl.models.sampling import SamplingStrategy, VariationSampler, sample_task_variations
+from bdd_dsl.models.urirefs import URI_BDD_TYPE_CART_PRODUCT
+from bdd_dsl.models.user_story import LazyScenarioVariantModel, UserStoryLoader
+from bdd_dsl.models.variation import TaskVariationModel, get_task_variations
+from bdd_dsl.models.frames import FR_CRITERIA, FR_NAME, FR_VARIATIONS
+from bdd_dsl.utils.jinja import (
+    DEFAULT_FLUENT_CLAUSE_STR_GENS,
+    DEFAULT_TIME_CSTR_STR_GENS,
+    DEFAULT_WHEN_BHV_STR_GENS,
+    GherkinClauseStrGen,
+    get_jinja_env,
+    get_us_data_lists,
+    iter_jinja2_template_data,
+    iter_scenario_variant_data,
+    prepare_jinja2_template_data,
+    prepare_scenario_variant_data,
+    render_template_to_file,
+)
+from bdd_dsl.utils.graph_index import GraphIndex
 
 MODEL_URLS = {
     f"{URL_SECORO_M}/acceptance-criteria/bdd/environments/secorolab.env.json": "json-ld",
@@ -22,6 +44,41 @@ SORT_MODELS = {
     f"{URL_SECORO_M}/acceptance-criteria/bdd/variations/sorting-secorolab-isaac.var.json": "json-ld",
 }
 
+FEATURE_TEMPLATE = """Feature: {{ data.name }}
+{% for scenario in data.criteria %}{% for variation in scenario.variations %}
+  Scenario: {{ variation.name }} in {{ variation.scene.name }}
+{% for clause in variation.clauses %}    {{ clause }}
+{% endfor %}{% endfor %}{% endfor %}"""
+
+
+def _load_models(*model_dicts: dict[str, str]) -> rdflib.Dataset:
+    graph = rdflib.Dataset()
+    for model_dict in (MODEL_URLS,) + model_dicts:
+        for url, fmt in model_dict.items():
+            graph.parse(url, format=fmt)
+    return graph
+
+
+def _get_variant_data(
+    scr_var,
+    graph: rdflib.Dataset,
+    ns_manager: Optional[NamespaceManager] = None,
+    clause_str_gen: Optional[GherkinClauseStrGen] = None,
+) -> dict:
+    return prepare_scenario_variant_data(
+        scr_var_model=scr_var,
+        ns_manager=graph.namespace_manager if ns_manager is None else ns_manager,
+        tc_str_gens=DEFAULT_TIME_CSTR_STR_GENS,
+        fc_str_gens=DEFAULT_FLUENT_CLAUSE_STR_GENS,
+        wb_str_gens=DEFAULT_WHEN_BHV_STR_GENS,
+        clause_str_gen=clause_str_gen,
+    )
+
+
+def _get_uncached_str_gen(str_gen: Callable[..., str]) -> Callable[..., str]:
+    # not a VarTmplStrGen, so clauses are rendered with a new template for every variation
+    return lambda **kwargs: str_gen(**kwargs)
+
 
 class BDDSpecTest(unittest.TestCase):
     def setUp(self):
@@ -74,6 +131,371 @@ class BDDSpecTest(unittest.TestCase):
                 for var_data in scenario_data[FR_VARIATIONS]:
                     self.assertTrue(len(var_data["clauses"]) > 0)
 
+    def test_lazy_scenario_variant(self):
+        for models in (PP_MODELS, SORT_MODELS):
+            graph = _load_models(models)
+            eager_loader = UserStoryLoader(graph)
+            lazy_loader = UserStoryLoader(graph, shacl_check=False)
+            for scr_var_set in eager_loader.get_us_scenario_variants().values():
+                for scr_var_id in scr_var_set:
+                    eager = eager_loader.load_scenario_variant(
+                        full_graph=graph, variant_id=scr_var_id
+                    )
+                    lazy = lazy_loader.load_scenario_variant(
+                        full_graph=graph, variant_id=scr_var_id, lazy=True
+                    )
+                    self.assertIsInstance(lazy, LazyScenarioVariantModel)
+                    for attr in ("scene", "task_variation", "clauses"):
+                        self.assertNotIn(attr, lazy.__dict__)
+
+                    # pickling loads the components of a copy, the model stays lazy
+                    unpickled = pickle.loads(pickle.dumps(lazy))
+                    for attr in ("scene", "task_variation", "clauses"):
+                        self.assertNotIn(attr, lazy.__dict__)
+                        self.assertIn(attr, unpickled.__dict__)
+                    self.assertIsNotNone(lazy.__dict__["_full_graph"])
+                    self.assertIsNone(unpickled.__dict__["_full_graph"])
+
+                    # attribute access triggers loading
+                    self.assertEqual(set(lazy.clauses), set(eager.clauses))
+                    self.assertIn("clauses", lazy.__dict__)
+                    self.assertEqual(lazy.scene.id, eager.scene.id)
+                    self.assertIn("scene", lazy.__dict__)
+                    self.assertEqual(lazy.when_bhv_id, eager.when_bhv_id)
+
+                    eager_data = _get_variant_data(eager, graph)
+                    self.assertEqual(_get_variant_data(lazy, graph), eager_data)
+                    self.assertEqual(_get_variant_data(unpickled, graph), eager_data)
+
+    def test_parallel_loading(self):
+        # both user stories, so that there are several variants to distribute
+        graph = _load_models(PP_MODELS, SORT_MODELS)
+        serial_loader = UserStoryLoader(graph)
+        serial_loader.load_all_scenario_variants(full_graph=graph, workers=1)
+        parallel_loader = UserStoryLoader(graph, shacl_check=False)
+        parallel_vars = parallel_loader.load_all_scenario_variants(full_graph=graph, workers=2)
+        self.assertGreater(len(parallel_vars), 1)
+
+        self.assertEqual(
+            prepare_jinja2_template_data(parallel_loader, graph),
+            prepare_jinja2_template_data(serial_loader, graph),
+        )
+
+    def test_streamed_rendering(self):
+        graph = _load_models(PP_MODELS, SORT_MODELS)
+        template = get_jinja_env().from_string(FEATURE_TEMPLATE)
+        expected = {
+            us_data[FR_NAME]: template.render(data=us_data)
+            for us_data in prepare_jinja2_template_data(UserStoryLoader(graph), graph)
+        }
+        self.assertGreater(len(expected), 1)
+
+        us_names = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for us_data in iter_jinja2_template_data(UserStoryLoader(graph), graph):
+                us_names.append(us_data[FR_NAME])
+                file_path = os.path.join(tmp_dir, f"{len(us_names)}.feature")
+                render_template_to_file(template, file_path, data=us_data)
+                with open(file_path, mode="rb") as feature_file:
+                    self.assertEqual(
+                        feature_file.read(), expected[us_data[FR_NAME]].encode("utf-8")
+                    )
+        self.assertEqual(sorted(us_names), sorted(expected))
+
+    def test_streamed_variations(self):
+        graph = _load_models(PP_MODELS)
+        us_loader = UserStoryLoader(graph)
+        for scr_var_set in us_loader.get_us_scenario_variants().values():
+            for scr_var_id in scr_var_set:
+                scr_var = us_loader.load_scenario_variant(full_graph=graph, variant_id=scr_var_id)
+                expected = _get_variant_data(scr_var, graph)
+                self.assertGreater(len(expected[FR_VARIATIONS]), 0)
+                for chunk_size in (1, 2, len(expected[FR_VARIATIONS]) + 1):
+                    streamed = iter_scenario_variant_data(
+                        scr_var_model=scr_var,
+                        ns_manager=graph.namespace_manager,
+                        tc_str_gens=DEFAULT_TIME_CSTR_STR_GENS,
+                        fc_str_gens=DEFAULT_FLUENT_CLAUSE_STR_GENS,
+                        wb_str_gens=DEFAULT_WHEN_BHV_STR_GENS,
+                        chunk_size=chunk_size,
+                    )
+                    # variations are rendered while iterated, not collected
+                    self.assertIsInstance(streamed[FR_VARIATIONS], Generator)
+                    self.assertEqual(
+                        get_us_data_lists({FR_CRITERIA: [streamed]}), {FR_CRITERIA: [expected]}
+                    )
+
+    def test_parallel_us_ids(self):
+        graph = _load_models(PP_MODELS, SORT_MODELS)
+        us_loader = UserStoryLoader(graph, shacl_check=False)
+        us_var_dict = us_loader.get_us_scenario_variants()
+        self.assertGreater(len(us_var_dict), 1)
+        us_id = next(iter(us_var_dict))
+
+        # only the requested variants are loaded
+        loaded = UserStoryLoader(graph, shacl_check=False).load_all_scenario_variants(
+            full_graph=graph, workers=2, var_ids=us_var_dict[us_id]
+        )
+        self.assertEqual(set(loaded), us_var_dict[us_id])
+        for var_id, var_model in loaded.items():
+            self.assertEqual(var_model.id, var_id)
+
+        us_data_list = []
+        for us_data in iter_jinja2_template_data(us_loader, graph, workers=2, us_ids=[us_id]):
+            us_data_list.append(get_us_data_lists(us_data=us_data))
+        self.assertEqual(len(us_data_list), 1)
+        self.assertEqual(len(us_data_list[0][FR_CRITERIA]), len(us_var_dict[us_id]))
+
+        serial_data = [
+            us_data
+            for us_data in prepare_jinja2_template_data(UserStoryLoader(graph), graph)
+            if us_data[FR_NAME] == us_data_list[0][FR_NAME]
+        ]
+        self.assertEqual(us_data_list, serial_data)
+
+    def test_graph_index(self):
+        graph = _load_models(PP_MODELS, SORT_MODELS)
+        index = GraphIndex(graph)
+        triples = set(graph.triples((None, None, None)))
+        self.assertEqual(len(index), len(triples))
+
+        patterns = set()
+        for s, p, o in triples:
+            patterns.update(
+                [
+                    (s, None, None),
+                    (s, p, None),
+                    (s, None, o),
+                    (None, p, None),
+                    (None, p, o),
+                    (None, None, o),
+                ]
+            )
+            if p != RDF.type:
+                # paths like those the models follow, e.g. lists & chains of references
+                patterns.update([(s, p * "*", None), (None, p * "+", o), (s, ~p, None)])
+            if p == RDF.first:
+                patterns.add((None, (RDF.rest * "*") / RDF.first, o))
+        for s, p, o in patterns:
+            self.assertEqual(
+                set(index.triples((s, p, o))),
+                set(graph.triples((s, p, o))),
+                f"triples: {(s, p, o)}",
+            )
+            if s is not None and o is None:
+                self.assertEqual(
+                    set(index.objects(subject=s, predicate=p)),
+                    set(graph.objects(subject=s, predicate=p)),
+                    f"objects: {(s, p)}",
+                )
+            if s is None and o is not None:
+                self.assertEqual(
+                    set(index.subjects(predicate=p, object=o)),
+                    set(graph.subjects(predicate=p, object=o)),
+                    f"subjects: {(p, o)}",
+                )
+
+    def test_full_index_invalidation(self):
+        graph = _load_models(PP_MODELS)
+        us_loader = UserStoryLoader(graph)
+        var_id = next(iter(next(iter(us_loader.get_us_scenario_variants().values()))))
+        _, full_subgraph = us_loader.get_variant_subgraphs(full_graph=graph, variant_id=var_id)
+        old_triple = next(
+            triple
+            for triple in full_subgraph.triples((var_id, None, None))
+            if not isinstance(triple[2], BNode)
+        )
+
+        # an edit which keeps the size of the graph
+        new_triple = (old_triple[0], old_triple[1], Literal("edited"))
+        graph.remove(old_triple)
+        graph.add(new_triple)
+        us_loader.clear_full_index()
+        _, full_subgraph = us_loader.get_variant_subgraphs(full_graph=graph, variant_id=var_id)
+        self.assertIn(new_triple, full_subgraph)
+        self.assertNotIn(old_triple, full_subgraph)
+
+        # a different graph object is indexed again
+        other_graph = _load_models(PP_MODELS)
+        _, full_subgraph = us_loader.get_variant_subgraphs(
+            full_graph=other_graph, variant_id=var_id
+        )
+        self.assertIn(old_triple, full_subgraph)
+
+    def test_clause_templates(self):
+        graph = _load_models(PP_MODELS, SORT_MODELS)
+        us_loader = UserStoryLoader(graph)
+        uncached_fc_gens = {
+            fc_type: _get_uncached_str_gen(fc_str_gen)
+            for fc_type, fc_str_gen in DEFAULT_FLUENT_CLAUSE_STR_GENS.items()
+        }
+        uncached_wb_gens = [_get_uncached_str_gen(wb_gen) for wb_gen in DEFAULT_WHEN_BHV_STR_GENS]
+        for scr_var_set in us_loader.get_us_scenario_variants().values():
+            for scr_var_id in scr_var_set:
+                scr_var = us_loader.load_scenario_variant(full_graph=graph, variant_id=scr_var_id)
+                uncached_data = prepare_scenario_variant_data(
+                    scr_var_model=scr_var,
+                    ns_manager=graph.namespace_manager,
+                    tc_str_gens=DEFAULT_TIME_CSTR_STR_GENS,
+                    fc_str_gens=uncached_fc_gens,
+                    wb_str_gens=uncached_wb_gens,
+                )
+                self.assertGreater(len(uncached_data[FR_VARIATIONS]), 0)
+                # templates compiled once per clause & substituted per variation
+                self.assertEqual(_get_variant_data(scr_var, graph), uncached_data)
+
+    def test_clause_cache_ns_manager(self):
+        graph = _load_models(PP_MODELS)
+        us_loader = UserStoryLoader(graph)
+        scr_var_id = next(iter(next(iter(us_loader.get_us_scenario_variants().values()))))
+        scr_var = us_loader.load_scenario_variant(full_graph=graph, variant_id=scr_var_id)
+        clause_str_gen = GherkinClauseStrGen(
+            tc_str_gens=DEFAULT_TIME_CSTR_STR_GENS,
+            fc_str_gens=DEFAULT_FLUENT_CLAUSE_STR_GENS,
+            wb_str_gens=DEFAULT_WHEN_BHV_STR_GENS,
+        )
+        graph_data = _get_variant_data(scr_var, graph, clause_str_gen=clause_str_gen)
+        tmpl = clause_str_gen.get_bhv_template(
+            when_bhv=scr_var.when_bhv_model, ns_manager=graph.namespace_manager
+        )
+        clause_str_gen.check_ns_manager(ns_manager=graph.namespace_manager)
+        self.assertIs(
+            clause_str_gen.get_bhv_template(
+                when_bhv=scr_var.when_bhv_model, ns_manager=graph.namespace_manager
+            ),
+            tmpl,
+        )
+
+        # a different manager, without prefixes
+        ns_manager = NamespaceManager(rdflib.Graph(), bind_namespaces="none")
+        unbound_data = _get_variant_data(
+            scr_var, graph, ns_manager=ns_manager, clause_str_gen=clause_str_gen
+        )
+        self.assertNotEqual(unbound_data, graph_data)
+        self.assertEqual(unbound_data, _get_variant_data(scr_var, graph, ns_manager=ns_manager))
+
+        # same manager with new bindings
+        for prefix, namespace in graph.namespace_manager.namespaces():
+            ns_manager.bind(prefix, namespace)
+        self.assertEqual(
+            _get_variant_data(scr_var, graph, ns_manager=ns_manager, clause_str_gen=clause_str_gen),
+            graph_data,
+        )
+        self.assertIsNot(
+            clause_str_gen.get_bhv_template(when_bhv=scr_var.when_bhv_model, ns_manager=ns_manager),
+            tmpl,
+        )
+
+
+def _load_task_variations(graph: rdflib.Dataset) -> dict[rdflib.URIRef, TaskVariationModel]:
+    us_loader = UserStoryLoader(graph)
+    task_vars = {}
+    for scr_var_set in us_loader.get_us_scenario_variants().values():
+        for scr_var_id in scr_var_set:
+            scr_var = us_loader.load_scenario_variant(full_graph=graph, variant_id=scr_var_id)
+            task_vars[scr_var.task_variation.id] = scr_var.task_variation
+    return task_vars
+
+
+class SamplingTest(unittest.TestCase):
+    def setUp(self):
+        install_resolver()
+        self.graph = _load_models(PP_MODELS, SORT_MODELS)
+        self.task_vars = _load_task_variations(self.graph)
+        self.assertGreater(len(self.task_vars), 0)
+
+    def _get_strategies(self, task_var: TaskVariationModel) -> list[SamplingStrategy]:
+        if URI_BDD_TYPE_CART_PRODUCT in task_var.types:
+            return list(SamplingStrategy)
+        return [SamplingStrategy.UNIFORM]
+
+    def test_seed(self):
+        for task_var in self.task_vars.values():
+            for strategy in self._get_strategies(task_var):
+                sample = sample_task_variations(
+                    task_var=task_var, strategy=strategy, num_samples=3, seed=7
+                )
+                same_sample = sample_task_variations(
+                    task_var=task_var, strategy=strategy, num_samples=3, seed=7
+                )
+                self.assertEqual(sample.variables, same_sample.variables)
+                self.assertEqual(sample.values, same_sample.values, f"{strategy}: {task_var.id}")
+
+                sampler = VariationSampler(strategy=strategy, num_samples=3, seed=7)
+                self.assertEqual(sampler(task_var), (sample.variables, sample.values))
+                self.assertIs(sampler.samples[task_var.id].task_var_id, task_var.id)
+
+    def test_samples_in_variation(self):
+        for task_var in self.task_vars.values():
+            var_uris, all_values = get_task_variations(task_var=task_var)
+            all_values = [list(values) for values in all_values]
+            for strategy in self._get_strategies(task_var):
+                sample = sample_task_variations(task_var=task_var, strategy=strategy, seed=0)
+                self.assertEqual(sample.variables, var_uris)
+                self.assertEqual(sample.total_count, len(all_values))
+                sample_values = [list(values) for values in sample.values]
+                for values in sample_values:
+                    self.assertIn(values, all_values, f"{strategy}: {task_var.id}")
+                # distinct value sets in enumeration order
+                self.assertEqual(
+                    sample_values, sorted(sample_values, key=all_values.index), f"{strategy}"
+                )
+                self.assertEqual(len(set(map(all_values.index, sample_values))), len(sample_values))
+
+    def test_uniform_num_samples(self):
+        for task_var in self.task_vars.values():
+            total_count = len(get_task_variations(task_var=task_var)[1])
+            for num_samples in (1, 2, total_count, total_count + 5):
+                sample = sample_task_variations(
+                    task_var=task_var,
+                    strategy=SamplingStrategy.UNIFORM,
+                    num_samples=num_samples,
+                    seed=1,
+                )
+                self.assertEqual(len(sample.values), min(num_samples, total_count))
+
+    def test_coverage(self):
+        num_products = 0
+        for task_var in self.task_vars.values():
+            if URI_BDD_TYPE_CART_PRODUCT not in task_var.types:
+                with self.assertRaises(RuntimeError):
+                    sample_task_variations(task_var=task_var, strategy=SamplingStrategy.COVERING)
+                continue
+
+            num_products += 1
+            var_uris, all_values = get_task_variations(task_var=task_var)
+            covering = sample_task_variations(
+                task_var=task_var, strategy=SamplingStrategy.COVERING, strength=2, seed=2
+            )
+            self.assertEqual(covering.strength, min(2, len(var_uris)))
+            self.assertEqual(covering.coverage, 1.0, f"pairwise coverage: {covering}")
+            self.assertEqual(covering.value_coverage, 1.0)
+            self.assertLessEqual(len(covering.values), len(all_values))
+
+            stratified = sample_task_variations(
+                task_var=task_var, strategy=SamplingStrategy.STRATIFIED, seed=2
+            )
+            self.assertEqual(stratified.value_coverage, 1.0, f"value coverage: {stratified}")
+
+            # the full product covers all tuples
+            full = sample_task_variations(
+                task_var=task_var, num_samples=len(all_values), strength=len(var_uris), seed=2
+            )
+            self.assertEqual(full.coverage, 1.0)
+        self.assertGreater(num_products, 0)
+
+    def test_sampler_template_data(self):
+        sampler = VariationSampler(strategy=SamplingStrategy.UNIFORM, num_samples=2, seed=3)
+        us_loader = UserStoryLoader(self.graph)
+        processed_bdd_data = prepare_jinja2_template_data(
+            us_loader, self.graph, variations_getter=sampler
+        )
+        self.assertEqual(set(sampler.samples), set(self.task_vars))
+        for us_data in processed_bdd_data:
+            for scenario_data in us_data[FR_CRITERIA]:
+                self.assertGreater(len(scenario_data[FR_VARIATIONS]), 0)
+                self.assertLessEqual(len(scenario_data[FR_VARIATIONS]), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
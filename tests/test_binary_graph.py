@@ -0,0 +1,108 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import subprocess
+import sys
+import tempfile
+import unittest
+from rdflib import RDF, XSD, BNode, Graph, Literal, Namespace, URIRef
+from rdflib.collection import Collection
+from bdd_dsl.utils.binary_graph import (
+    SharedGraph,
+    attach_shared_graph,
+    load_graph_binary,
+    save_graph_binary,
+)
+
+
+NS_TEST = Namespace("https://example.org/bin-test/")
+# attach to a shared graph from a separate interpreter, with its own resource tracker
+ATTACH_SCRIPT = """import sys
+from bdd_dsl.utils.binary_graph import attach_shared_graph
+print(len(list(attach_shared_graph(name=sys.argv[1]))))
+"""
+
+
+class BinaryGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.bind("test", NS_TEST)
+        for i in range(5):
+            node = NS_TEST[f"node{i}"]
+            self.graph.add((node, RDF.type, NS_TEST["Node"]))
+            self.graph.add((node, NS_TEST["index"], Literal(i, datatype=XSD.integer)))
+            self.graph.add((node, NS_TEST["label"], Literal(f"node {i}", lang="en")))
+            if i > 0:
+                self.graph.add((node, NS_TEST["prev"], NS_TEST[f"node{i - 1}"]))
+        list_node = BNode()
+        Collection(self.graph, list_node, [NS_TEST["node0"], NS_TEST["node3"]])
+        self.graph.add((NS_TEST["node4"], NS_TEST["list"], list_node))
+        self.graph.add((NS_TEST["node0"], NS_TEST["label"], Literal("nœud 0", lang="fr")))
+        self.graph.add((NS_TEST["node0"], NS_TEST["label"], Literal("node 0")))
+        self.graph.add((NS_TEST["node0"], NS_TEST["note"], Literal("")))
+
+    def test_triple_patterns(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_graph_binary(graph=self.graph, dir_path=tmp_dir)
+            bin_graph = load_graph_binary(dir_path=tmp_dir)
+
+            self.assertEqual(len(bin_graph), len(self.graph))
+            self.assertEqual(set(bin_graph), set(self.graph))
+            self.assertEqual(bin_graph.namespace_manager.store.namespace("test"), URIRef(NS_TEST))
+
+            patterns = [
+                (NS_TEST["node2"], None, None),
+                (NS_TEST["node2"], NS_TEST["prev"], None),
+                (NS_TEST["node2"], None, NS_TEST["node1"]),
+                (None, RDF.type, None),
+                (None, RDF.type, NS_TEST["Node"]),
+                (None, None, NS_TEST["node3"]),
+                (NS_TEST["node2"], NS_TEST["prev"], NS_TEST["node1"]),
+                (NS_TEST["node2"], NS_TEST["prev"], NS_TEST["node3"]),
+                (NS_TEST["missing"], None, None),
+                (None, None, Literal("nœud 0", lang="fr")),
+                (None, None, Literal("node 0")),
+                (None, None, Literal("node 0", lang="de")),
+                (None, None, Literal(0, datatype=XSD.integer)),
+                (None, None, Literal("0")),
+                (None, None, Literal("")),
+            ]
+            for pattern in patterns:
+                self.assertEqual(set(bin_graph.triples(pattern)), set(self.graph.triples(pattern)))
+
+            list_node = bin_graph.value(NS_TEST["node4"], NS_TEST["list"])
+            self.assertEqual(
+                list(Collection(bin_graph, list_node)), [NS_TEST["node0"], NS_TEST["node3"]]
+            )
+
+            q_result = bin_graph.query(
+                "SELECT ?node WHERE { ?node test:prev/test:prev test:node0 }",
+                initNs={"test": NS_TEST},
+            )
+            self.assertEqual([row[0] for row in q_result], [NS_TEST["node2"]])
+
+            with self.assertRaises(TypeError):
+                bin_graph.add((NS_TEST["node0"], RDF.type, NS_TEST["Node"]))
+
+    def test_shared_memory(self):
+        with SharedGraph(graph=self.graph) as shared_graph:
+            bin_graph = attach_shared_graph(name=shared_graph.name)
+            self.assertEqual(set(bin_graph), set(self.graph))
+            pattern = (None, RDF.type, NS_TEST["Node"])
+            self.assertEqual(set(bin_graph.triples(pattern)), set(self.graph.triples(pattern)))
+            del bin_graph
+
+            # the block must not be unlinked when the other process exits
+            proc_result = subprocess.run(
+                [sys.executable, "-c", ATTACH_SCRIPT, shared_graph.name],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(int(proc_result.stdout), len(self.graph))
+            self.assertNotIn("leaked", proc_result.stderr)
+            bin_graph = attach_shared_graph(name=shared_graph.name)
+            self.assertEqual(len(bin_graph), len(self.graph))
+            del bin_graph
+
+
+if __name__ == "__main__":
+    unittest.main()
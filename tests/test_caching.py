@@ -0,0 +1,189 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import os
+import tempfile
+import unittest
+from unittest import mock
+from rdflib import RDFS, Dataset, Graph, Literal, URIRef
+from rdf_utils.caching import read_url_and_cache
+from rdf_utils.namespace import URL_SECORO_M
+from rdf_utils.resolver import install_resolver
+from bdd_dsl.models.user_story import UserStoryLoader
+from bdd_dsl.utils import caching
+from bdd_dsl.utils.caching import get_cache_key, get_graph_digest, get_sources_digest
+
+
+MODEL_URLS = [
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/environments/secorolab.env.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/agents/isaac-sim.agn.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/scenes/secorolab-env.scene.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/scenes/isaac-agents.scene.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/templates/pickplace.tmpl.json",
+    f"{URL_SECORO_M}/acceptance-criteria/bdd/variations/pickplace-secorolab-isaac.var.json",
+]
+
+
+BNODE_TTL = """
+@prefix ex: <http://example.org/test#> .
+ex:sc1 ex:clauses ( ex:c1 [ ex:name "anon" ] ) ; ex:scene [ ex:objects ex:o1 , ex:o2 ] .
+ex:sc2 ex:scene [ ex:objects ex:o1 ] , [ ex:objects ex:o2 ] .
+"""
+
+
+def _touch(file_path: str) -> None:
+    file_stat = os.stat(file_path)
+    mtime_ns = file_stat.st_mtime_ns + 10**9
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+class SourcesDigestTest(unittest.TestCase):
+    def test_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = [os.path.join(tmp_dir, f"model{idx}.json") for idx in range(2)]
+            for path in paths:
+                with open(path, mode="w", encoding="utf-8") as model_file:
+                    model_file.write("{}")
+
+            digest = get_sources_digest(sources=paths)
+            self.assertEqual(get_sources_digest(sources=reversed(paths)), digest)
+            self.assertNotEqual(get_sources_digest(sources=paths[:1]), digest)
+
+            with open(paths[0], mode="w", encoding="utf-8") as model_file:
+                model_file.write('{"@id": "changed"}')
+            size_digest = get_sources_digest(sources=paths)
+            self.assertNotEqual(size_digest, digest)
+
+            _touch(paths[0])
+            self.assertNotEqual(get_sources_digest(sources=paths), size_digest)
+
+    def test_graph_digest(self):
+        digest = get_graph_digest(graph=Graph().parse(data=BNODE_TTL, format="turtle"))
+        # blank node labels differ between parses
+        self.assertEqual(
+            get_graph_digest(graph=Graph().parse(data=BNODE_TTL, format="turtle")), digest
+        )
+        for old, new in (('"anon"', '"other"'), ("ex:o1 ] ,", "ex:o3 ] ,"), ("ex:c1", "ex:c2")):
+            changed_graph = Graph().parse(data=BNODE_TTL.replace(old, new), format="turtle")
+            self.assertNotEqual(get_graph_digest(graph=changed_graph), digest, f"{old} -> {new}")
+
+    def test_version(self):
+        cache_key = get_cache_key("graph", "shacl")
+        self.assertEqual(get_cache_key("graph", "shacl"), cache_key)
+        self.assertNotEqual(get_cache_key("other", "shacl"), cache_key)
+        with mock.patch.object(caching, "BDD_DSL_VERSION", "0.0.0-test"):
+            self.assertNotEqual(get_cache_key("graph", "shacl"), cache_key)
+
+
+class UserStoryLoaderCacheTest(unittest.TestCase):
+    def setUp(self):
+        install_resolver()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        cache_patch = mock.patch.object(
+            caching, "BDD_DSL_CACHE_DIR", os.path.join(self.tmp_dir.name, "cache")
+        )
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        # local copies of the models, which can be modified
+        self.model_paths = []
+        self.graph = Dataset()
+        for idx, url in enumerate(MODEL_URLS):
+            model_path = os.path.join(self.tmp_dir.name, f"model{idx}.json")
+            with open(model_path, mode="w", encoding="utf-8") as model_file:
+                model_file.write(read_url_and_cache(url))
+            self.graph.parse(model_path, format="json-ld")
+            self.model_paths.append(model_path)
+
+    def _create_loader(self, shacl_check: bool = False) -> tuple[UserStoryLoader, bool]:
+        """Loader with caching & whether it was loaded from the cache"""
+        with mock.patch.object(
+            UserStoryLoader,
+            "_query_us_graph",
+            autospec=True,
+            side_effect=UserStoryLoader._query_us_graph,
+        ) as query_mock:
+            us_loader = UserStoryLoader(
+                self.graph,
+                shacl_check=shacl_check,
+                use_cache=True,
+                model_sources=self.model_paths,
+            )
+        return us_loader, not query_mock.called
+
+    def test_hit_and_invalidation(self):
+        us_loader, cache_hit = self._create_loader()
+        self.assertFalse(cache_hit)
+        us_var_dict = us_loader.get_us_scenario_variants()
+        us_loader.load_all_scenario_variants(full_graph=self.graph, workers=1)
+        us_loader.save_cache()
+
+        cached_loader, cache_hit = self._create_loader()
+        self.assertTrue(cache_hit)
+        self.assertEqual(cached_loader.get_us_scenario_variants(), us_var_dict)
+        for var_ids in us_var_dict.values():
+            for var_id in var_ids:
+                self.assertEqual(
+                    cached_loader.load_scenario_variant(
+                        full_graph=self.graph, variant_id=var_id
+                    ).id,
+                    var_id,
+                )
+
+        # modified model
+        _touch(self.model_paths[-1])
+        _, cache_hit = self._create_loader()
+        self.assertFalse(cache_hit)
+        _, cache_hit = self._create_loader()
+        self.assertTrue(cache_hit)
+
+        # different package version
+        with mock.patch.object(caching, "BDD_DSL_VERSION", "0.0.0-test"):
+            _, cache_hit = self._create_loader()
+        self.assertFalse(cache_hit)
+
+    def _add_model(self, loader: UserStoryLoader, shacl_check: bool) -> list[str]:
+        model_path = os.path.join(self.tmp_dir.name, f"extra{len(self.model_paths)}.ttl")
+        delta_graph = Graph()
+        delta_graph.add(
+            (URIRef("https://example.org/extra"), RDFS.label, Literal(os.path.basename(model_path)))
+        )
+        delta_graph.serialize(destination=model_path, format="turtle")
+        for triple in delta_graph:
+            self.graph.add(triple)
+        loader.add_models(
+            full_graph=self.graph,
+            delta_graph=delta_graph,
+            shacl_check=shacl_check,
+            model_sources=[model_path],
+        )
+        return self.model_paths + [model_path]
+
+    def test_add_models(self):
+        us_loader, _ = self._create_loader(shacl_check=True)
+        var_id = next(iter(next(iter(us_loader.get_us_scenario_variants().values()))))
+        scr_var = us_loader.load_scenario_variant(full_graph=self.graph, variant_id=var_id)
+
+        # loaded variants are discarded, even if the user stories are not re-queried
+        self.model_paths = self._add_model(us_loader, shacl_check=True)
+        new_scr_var = us_loader.load_scenario_variant(full_graph=self.graph, variant_id=var_id)
+        self.assertIsNot(new_scr_var, scr_var)
+        self.assertEqual(new_scr_var.id, scr_var.id)
+
+        # a checked delta keeps the cache, keyed on all sources
+        us_loader.save_cache()
+        _, cache_hit = self._create_loader(shacl_check=True)
+        self.assertTrue(cache_hit)
+
+        # an unchecked delta disables the cache of a validated loader
+        self.model_paths = self._add_model(us_loader, shacl_check=False)
+        us_loader.save_cache()
+        _, cache_hit = self._create_loader(shacl_check=True)
+        self.assertFalse(cache_hit)
+
+    def test_requires_sources(self):
+        with self.assertRaises(AssertionError):
+            UserStoryLoader(self.graph, shacl_check=False, use_cache=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
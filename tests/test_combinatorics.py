@@ -0,0 +1,101 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import itertools
+import unittest
+from bdd_dsl.utils.combinatorics import (
+    count_covered_t_tuples,
+    count_t_tuples,
+    greedy_covering_array,
+    rank_combination,
+    rank_combination_with_replacement,
+    rank_permutation,
+    rank_product,
+    sample_ranks,
+    stratified_rows,
+    unrank_combination,
+    unrank_combination_with_replacement,
+    unrank_permutation,
+    unrank_product,
+)
+
+
+class CombinatoricsTest(unittest.TestCase):
+    def test_product(self):
+        for sizes in [(3,), (2, 3, 4), (1, 5, 1), (4, 4)]:
+            pools = [range(size) for size in sizes]
+            for k, expected in enumerate(itertools.product(*pools)):
+                self.assertEqual(unrank_product(sizes=sizes, k=k), expected)
+                self.assertEqual(rank_product(sizes=sizes, indices=expected), k)
+
+    def test_permutation_with_repetition(self):
+        # enumerated as a product of the same pool
+        for n, r in [(2, 4), (3, 2), (4, 3)]:
+            for k, expected in enumerate(itertools.product(range(n), repeat=r)):
+                self.assertEqual(unrank_product(sizes=[n] * r, k=k), expected)
+                self.assertEqual(rank_product(sizes=[n] * r, indices=expected), k)
+
+    def test_combination(self):
+        for n, r in [(5, 0), (5, 1), (5, 3), (6, 6), (7, 4)]:
+            for k, expected in enumerate(itertools.combinations(range(n), r)):
+                self.assertEqual(unrank_combination(n=n, r=r, k=k), expected)
+                self.assertEqual(rank_combination(n=n, indices=expected), k)
+
+    def test_combination_with_replacement(self):
+        for n, r in [(1, 3), (3, 2), (4, 4), (5, 3)]:
+            combs = itertools.combinations_with_replacement(range(n), r)
+            for k, expected in enumerate(combs):
+                self.assertEqual(unrank_combination_with_replacement(n=n, r=r, k=k), expected)
+                self.assertEqual(rank_combination_with_replacement(n=n, indices=expected), k)
+
+    def test_permutation(self):
+        for n, r in [(3, 3), (4, 2), (5, 3), (5, 5)]:
+            for k, expected in enumerate(itertools.permutations(range(n), r)):
+                self.assertEqual(unrank_permutation(n=n, r=r, k=k), expected)
+                self.assertEqual(rank_permutation(n=n, indices=expected), k)
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            unrank_product(sizes=[2, 3], k=6)
+        with self.assertRaises(IndexError):
+            unrank_combination(n=4, r=2, k=-1)
+        with self.assertRaises(IndexError):
+            unrank_permutation(n=3, r=2, k=6)
+        with self.assertRaises(ValueError):
+            rank_combination(n=4, indices=[2, 1])
+        with self.assertRaises(ValueError):
+            rank_permutation(n=3, indices=[0, 0])
+
+    def test_large_space(self):
+        # jump into a space far too large to enumerate
+        n, r = 60, 30
+        k = 10**16
+        self.assertEqual(rank_combination(n=n, indices=unrank_combination(n=n, r=r, k=k)), k)
+        self.assertEqual(rank_permutation(n=n, indices=unrank_permutation(n=n, r=r, k=k)), k)
+
+    def test_sample_ranks(self):
+        ranks = sample_ranks(count=10**20, num_samples=50, seed=0)
+        self.assertEqual(len(set(ranks)), 50)
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(ranks, sample_ranks(count=10**20, num_samples=50, seed=0))
+        self.assertEqual(sample_ranks(count=5, num_samples=10), list(range(5)))
+
+    def test_covering_array(self):
+        for sizes, strength in [((3, 3, 3, 3), 2), ((2, 4, 3, 2, 5), 2), ((2, 2, 3, 2), 3)]:
+            rows = greedy_covering_array(sizes=sizes, strength=strength, seed=1)
+            self.assertEqual(
+                count_covered_t_tuples(rows=rows, strength=strength),
+                count_t_tuples(sizes=sizes, strength=strength),
+            )
+            self.assertLess(len(rows), len(list(itertools.product(*map(range, sizes)))))
+            for row in rows:
+                self.assertTrue(all(0 <= val < size for val, size in zip(row, sizes)))
+
+    def test_stratified_rows(self):
+        sizes = (4, 2, 7)
+        rows = stratified_rows(sizes=sizes, samples_per_value=2, seed=3)
+        self.assertLessEqual(len(rows), 14)
+        for col, size in enumerate(sizes):
+            self.assertEqual({row[col] for row in rows}, set(range(size)))
+
+
+if __name__ == "__main__":
+    unittest.main()
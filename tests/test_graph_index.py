@@ -0,0 +1,137 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import unittest
+from itertools import product
+from rdflib import RDF, Dataset, Graph, Literal, Namespace, URIRef
+from rdflib.paths import Path
+from bdd_dsl.utils.graph_index import GraphIndex, get_reachable_subgraph
+
+
+NS_TEST = Namespace("http://example.org/test#")
+MODEL_TTL = """
+@prefix ex: <http://example.org/test#> .
+ex:us1 a ex:UserStory ; ex:has-criteria ex:sc1, ex:sc2 ; ex:name "story"@en, "story" .
+ex:sc1 a ex:Scenario ; ex:of-template ex:tmpl1 ; ex:clauses ( ex:c1 ex:c2 [ ex:name "anon" ] ) .
+ex:sc2 a ex:Scenario ; ex:of-template ex:tmpl1 ; ex:count 3 .
+ex:tmpl1 a ex:Template ; ex:parent ex:tmpl0 .
+ex:tmpl0 a ex:Template ; ex:parent ex:root .
+"""
+EXTRA_TTL = """
+@prefix ex: <http://example.org/test#> .
+ex:sc2 ex:count 3 .
+ex:sc3 a ex:Scenario ; ex:of-template ex:tmpl0 ; ex:count 3.0 .
+"""
+PATHS = [
+    NS_TEST["parent"] * "*",
+    NS_TEST["parent"] * "+",
+    NS_TEST["has-criteria"] / NS_TEST["of-template"],
+    ~NS_TEST["of-template"],
+    NS_TEST["count"] | NS_TEST["of-template"],
+    NS_TEST["clauses"] / (RDF.rest * "*") / RDF.first,
+]
+
+
+def _get_pattern_nodes(graph: Graph) -> tuple[set, set, set]:
+    subjects, predicates, objects = set(), set(), set()
+    for s, p, o in graph.triples((None, None, None)):
+        subjects.add(s)
+        predicates.add(p)
+        objects.add(o)
+    # nodes which are not in the graph
+    subjects.add(NS_TEST["missing"])
+    predicates.add(NS_TEST["missing"])
+    objects.add(Literal("missing"))
+    return subjects, predicates, objects
+
+
+class GraphIndexTest(unittest.TestCase):
+    def assert_same_lookups(self, index: GraphIndex, graph: Graph) -> None:
+        subjects, predicates, objects = _get_pattern_nodes(graph)
+        self.assertEqual(len(index), len(set(graph.triples((None, None, None)))))
+        for s, p, o in product(
+            subjects | {None}, predicates | {None} | set(PATHS), objects | {None}
+        ):
+            self.assertEqual(
+                set(index.triples((s, p, o))),
+                set(graph.triples((s, p, o))),
+                f"triples: {(s, p, o)}",
+            )
+
+        for s, p in product(subjects | {None}, predicates | {None} | set(PATHS)):
+            idx_objs = list(index.objects(subject=s, predicate=p))
+            self.assertEqual(set(idx_objs), set(graph.objects(subject=s, predicate=p)))
+            if s is not None and not isinstance(p, Path) and p is not None:
+                # no duplicates for point lookups
+                self.assertEqual(len(idx_objs), len(set(idx_objs)), f"objects: {(s, p)}")
+            unique_objs = list(index.objects(subject=s, predicate=p, unique=True))
+            self.assertEqual(len(unique_objs), len(set(unique_objs)), f"unique objects: {(s, p)}")
+            self.assertEqual(set(unique_objs), set(idx_objs))
+
+        for p, o in product(predicates | {None} | set(PATHS), objects | {None}):
+            self.assertEqual(
+                set(index.subjects(predicate=p, object=o)),
+                set(graph.subjects(predicate=p, object=o)),
+                f"subjects: {(p, o)}",
+            )
+            unique_subjs = list(index.subjects(predicate=p, object=o, unique=True))
+            self.assertEqual(
+                len(unique_subjs), len(set(unique_subjs)), f"unique subjects: {(p, o)}"
+            )
+
+    def test_graph(self):
+        graph = Graph()
+        graph.parse(data=MODEL_TTL, format="turtle")
+        index = GraphIndex(graph)
+        self.assert_same_lookups(index=index, graph=graph)
+
+        scr_id = NS_TEST["sc1"]
+        clauses = graph.value(subject=scr_id, predicate=NS_TEST["clauses"])
+        self.assertEqual(list(index.items(clauses)), list(graph.items(clauses)))
+        self.assertEqual(
+            index.value(subject=scr_id, predicate=NS_TEST["of-template"]), NS_TEST["tmpl1"]
+        )
+        self.assertIsNone(index.value(subject=scr_id, predicate=NS_TEST["missing"]))
+        self.assertEqual(index.namespace_manager, graph.namespace_manager)
+        self.assertEqual(
+            set(index.query("SELECT ?s WHERE { ?s a <http://example.org/test#Scenario> }")),
+            set(graph.query("SELECT ?s WHERE { ?s a <http://example.org/test#Scenario> }")),
+        )
+
+        with self.assertRaises(TypeError):
+            index.add((scr_id, NS_TEST["count"], Literal(1)))
+        with self.assertRaises(TypeError):
+            index.remove((scr_id, None, None))
+
+    def test_multiple_graphs(self):
+        graph = Graph()
+        graph.parse(data=MODEL_TTL, format="turtle")
+        extra_graph = Graph()
+        extra_graph.parse(data=EXTRA_TTL, format="turtle")
+        union_graph = graph + extra_graph
+
+        # triples in both graphs are indexed once
+        self.assert_same_lookups(index=GraphIndex(graph, extra_graph), graph=union_graph)
+
+        dataset = Dataset(default_union=True)
+        dataset.graph(URIRef("http://example.org/graph/model")).parse(
+            data=MODEL_TTL, format="turtle"
+        )
+        dataset.graph(URIRef("http://example.org/graph/extra")).parse(
+            data=EXTRA_TTL, format="turtle"
+        )
+        self.assert_same_lookups(index=GraphIndex(dataset), graph=dataset)
+
+    def test_reachable_subgraph(self):
+        graph = Graph()
+        graph.parse(data=MODEL_TTL + EXTRA_TTL, format="turtle")
+        index = GraphIndex(graph)
+        for root_ids in ([NS_TEST["sc1"]], [NS_TEST["us1"]], [NS_TEST["sc3"], NS_TEST["tmpl1"]]):
+            subgraph = get_reachable_subgraph(graph=index, root_ids=root_ids)
+            self.assertEqual(set(subgraph), set(get_reachable_subgraph(graph, root_ids)))
+
+        subgraph = get_reachable_subgraph(graph=index, root_ids=[NS_TEST["sc1"]])
+        self.assertIn((NS_TEST["tmpl0"], NS_TEST["parent"], NS_TEST["root"]), subgraph)
+        self.assertNotIn((NS_TEST["sc2"], RDF.type, NS_TEST["Scenario"]), subgraph)
+
+
+if __name__ == "__main__":
+    unittest.main()
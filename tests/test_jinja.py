@@ -0,0 +1,185 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from bdd_dsl.models.frames import FR_CRITERIA, FR_NAME, FR_VARIATIONS
+from bdd_dsl.utils import jinja
+from bdd_dsl.utils.jinja import (
+    get_variation_cost,
+    load_template_from_file,
+    load_template_from_url,
+    shard_us_data,
+)
+
+TEMPLATE_URL = "https://example.org/templates/feature.jinja"
+
+
+def _create_us_data(rng: random.Random, num_criteria: int, max_variations: int) -> dict:
+    criteria = []
+    for crit_idx in range(num_criteria):
+        variations = []
+        for var_idx in range(rng.randint(0, max_variations)):
+            num_clauses = rng.randint(0, 20)
+            variations.append(
+                {
+                    FR_NAME: f"crit{crit_idx}-var{var_idx}",
+                    "clauses": [f"clause{i}" for i in range(num_clauses)],
+                }
+            )
+        criteria.append({FR_NAME: f"crit{crit_idx}", FR_VARIATIONS: variations})
+    return {FR_NAME: "us", FR_CRITERIA: criteria}
+
+
+def _get_var_names(us_data: dict) -> list[str]:
+    return [
+        var_data[FR_NAME]
+        for crit_data in us_data[FR_CRITERIA]
+        for var_data in crit_data[FR_VARIATIONS]
+    ]
+
+
+def _get_shard_cost(shard: dict) -> int:
+    return sum(
+        get_variation_cost(var_data)
+        for crit_data in shard[FR_CRITERIA]
+        for var_data in crit_data[FR_VARIATIONS]
+    )
+
+
+class ShardTest(unittest.TestCase):
+    def test_variation_cost(self):
+        self.assertEqual(get_variation_cost({"clauses": ["a", "b", "c"]}), 3)
+        # at least 1 for variations without steps
+        self.assertEqual(get_variation_cost({"clauses": []}), 1)
+        self.assertEqual(get_variation_cost({}), 1)
+
+    def test_partition(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            us_data = _create_us_data(rng, num_criteria=rng.randint(1, 5), max_variations=10)
+            var_names = _get_var_names(us_data)
+            for num_shards in (1, 2, 3, 7, 100):
+                for by_cost in (False, True):
+                    shards = shard_us_data(us_data, num_shards=num_shards, by_cost=by_cost)
+                    self.assertLessEqual(len(shards), num_shards)
+
+                    # each variation in exactly one shard, in the original order within a shard
+                    shard_var_names = []
+                    for shard in shards:
+                        self.assertEqual(shard[FR_NAME], us_data[FR_NAME])
+                        self.assertGreater(len(shard[FR_CRITERIA]), 0)
+                        names = _get_var_names(shard)
+                        self.assertGreater(len(names), 0)
+                        self.assertEqual(
+                            names, sorted(names, key=var_names.index), f"shard order: {names}"
+                        )
+                        shard_var_names.extend(names)
+                    self.assertEqual(sorted(shard_var_names), sorted(var_names))
+
+    def test_contiguous(self):
+        rng = random.Random(1)
+        us_data = _create_us_data(rng, num_criteria=4, max_variations=10)
+        var_names = _get_var_names(us_data)
+        for num_shards in (1, 3, 5):
+            shards = shard_us_data(us_data, num_shards=num_shards)
+            self.assertEqual(shards, shard_us_data(us_data, num_shards=num_shards))
+
+            # contiguous runs of variations, with counts differing by at most one
+            shard_var_names = [_get_var_names(shard) for shard in shards]
+            self.assertEqual([name for names in shard_var_names for name in names], var_names)
+            shard_sizes = [len(names) for names in shard_var_names]
+            self.assertLessEqual(max(shard_sizes) - min(shard_sizes), 1)
+
+    def test_by_cost(self):
+        rng = random.Random(2)
+        for _ in range(50):
+            us_data = _create_us_data(rng, num_criteria=rng.randint(1, 5), max_variations=15)
+            var_costs = [
+                get_variation_cost(var_data)
+                for crit_data in us_data[FR_CRITERIA]
+                for var_data in crit_data[FR_VARIATIONS]
+            ]
+            if len(var_costs) == 0:
+                continue
+
+            for num_shards in (2, 3, 4):
+                shards = shard_us_data(us_data, num_shards=num_shards, by_cost=True)
+                self.assertEqual(shards, shard_us_data(us_data, num_shards, by_cost=True))
+                loads = [_get_shard_cost(shard) for shard in shards]
+                self.assertEqual(sum(loads), sum(var_costs))
+
+                # greedy bound: no shard exceeds the average load by more than the largest cost
+                self.assertLessEqual(
+                    max(loads),
+                    sum(var_costs) / num_shards + max(var_costs),
+                    f"unbalanced loads {loads} for costs {var_costs}",
+                )
+
+    def test_invalid_shards(self):
+        with self.assertRaises(AssertionError):
+            shard_us_data({FR_NAME: "us", FR_CRITERIA: []}, num_shards=0)
+
+
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.bc_dir = os.path.join(self.tmp_dir, "bytecode")
+        os.makedirs(self.bc_dir)
+        for attr, value in (
+            ("_JINJA_BC_CACHE", jinja._SourceBytecodeCache(directory=self.bc_dir)),
+            ("_JINJA_ENV", None),
+            ("_JINJA_DIR_ENVS", {}),
+        ):
+            patcher = mock.patch.object(jinja, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _reset_env(self) -> None:
+        # new environment without compiled templates in memory, as in a new process
+        jinja._JINJA_ENV = None
+
+    def test_file_template(self):
+        tmpl_path = os.path.join(self.tmp_dir, "feature.jinja")
+        with open(tmpl_path, mode="w", encoding="utf-8") as tmpl_file:
+            tmpl_file.write("Feature: {{ name }}")
+        self.assertEqual(load_template_from_file(tmpl_path).render(name="us"), "Feature: us")
+        self.assertEqual(len(os.listdir(self.bc_dir)), 1)
+
+        with open(tmpl_path, mode="w", encoding="utf-8") as tmpl_file:
+            tmpl_file.write("Story: {{ name }}")
+        mtime_ns = os.stat(tmpl_path).st_mtime_ns + 10**9
+        os.utime(tmpl_path, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(load_template_from_file(tmpl_path).render(name="us"), "Story: us")
+
+        self._reset_env()
+        self.assertEqual(load_template_from_file(tmpl_path).render(name="us"), "Story: us")
+        # same cache entry for file templates
+        self.assertEqual(len(os.listdir(self.bc_dir)), 1)
+
+    def test_url_template(self):
+        sources = {TEMPLATE_URL: "Feature: {{ name }}"}
+        with mock.patch.object(jinja, "read_url_and_cache", side_effect=sources.__getitem__):
+            self.assertEqual(load_template_from_url(TEMPLATE_URL).render(name="us"), "Feature: us")
+            self.assertIs(
+                load_template_from_url(TEMPLATE_URL), load_template_from_url(TEMPLATE_URL)
+            )
+
+            # refreshed download
+            sources[TEMPLATE_URL] = "Story: {{ name }}"
+            self.assertEqual(load_template_from_url(TEMPLATE_URL).render(name="us"), "Story: us")
+            self.assertEqual(len(os.listdir(self.bc_dir)), 2)
+
+            self._reset_env()
+            self.assertEqual(load_template_from_url(TEMPLATE_URL).render(name="us"), "Story: us")
+            sources[TEMPLATE_URL] = "Feature: {{ name }}"
+            self._reset_env()
+            self.assertEqual(load_template_from_url(TEMPLATE_URL).render(name="us"), "Feature: us")
+            self.assertEqual(len(os.listdir(self.bc_dir)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
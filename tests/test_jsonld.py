@@ -0,0 +1,58 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import json
+import os
+import tempfile
+import unittest
+from rdflib import Dataset
+from rdflib.compare import isomorphic
+from bdd_dsl.utils.jsonld import get_jsonld_context, load_jsonld_models
+
+
+CONTEXT = [
+    {
+        "ex": "http://example.org/",
+        "name": "ex:name",
+        "knows": {"@id": "ex:knows", "@type": "@id"},
+    }
+]
+
+
+def _create_model(node_id: str, known_id: str) -> dict:
+    return {
+        "@context": CONTEXT,
+        "@graph": [
+            {"@id": f"ex:{node_id}", "name": node_id, "knows": known_id},
+            {"@id": f"rel-{node_id}", "ex:value": {"@context": {"q": "http://q.org/"}, "q:x": 1}},
+        ],
+    }
+
+
+class JsonLdLoaderTest(unittest.TestCase):
+    def test_load_models(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_paths = []
+            for idx in range(3):
+                model_path = os.path.join(tmp_dir, f"model{idx}.json")
+                with open(model_path, mode="w", encoding="utf-8") as model_file:
+                    json.dump(_create_model(node_id=f"n{idx}", known_id=f"other{idx}"), model_file)
+                model_paths.append(model_path)
+
+            expected = Dataset()
+            for model_path in model_paths:
+                expected.parse(model_path, format="json-ld")
+
+            for workers in (1, 2):
+                graph = load_jsonld_models(Dataset(), model_paths, workers=workers)
+                self.assertEqual(len(graph), len(expected))
+                self.assertTrue(isomorphic(graph.default_graph, expected.default_graph))
+
+        # inline definitions are kept as is, and resolved only once
+        self.assertEqual(get_jsonld_context(CONTEXT), CONTEXT)
+        self.assertIs(
+            get_jsonld_context(CONTEXT), get_jsonld_context(json.loads(json.dumps(CONTEXT)))
+        )
+        self.assertIsNone(get_jsonld_context(["relative.json"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import os
+import tempfile
+import unittest
+
+from bdd_dsl.utils.manifest import MANIFEST_FILENAME, FeatureManifest
+
+
+class FeatureManifestTest(unittest.TestCase):
+    def test_up_to_date(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest_path = os.path.join(tmp_dir, MANIFEST_FILENAME)
+            feature_path = os.path.join(tmp_dir, "us1.feature")
+            with open(feature_path, mode="w", encoding="utf-8") as feature_file:
+                feature_file.write("Feature: us1\n")
+
+            manifest = FeatureManifest(file_path=manifest_path, context="tmpl")
+            self.assertFalse(manifest.is_up_to_date(us_name="us1", digest="abc"))
+            manifest.update(us_name="us1", digest="abc", feature_paths=[feature_path])
+            manifest.save()
+
+            manifest = FeatureManifest(file_path=manifest_path, context="tmpl")
+            self.assertTrue(manifest.is_up_to_date(us_name="us1", digest="abc"))
+            self.assertFalse(manifest.is_up_to_date(us_name="us1", digest="def"))
+            self.assertFalse(manifest.is_up_to_date(us_name="us2", digest="abc"))
+
+            # different generation settings
+            manifest = FeatureManifest(file_path=manifest_path, context="other-tmpl")
+            self.assertFalse(manifest.is_up_to_date(us_name="us1", digest="abc"))
+
+            # deleted feature
+            os.remove(feature_path)
+            manifest = FeatureManifest(file_path=manifest_path, context="tmpl")
+            self.assertFalse(manifest.is_up_to_date(us_name="us1", digest="abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import random
+import unittest
+
+import numpy as np
+from trinary import Unknown
+
+from bdd_dsl.models.timeline import (
+    Timeline,
+    TrinaryStamped,
+    TrinaryTimeline,
+    get_float_stamp,
+    get_trinary_codes,
+    get_trinary_stamp,
+    get_trinary_value,
+)
+
+
+class TimelineTest(unittest.TestCase):
+    def test_insert_order(self):
+        rng = random.Random(0)
+        stamps = [rng.uniform(0.0, 10.0) for _ in range(500)]
+        timeline = Timeline(get_stamp=get_float_stamp)
+        for stamp in stamps:
+            timeline.insert(stamp)
+        self.assertEqual(list(timeline), sorted(stamps))
+        self.assertEqual(timeline.stamps, sorted(stamps))
+        self.assertEqual(len(timeline), len(stamps))
+
+    def test_equal_stamps(self):
+        # same as the previous linear scan: new items go before those with equal stamps
+        timeline = Timeline(get_stamp=get_trinary_stamp)
+        first = TrinaryStamped(stamp=1.0, trinary=True)
+        second = TrinaryStamped(stamp=1.0, trinary=False)
+        timeline.insert(TrinaryStamped(stamp=2.0, trinary=True))
+        self.assertEqual(timeline.insert(first), 0)
+        self.assertEqual(timeline.insert(second), 0)
+        self.assertEqual([trin_st.stamp for trin_st in timeline], [1.0, 1.0, 2.0])
+        self.assertIs(timeline[0], second)
+        self.assertIs(timeline[1], first)
+
+    def test_index_after(self):
+        timeline = Timeline(get_stamp=get_float_stamp)
+        for stamp in (3.0, 1.0, 2.0, 2.0):
+            timeline.insert(stamp)
+        self.assertEqual(timeline.index_after(0.5), 0)
+        self.assertEqual(timeline.index_after(2.0), 3)
+        self.assertEqual(timeline.index_after(5.0), 4)
+        self.assertEqual(timeline.pop_first(), 1.0)
+        self.assertEqual(timeline.stamps, [2.0, 2.0, 3.0])
+
+    def test_discard(self):
+        timeline = Timeline(get_stamp=get_float_stamp)
+        stamps = [float(i) for i in range(5000)]
+        for stamp in stamps:
+            timeline.insert(stamp)
+            # keep a horizon of 10 like a BeforeEvent policy
+            timeline.discard_until(stamp - 10.0)
+            self.assertEqual(timeline[0], max(0.0, stamp - 9.0))
+            self.assertEqual(timeline[-1], stamp)
+        self.assertEqual(list(timeline), stamps[-10:])
+        self.assertEqual(timeline[2:4], stamps[-8:-6])
+        self.assertEqual(timeline.discard_until(4994.5), 5)
+        self.assertEqual(timeline.stamps, stamps[-5:])
+        self.assertEqual(timeline.insert(4990.0), 0)
+        with self.assertRaises(IndexError):
+            timeline[6]
+
+    def test_max_samples(self):
+        timeline = Timeline(get_stamp=get_float_stamp, max_samples=3)
+        for stamp in (5.0, 1.0, 4.0, 2.0, 3.0):
+            timeline.insert(stamp)
+        self.assertEqual(list(timeline), [3.0, 4.0, 5.0])
+        self.assertEqual(timeline.insert(0.0), -1)
+        self.assertEqual(timeline.insert(6.0), 2)
+        self.assertEqual(timeline.stamps, [4.0, 5.0, 6.0])
+
+
+class TrinaryTimelineTest(unittest.TestCase):
+    def test_same_as_timeline(self):
+        rng = random.Random(1)
+        timeline = Timeline(get_stamp=get_trinary_stamp)
+        trin_timeline = TrinaryTimeline()
+        for i in range(5000):
+            trin_st = TrinaryStamped(
+                stamp=float(rng.randrange(2000)), trinary=rng.choice([True, False, Unknown])
+            )
+            timeline.insert(trin_st)
+            trin_timeline.insert(trin_st)
+            if i % 100 == 99:
+                discard_t = timeline.stamps[len(timeline) // 3]
+                timeline.discard_until(discard_t)
+                trin_timeline.discard_until(discard_t)
+            self.assertEqual(len(timeline), len(trin_timeline))
+            self.assertEqual(timeline.stamps[-1], trin_timeline.last_stamp)
+            if i % 700 == 0:
+                self.assertEqual(list(timeline), list(trin_timeline))
+
+        self.assertEqual(list(timeline), list(trin_timeline))
+        self.assertEqual(timeline[5:9], trin_timeline[5:9])
+        self.assertEqual(timeline[-1], trin_timeline[-1])
+        self.assertEqual(trin_timeline.stamps.tolist(), timeline.stamps)
+        self.assertEqual(trin_timeline.pop_first(), timeline.pop_first())
+
+    def test_max_samples(self):
+        rng = random.Random(2)
+        timeline = Timeline(get_stamp=get_trinary_stamp, max_samples=50)
+        trin_timeline = TrinaryTimeline(max_samples=50)
+        for _ in range(3000):
+            trin_st = TrinaryStamped(stamp=rng.uniform(0.0, 100.0), trinary=rng.random() < 0.5)
+            timeline.insert(trin_st)
+            trin_timeline.insert(trin_st)
+            self.assertEqual(len(timeline), len(trin_timeline))
+        self.assertEqual(list(timeline), list(trin_timeline))
+
+    def test_reductions(self):
+        trin_timeline = TrinaryTimeline(max_samples=3)
+        self.assertIs(trin_timeline.reduce_and(), Unknown)
+        for stamp, trinary in enumerate([False, True, True, Unknown]):
+            trin_timeline.insert_value(stamp=float(stamp), trinary=trinary)
+        self.assertIs(trin_timeline.reduce_and(), Unknown)
+        self.assertIs(trin_timeline.reduce_or(), True)
+        trin_timeline.insert_value(stamp=4.0, trinary=False)
+        self.assertIs(trin_timeline.reduce_and(), False)
+        self.assertEqual(len(trin_timeline), 3)
+        with self.assertRaises(ValueError):
+            trin_timeline.insert_value(stamp=5.0, trinary=None)  # type: ignore[arg-type]
+
+    def test_aggregates(self):
+        rng = random.Random(3)
+        trin_timeline = TrinaryTimeline(max_samples=200)
+        ever_true = False
+        for i in range(4000):
+            trinary = rng.choice([True, True, True, False, Unknown])
+            trin_timeline.insert_value(stamp=rng.uniform(0.0, i / 10.0), trinary=trinary)
+            ever_true |= trinary is True
+            if i % 50 == 0:
+                trin_timeline.discard_until(i / 10.0 - 20.0)
+
+            if i % 97 == 0:
+                trinaries = [trin_st.trinary for trin_st in trin_timeline]
+                for code, value in enumerate((False, Unknown, True)):
+                    self.assertEqual(
+                        trin_timeline.counts[code], sum(trin is value for trin in trinaries)
+                    )
+                num_true = trin_timeline.counts[2]
+                at_least = trin_timeline.reduce_at_least(ratio=0.6)
+                if at_least is True:
+                    self.assertGreaterEqual(num_true, 0.6 * len(trinaries))
+                elif at_least is False:
+                    self.assertLess(num_true + trin_timeline.counts[1], 0.6 * len(trinaries))
+
+                window_start = trin_timeline.last_stamp - 5.0
+                in_window = {
+                    trin_st.trinary for trin_st in trin_timeline if trin_st.stamp > window_start
+                }
+                expected = True
+                if False in in_window:
+                    expected = False
+                elif Unknown in in_window:
+                    expected = Unknown
+                self.assertIs(trin_timeline.reduce_always_within(window=5.0), expected)
+        self.assertIs(trin_timeline.reduce_eventually(), ever_true or Unknown)
+
+    def test_insert_codes(self):
+        rng = np.random.default_rng(4)
+        for max_samples in (None, 300):
+            batch_timeline = TrinaryTimeline(max_samples=max_samples)
+            trin_timeline = TrinaryTimeline(max_samples=max_samples)
+            for batch_idx in range(20):
+                # integer stamps to get duplicates, also with existing samples
+                stamps = rng.integers(batch_idx * 10, batch_idx * 10 + 50, size=100)
+                stamps = stamps.astype(np.float64)
+                codes = get_trinary_codes(rng.integers(0, 3, size=100))
+                batch_timeline.insert_codes(stamps=stamps, codes=codes)
+                for stamp, code in zip(stamps.tolist(), codes.tolist()):
+                    trin_timeline.insert_value(stamp=stamp, trinary=get_trinary_value(code))
+                if batch_idx % 5 == 4:
+                    batch_timeline.discard_until(batch_idx * 10.0)
+                    trin_timeline.discard_until(batch_idx * 10.0)
+
+                self.assertEqual(batch_timeline.stamps.tolist(), trin_timeline.stamps.tolist())
+                self.assertEqual(batch_timeline.codes.tolist(), trin_timeline.codes.tolist())
+                self.assertEqual(batch_timeline.counts, trin_timeline.counts)
+                self.assertEqual(batch_timeline.added_counts, trin_timeline.added_counts)
+                self.assertEqual(batch_timeline.latest_stamps, trin_timeline.latest_stamps)
+                self.assertEqual(batch_timeline.evicted_until, trin_timeline.evicted_until)
+
+    def test_trinary_codes(self):
+        self.assertEqual(get_trinary_codes(np.array([True, False])).tolist(), [2, 0])
+        self.assertEqual(get_trinary_codes([False, Unknown, True]).tolist(), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            get_trinary_codes(np.array([0, 3]))
+
+
+if __name__ == "__main__":
+    unittest.main()
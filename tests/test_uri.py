@@ -0,0 +1,77 @@
+# SPDX-License-Identifier:  GPL-3.0-or-later
+import pickle
+import unittest
+
+from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import NamespaceManager
+
+from bdd_dsl.utils.uri import check_uri_str_cache, clear_uri_str_cache, get_uri_str
+
+NS_TEST = Namespace("https://example.org/uri-test/")
+
+
+class UriStrTest(unittest.TestCase):
+    def test_same_as_n3(self):
+        graph = Graph()
+        graph.bind("test", NS_TEST)
+        ns_manager = graph.namespace_manager
+        for uri in [NS_TEST["a"], NS_TEST["b"], URIRef("https://example.org/other/c")]:
+            self.assertEqual(
+                get_uri_str(uri=uri, ns_manager=ns_manager), uri.n3(namespace_manager=ns_manager)
+            )
+            # cached result
+            self.assertEqual(
+                get_uri_str(uri=uri, ns_manager=ns_manager), uri.n3(namespace_manager=ns_manager)
+            )
+        self.assertEqual(get_uri_str(uri=NS_TEST["a"]), NS_TEST["a"].n3())
+
+    def test_bind_invalidates(self):
+        graph = Graph()
+        uri = NS_TEST["a"]
+        self.assertEqual(get_uri_str(uri=uri, ns_manager=graph.namespace_manager), uri.n3())
+
+        # binding through the manager drops its cached strings
+        graph.bind("test", NS_TEST)
+        self.assertEqual(get_uri_str(uri=uri, ns_manager=graph.namespace_manager), "test:a")
+        other_uri = URIRef("https://example.org/other/b")
+        self.assertEqual(
+            get_uri_str(uri=other_uri, ns_manager=graph.namespace_manager), other_uri.n3()
+        )
+        graph.namespace_manager.bind("other", "https://example.org/other/")
+        self.assertEqual(get_uri_str(uri=other_uri, ns_manager=graph.namespace_manager), "other:b")
+
+        # the class is unchanged & the manager can still be pickled
+        self.assertNotIn("bind", vars(NamespaceManager(Graph())))
+        unpickled = pickle.loads(pickle.dumps(graph.namespace_manager))
+        self.assertEqual(
+            get_uri_str(uri=uri, ns_manager=unpickled), uri.n3(namespace_manager=unpickled)
+        )
+
+    def test_store_bind(self):
+        graph = Graph()
+        uri = NS_TEST["a"]
+        self.assertEqual(get_uri_str(uri=uri, ns_manager=graph.namespace_manager), uri.n3())
+
+        # bindings made through another graph on the same store need a check
+        Graph(store=graph.store).bind("test", NS_TEST)
+        check_uri_str_cache(ns_manager=graph.namespace_manager)
+        self.assertEqual(get_uri_str(uri=uri, ns_manager=graph.namespace_manager), "test:a")
+
+    def test_clear(self):
+        graph = Graph()
+        uri = NS_TEST["a"]
+        self.assertEqual(get_uri_str(uri=uri, ns_manager=graph.namespace_manager), uri.n3())
+        graph.bind("test", NS_TEST)
+        clear_uri_str_cache(ns_manager=graph.namespace_manager)
+        self.assertEqual(get_uri_str(uri=uri, ns_manager=graph.namespace_manager), "test:a")
+
+        graph.bind("test", NS_TEST["b/"], override=True, replace=True)
+        clear_uri_str_cache()
+        self.assertEqual(
+            get_uri_str(uri=uri, ns_manager=graph.namespace_manager),
+            uri.n3(namespace_manager=graph.namespace_manager),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()